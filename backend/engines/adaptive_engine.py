@@ -18,10 +18,20 @@ understand the human body is NOT linear:
 """
 from __future__ import annotations
 
+import copy
+import hashlib
 import math
+import os
+import pickle
+import time
+from datetime import datetime, timezone
+from functools import lru_cache
+from itertools import product
 import numpy as np
 from scipy import stats
+from scipy.linalg import cho_solve, cholesky, solve_triangular
 from scipy.optimize import minimize_scalar
+from sklearn.cluster import kmeans_plusplus
 from sklearn.gaussian_process import GaussianProcessRegressor
 from sklearn.gaussian_process.kernels import Matern, ConstantKernel, WhiteKernel
 from sklearn.preprocessing import StandardScaler
@@ -33,11 +43,21 @@ from models.adaptive import (
     BayesianUpdateResponse,
     FatigueDataPoint,
     GPFatiguePrediction,
+    SCENARIO_MAX_CANDIDATES,
+    FatigueScenario,
+    GPScenarioGridResponse,
     PredictionRecord,
     OutcomeRecord,
     ModelAccuracy,
     SelfImprovementResponse,
+    AccuracyLedger,
+    PendingPredictions,
+    SystemAccuracyStats,
+    AccuracyTrendQuery,
+    AccuracyTrendResponse,
+    TrendWindow,
 )
+from engines.worker_pool import clamp_workers, shared_pool
 
 # ═══════════════════════════════════════════════════════════════════
 # POPULATION DEFAULTS (PRIORS)
@@ -54,9 +74,34 @@ POPULATION_RECOVERY_HOURS: dict[str, float] = {
 
 DEFAULT_ALPHA = 2.0
 
+# Bump whenever _derive_implied_recovery_times changes: stored posterior
+# snapshots from other versions are rebuilt from the observation log.
+RECOVERY_FORMULA_VERSION = 1
 
-def _get_default_prior(muscle: str) -> GammaPrior:
-    """Initialize a Gamma prior from population recovery time."""
+# Cross-user hyperpriors published by engines.recovery_population; installed
+# at startup. Until then every user is seeded from the static table above.
+_population_prior_table = None
+
+
+def set_population_prior_table(table) -> None:
+    global _population_prior_table
+    _population_prior_table = table
+
+
+def _get_default_prior(
+    muscle: str,
+    athlete_type: str | None = None,
+    age: float | None = None,
+) -> GammaPrior:
+    """Initialize a Gamma prior from population recovery time.
+
+    The published table's most specific (athlete type, age band, muscle)
+    stratum wins; muscles it does not cover use the static hours.
+    """
+    if _population_prior_table is not None:
+        prior = _population_prior_table.prior(muscle, athlete_type, age)
+        if prior is not None:
+            return prior
     base_hours = POPULATION_RECOVERY_HOURS.get(muscle.lower(), 48.0)
     return GammaPrior(alpha=DEFAULT_ALPHA, beta=DEFAULT_ALPHA * base_hours)
 
@@ -68,6 +113,8 @@ def _get_default_prior(muscle: str) -> GammaPrior:
 def bayesian_update_recovery(
     observations: list[RecoveryObservation],
     current_priors: UserRecoveryPriors,
+    athlete_type: str | None = None,
+    age: float | None = None,
 ) -> BayesianUpdateResponse:
     """Update recovery rate beliefs using conjugate Bayesian inference.
 
@@ -80,49 +127,61 @@ def bayesian_update_recovery(
         β_new = β_old + observed_τ
 
     The beauty of conjugate priors: no MCMC needed, updates are O(1).
+    Because the updates are sums, a whole backlog is applied at once:
+    implied τ for every observation in one array pass, per-muscle α/β
+    increments via bincount, and all 5%/95% bounds from one gamma.ppf call.
     """
-    priors = current_priors.model_copy(deep=True)
-    improvement_delta: dict[str, float] = {}
-
-    for obs in observations:
+    muscles = list(current_priors.muscle_priors)
+    index = {muscle: i for i, muscle in enumerate(muscles)}
+    obs_muscle = np.empty(len(observations), dtype=int)
+    for k, obs in enumerate(observations):
         muscle = obs.muscle.lower()
-        if muscle not in priors.muscle_priors:
-            priors.muscle_priors[muscle] = _get_default_prior(muscle)
-
-        prior = priors.muscle_priors[muscle]
-        old_expected = prior.beta / prior.alpha
-
-        implied_tau = _derive_implied_recovery_time(obs)
-
-        if implied_tau is not None and implied_tau > 0:
-            prior.alpha += 1.0
-            prior.beta += implied_tau
-            priors.total_observations += 1
-
-        new_expected = prior.beta / prior.alpha
-        improvement_delta[muscle] = new_expected - old_expected
-
-    personalized_hours: dict[str, float] = {}
-    confidence_intervals: dict[str, tuple[float, float]] = {}
-
-    for muscle, prior in priors.muscle_priors.items():
-        expected = prior.beta / prior.alpha
-        personalized_hours[muscle] = round(expected, 1)
-
-        lower = stats.gamma.ppf(0.05, a=prior.alpha, scale=prior.beta / prior.alpha)
-        upper = stats.gamma.ppf(0.95, a=prior.alpha, scale=prior.beta / prior.alpha)
-        confidence_intervals[muscle] = (round(lower, 1), round(upper, 1))
+        if muscle not in index:
+            index[muscle] = len(muscles)
+            muscles.append(muscle)
+        obs_muscle[k] = index[muscle]
+
+    priors = [current_priors.muscle_priors.get(m) or _get_default_prior(m, athlete_type, age) for m in muscles]
+    alpha = np.array([p.alpha for p in priors], dtype=float)
+    beta = np.array([p.beta for p in priors], dtype=float)
+
+    implied_tau = _derive_implied_recovery_times(observations)
+    valid = ~np.isnan(implied_tau)
+    alpha += np.bincount(obs_muscle[valid], minlength=len(muscles))
+    beta += np.bincount(obs_muscle[valid], weights=implied_tau[valid], minlength=len(muscles))
+    expected = beta / alpha
+
+    # Each muscle's delta is the shift caused by its most recent observation.
+    improvement_delta: dict[str, float] = {}
+    if len(observations):
+        _, first = np.unique(obs_muscle, return_index=True)
+        _, last_rev = np.unique(obs_muscle[::-1], return_index=True)
+        last = len(obs_muscle) - 1 - last_rev
+        for first_k, last_k in sorted(zip(first, last)):
+            i = obs_muscle[first_k]
+            tau = implied_tau[last_k]
+            delta = expected[i] - (beta[i] - tau) / (alpha[i] - 1.0) if not np.isnan(tau) else 0.0
+            improvement_delta[muscles[i]] = round(float(delta), 2)
+
+    lower, upper = stats.gamma.ppf([[0.05], [0.95]], a=alpha, scale=expected)
+
+    updated_priors = current_priors.model_copy(update={
+        "muscle_priors": {m: GammaPrior(alpha=a, beta=b) for m, a, b in zip(muscles, alpha, beta)},
+        "total_observations": current_priors.total_observations + int(valid.sum()),
+    })
 
     return BayesianUpdateResponse(
-        updated_priors=priors,
-        personalized_recovery_hours=personalized_hours,
-        confidence_intervals=confidence_intervals,
-        improvement_delta={k: round(v, 2) for k, v in improvement_delta.items()},
+        updated_priors=updated_priors,
+        personalized_recovery_hours={m: round(float(e), 1) for m, e in zip(muscles, expected)},
+        confidence_intervals={
+            m: (round(float(lo), 1), round(float(hi), 1)) for m, lo, hi in zip(muscles, lower, upper)
+        },
+        improvement_delta=improvement_delta,
     )
 
 
-def _derive_implied_recovery_time(obs: RecoveryObservation) -> float | None:
-    """From a prediction-vs-reality pair, derive what the true τ must be.
+def _derive_implied_recovery_times(observations: list[RecoveryObservation]) -> np.ndarray:
+    """From prediction-vs-reality pairs, derive what the true τ must be.
 
     If AUGE predicted 60% battery but the user reports 80%, they recovered
     faster than expected. We solve for the τ that would produce the actual
@@ -135,32 +194,36 @@ def _derive_implied_recovery_time(obs: RecoveryObservation) -> float | None:
         remaining_fraction = (100 - actual_battery) / (100 - initial_depletion)
         k = -ln(remaining_fraction) / t
         τ = 2.9957 / k
-    """
-    if obs.hours_since_session <= 0 or obs.session_stress <= 0:
-        return None
-
-    actual_depletion = max(1.0, 100.0 - obs.actual_battery)
-    initial_depletion = max(actual_depletion, obs.session_stress)
-
-    remaining_fraction = actual_depletion / initial_depletion
-    remaining_fraction = max(0.01, min(0.99, remaining_fraction))
 
-    k = -math.log(remaining_fraction) / obs.hours_since_session
-
-    if k <= 0:
-        return None
+    Evaluated for all observations at once; NaN marks observations with no
+    usable τ (no elapsed time or no session stress).
+    """
+    fields = np.array([
+        (
+            obs.hours_since_session,
+            obs.session_stress,
+            obs.actual_battery,
+            np.nan if obs.articular_battery is None else obs.articular_battery,
+            np.nan if obs.combined_readiness is None else obs.combined_readiness,
+        )
+        for obs in observations
+    ], dtype=float).reshape(len(observations), 5)
+    hours, stress, actual, articular, readiness = fields.T
 
-    implied_tau = 2.9957 / k
-    articular_battery = getattr(obs, "articular_battery", None)
-    combined_readiness = getattr(obs, "combined_readiness", None)
+    actual_depletion = np.maximum(1.0, 100.0 - actual)
+    initial_depletion = np.maximum(actual_depletion, stress)
+    remaining_fraction = np.clip(actual_depletion / initial_depletion, 0.01, 0.99)
 
-    if articular_battery is not None and articular_battery < 70:
-        implied_tau *= 1 + ((70 - articular_battery) / 100.0) * 0.45
+    valid = (hours > 0) & (stress > 0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        k = -np.log(remaining_fraction) / np.where(valid, hours, 1.0)
+        implied_tau = 2.9957 / k
 
-    if combined_readiness is not None and combined_readiness < obs.actual_battery:
-        implied_tau *= 1 + ((obs.actual_battery - combined_readiness) / 100.0) * 0.2
+    # NaN comparisons are False, so missing batteries leave τ untouched.
+    implied_tau = np.where(articular < 70, implied_tau * (1 + ((70 - articular) / 100.0) * 0.45), implied_tau)
+    implied_tau = np.where(readiness < actual, implied_tau * (1 + ((actual - readiness) / 100.0) * 0.2), implied_tau)
 
-    return max(6.0, min(200.0, implied_tau))
+    return np.where(valid & (k > 0), np.clip(implied_tau, 6.0, 200.0), np.nan)
 
 
 def get_personalized_recovery_time(
@@ -177,7 +240,8 @@ def get_personalized_recovery_time(
     muscle_lower = muscle.lower()
     prior = priors.muscle_priors.get(muscle_lower)
     if not prior:
-        prior = _get_default_prior(muscle_lower)
+        context = context or {}
+        prior = _get_default_prior(muscle_lower, context.get("athlete_type"), context.get("age"))
 
     base_tau = prior.beta / prior.alpha
 
@@ -223,9 +287,169 @@ def get_personalized_recovery_time(
 # 2. GAUSSIAN PROCESS FATIGUE ENGINE
 # ═══════════════════════════════════════════════════════════════════
 
+# Bump when the kernel, features or fit settings change so cached models
+# trained under the old definition are not reused.
+GP_MODEL_VERSION = 1
+
+# Below this many observations the population prior GP is used.
+GP_MIN_OBSERVATIONS = 3
+
+# Incremental mode: hyperparameters are re-optimized once the observations
+# appended since the last fit reach max(GP_REFIT_MIN_APPENDS, n at that fit)
+# (a doubling schedule, so refits amortize to O(n²) per observation), or
+# when the last GP_DRIFT_WINDOW standardized residuals fail a χ² test.
+GP_REFIT_MIN_APPENDS = 10
+GP_DRIFT_WINDOW = 5
+GP_DRIFT_SIGNIFICANCE = 0.01
+
+# Above GP_SPARSE_THRESHOLD observations the exact n×n GP is replaced by an
+# inducing-point approximation (SparseGP): hyperparameters are fitted on a
+# random subset, then all observations are absorbed through m inducing
+# points in chunks, so memory is O(m² + m·chunk) instead of O(n²).
+GP_SPARSE_THRESHOLD = int(os.getenv("KPKN_GP_SPARSE_THRESHOLD", "1500"))
+GP_SPARSE_INDUCING = 256
+GP_SPARSE_FIT_SUBSET = 512
+GP_SPARSE_CHUNK = 1024
+GP_SPARSE_JITTER = 1e-8
+
+# Hyperparameter search: one L-BFGS-B run from the kernel's default θ (or a
+# warm-start θ) plus log-uniform random restarts drawn from a seeded RNG, so
+# a fit is reproducible. Restarts run in the shared process pool when
+# workers > 1 and the O(n³) per-evaluation cost outweighs the transfer.
+GP_OPTIMIZER_RESTARTS = 5
+GP_WARM_START_RESTARTS = 1
+GP_RANDOM_STATE = 0
+GP_PARALLEL_MIN_OBSERVATIONS = 150
+
+
+def _gp_training_arrays(training_data: list[FatigueDataPoint]) -> tuple[np.ndarray, np.ndarray]:
+    """Feature matrix X and target y, in train_gp_fatigue_model's column order."""
+    X = np.array([
+        [
+            dp.hours_since_session,
+            dp.session_stress,
+            dp.sleep_hours,
+            dp.nutrition_status,
+            dp.stress_level,
+            dp.age,
+            float(dp.is_compound_dominant),
+            dp.articular_load,
+            dp.muscle_battery,
+            dp.articular_battery,
+            dp.combined_readiness,
+        ]
+        for dp in training_data
+    ], dtype=float).reshape(len(training_data), 11)
+    y = np.array([dp.observed_fatigue_fraction for dp in training_data], dtype=float)
+    return X, y
+
+
+def gp_training_fingerprint(training_data: list[FatigueDataPoint]) -> str:
+    """Stable digest of the GP training set, used as the model cache key.
+
+    Identical observations in the same order produce the same fitted model,
+    so the digest covers the exact feature/target bytes plus GP_MODEL_VERSION.
+    """
+    X, y = _gp_training_arrays(training_data)
+    digest = hashlib.sha1(f"gp-v{GP_MODEL_VERSION}:{X.shape[0]}".encode())
+    digest.update(np.ascontiguousarray(X).tobytes())
+    digest.update(np.ascontiguousarray(y).tobytes())
+    return digest.hexdigest()
+
+
+def _gp_fatigue_kernel():
+    return (
+        ConstantKernel(1.0, (1e-3, 1e3))
+        * Matern(length_scale=1.0, length_scale_bounds=(1e-2, 1e2), nu=2.5)
+        + WhiteKernel(noise_level=0.05, noise_level_bounds=(1e-4, 1.0))
+    )
+
+
+def _fit_gp_from_theta(theta: np.ndarray, X: np.ndarray, y: np.ndarray) -> GaussianProcessRegressor:
+    """One L-BFGS-B hyperparameter search started at θ (log-space)."""
+    gp = GaussianProcessRegressor(
+        kernel=_gp_fatigue_kernel().clone_with_theta(theta),
+        n_restarts_optimizer=0,
+        alpha=1e-6,
+        normalize_y=True,
+    )
+    return gp.fit(X, y)
+
+
+def _optimize_gp_from_theta(args: tuple[np.ndarray, np.ndarray, np.ndarray]) -> tuple[float, np.ndarray]:
+    """Process-pool task: (log marginal likelihood, optimized θ)."""
+    gp = _fit_gp_from_theta(*args)
+    return float(gp.log_marginal_likelihood_value_), gp.kernel_.theta
+
+
+def _gp_restart_thetas(
+    warm_start: np.ndarray | None,
+    random_state: int,
+    n_restarts: int | None = None,
+) -> list[np.ndarray]:
+    """Starting points: default (or warm-start) θ, then seeded random draws."""
+    kernel = _gp_fatigue_kernel()
+    bounds = kernel.bounds
+    starts = [kernel.theta]
+    if warm_start is not None and np.shape(warm_start) == kernel.theta.shape:
+        starts = [np.clip(warm_start, bounds[:, 0], bounds[:, 1])]
+        n_restarts = GP_WARM_START_RESTARTS if n_restarts is None else n_restarts
+    elif n_restarts is None:
+        n_restarts = GP_OPTIMIZER_RESTARTS
+
+    rng = np.random.default_rng(random_state)
+    starts += [rng.uniform(bounds[:, 0], bounds[:, 1]) for _ in range(n_restarts)]
+    return starts
+
+
+def fit_gp_hyperparameters(
+    X: np.ndarray,
+    y: np.ndarray,
+    warm_start: np.ndarray | None = None,
+    workers: int = 1,
+    random_state: int = GP_RANDOM_STATE,
+) -> GaussianProcessRegressor:
+    """Fit the fatigue GP, keeping the restart with the best marginal likelihood.
+
+    warm_start seeds the first run from a previous fit's θ (see
+    gp_kernel_theta) and cuts the random restarts to GP_WARM_START_RESTARTS.
+    With workers > 1 the restarts are spread over the shared process pool
+    and the winning θ is refactored once in this process.
+    """
+    starts = _gp_restart_thetas(warm_start, random_state)
+    workers = clamp_workers(workers, len(starts))
+
+    if workers == 1 or len(y) < GP_PARALLEL_MIN_OBSERVATIONS:
+        fits = [_fit_gp_from_theta(theta, X, y) for theta in starts]
+        return max(fits, key=lambda gp: gp.log_marginal_likelihood_value_)
+
+    optima = list(shared_pool().map(_optimize_gp_from_theta, [(theta, X, y) for theta in starts]))
+    best_theta = max(optima, key=lambda opt: opt[0])[1]
+    gp = GaussianProcessRegressor(
+        kernel=_gp_fatigue_kernel().clone_with_theta(best_theta),
+        optimizer=None,
+        alpha=1e-6,
+        normalize_y=True,
+    )
+    return gp.fit(X, y)
+
+
+def gp_kernel_theta(model) -> np.ndarray | None:
+    """Log-space kernel hyperparameters of a fitted fatigue model, if any."""
+    if isinstance(model, (IncrementalGP, SparseGP)):
+        return model.theta
+    if isinstance(model, GaussianProcessRegressor) and hasattr(model, "kernel_"):
+        return model.kernel_.theta
+    return None
+
+
 def train_gp_fatigue_model(
     training_data: list[FatigueDataPoint],
-) -> tuple[GaussianProcessRegressor, StandardScaler]:
+    sparse_threshold: int | None = None,
+    warm_start: np.ndarray | None = None,
+    workers: int = 1,
+    random_state: int = GP_RANDOM_STATE,
+) -> tuple[GaussianProcessRegressor | SparseGP, StandardScaler]:
     """Train a GP to learn the true fatigue decay curve from observations.
 
     The GP uses a Matérn(5/2) kernel which is infinitely differentiable
@@ -243,50 +467,31 @@ def train_gp_fatigue_model(
         - Fatigue INCREASES for 24-48h before starting to decay
         - Supercompensation dip below baseline at ~72-96h
         - Context-dependent recovery speed (sleep debt = slower decay)
+
+    Above sparse_threshold observations (default GP_SPARSE_THRESHOLD) a
+    SparseGP is returned instead; it has the same predict() interface.
+    warm_start, workers and random_state are passed to fit_gp_hyperparameters.
     """
-    if len(training_data) < 3:
+    if len(training_data) < GP_MIN_OBSERVATIONS:
         return _build_prior_gp(), StandardScaler()
 
-    X = np.array([
-        [
-            dp.hours_since_session,
-            dp.session_stress,
-            dp.sleep_hours,
-            dp.nutrition_status,
-            dp.stress_level,
-            dp.age,
-            float(dp.is_compound_dominant),
-            dp.articular_load,
-            dp.muscle_battery,
-            dp.articular_battery,
-            dp.combined_readiness,
-        ]
-        for dp in training_data
-    ])
-    y = np.array([dp.observed_fatigue_fraction for dp in training_data])
+    X, y = _gp_training_arrays(training_data)
 
     scaler = StandardScaler()
     X_scaled = scaler.fit_transform(X)
 
-    kernel = (
-        ConstantKernel(1.0, (1e-3, 1e3))
-        * Matern(length_scale=1.0, length_scale_bounds=(1e-2, 1e2), nu=2.5)
-        + WhiteKernel(noise_level=0.05, noise_level_bounds=(1e-4, 1.0))
-    )
+    threshold = GP_SPARSE_THRESHOLD if sparse_threshold is None else sparse_threshold
+    if len(y) > threshold:
+        sparse = SparseGP.fit(X_scaled, y, warm_start=warm_start, workers=workers, random_state=random_state)
+        return sparse, scaler
 
-    gp = GaussianProcessRegressor(
-        kernel=kernel,
-        n_restarts_optimizer=5,
-        alpha=1e-6,
-        normalize_y=True,
-    )
-    gp.fit(X_scaled, y)
+    gp = fit_gp_hyperparameters(X_scaled, y, warm_start=warm_start, workers=workers, random_state=random_state)
 
     return gp, scaler
 
 
 def predict_fatigue_curve(
-    gp: GaussianProcessRegressor,
+    gp: GaussianProcessRegressor | IncrementalGP | SparseGP,
     scaler: StandardScaler,
     prediction_hours: list[float],
     session_stress: float = 50.0,
@@ -300,6 +505,30 @@ def predict_fatigue_curve(
         - Supercompensation hour (if detected)
         - Full recovery hour (fatigue < 5%)
     """
+    X_pred = _gp_query_matrix(prediction_hours, session_stress, context)
+
+    if hasattr(scaler, "mean_") and scaler.mean_ is not None:
+        X_scaled = scaler.transform(X_pred)
+    else:
+        X_scaled = X_pred
+
+    mean, std = gp.predict(X_scaled, return_std=True)
+    return _fatigue_prediction_from_moments(prediction_hours, mean, std)
+
+
+def _gp_query_matrix(
+    prediction_hours: list[float],
+    session_stress: float,
+    context: dict | None,
+) -> np.ndarray:
+    """Raw (unscaled) feature rows for each prediction hour."""
+    X = np.tile(_gp_context_row(session_stress, context), (len(prediction_hours), 1))
+    X[:, 0] = prediction_hours
+    return X
+
+
+def _gp_context_row(session_stress: float, context: dict | None) -> np.ndarray:
+    """Feature row for one scenario with hours_since_session left at 0."""
     ctx = context or {}
     sleep = ctx.get("sleep_hours", 7.5)
     nutrition = ctx.get("nutrition_status", 0.0)
@@ -311,70 +540,183 @@ def predict_fatigue_curve(
     articular_battery = ctx.get("articular_battery", 100.0)
     combined_readiness = ctx.get("combined_readiness", min(muscle_battery, articular_battery))
 
-    X_pred = np.array([
-        [
-            h,
-            session_stress,
-            sleep,
-            nutrition,
-            stress,
-            age,
-            float(compound),
-            articular_load,
-            muscle_battery,
-            articular_battery,
-            combined_readiness,
-        ]
-        for h in prediction_hours
-    ])
-
-    if hasattr(scaler, "mean_") and scaler.mean_ is not None:
-        X_scaled = scaler.transform(X_pred)
-    else:
-        X_scaled = X_pred
-
-    mean, std = gp.predict(X_scaled, return_std=True)
-
+    return np.array([
+        0.0,
+        session_stress,
+        sleep,
+        nutrition,
+        stress,
+        age,
+        float(compound),
+        articular_load,
+        muscle_battery,
+        articular_battery,
+        combined_readiness,
+    ], dtype=float)
+
+
+def _fatigue_prediction_from_moments(
+    prediction_hours: list[float],
+    mean: np.ndarray,
+    std: np.ndarray,
+) -> GPFatiguePrediction:
+    """Bounds and key events (peak, supercompensation, recovery) from μ, σ."""
     mean_clamped = np.clip(mean, 0, 1).tolist()
     std_safe = np.maximum(std, 0).tolist()
     upper = np.clip(mean + 2 * std, 0, 1).tolist()
     lower = np.clip(mean - 2 * std, 0, 1).tolist()
 
-    peak_idx = int(np.argmax(mean_clamped))
-    peak_hour = prediction_hours[peak_idx]
-
-    supercomp_hour = None
-    if len(mean_clamped) > peak_idx + 1:
-        post_peak = mean_clamped[peak_idx + 1:]
-        for i, val in enumerate(post_peak):
-            if val < -0.02:
-                supercomp_hour = prediction_hours[peak_idx + 1 + i]
-                break
-
-    full_recovery_hour = prediction_hours[-1]
-    for i, val in enumerate(mean_clamped):
-        if i > peak_idx and val < 0.05:
-            full_recovery_hour = prediction_hours[i]
-            break
+    peak, supercomp, recovery = _fatigue_events(np.asarray(prediction_hours, dtype=float), np.array([mean_clamped]))
 
     return GPFatiguePrediction(
         hours=prediction_hours,
         mean_fatigue=mean_clamped,
         upper_bound=upper,
         lower_bound=lower,
-        peak_fatigue_hour=peak_hour,
-        supercompensation_hour=supercomp_hour,
-        full_recovery_hour=full_recovery_hour,
+        peak_fatigue_hour=peak[0],
+        supercompensation_hour=supercomp[0],
+        full_recovery_hour=recovery[0],
+    )
+
+
+def _fatigue_events(
+    hours: np.ndarray,
+    mean_clamped: np.ndarray,
+) -> tuple[list[float], list[float | None], list[float]]:
+    """Peak, supercompensation and full-recovery hours for each (S, H) row.
+
+    Supercompensation is the first post-peak hour below −0.02 and full
+    recovery the first post-peak hour below 0.05 (else the last hour).
+    """
+    peak_idx = np.argmax(mean_clamped, axis=1)
+    after_peak = np.arange(mean_clamped.shape[1])[None, :] > peak_idx[:, None]
+
+    supercomp = after_peak & (mean_clamped < -0.02)
+    recovered = after_peak & (mean_clamped < 0.05)
+    supercomp_idx = np.argmax(supercomp, axis=1)
+    recovery_idx = np.where(recovered.any(axis=1), np.argmax(recovered, axis=1), len(hours) - 1)
+
+    return (
+        hours[peak_idx].tolist(),
+        [float(hours[i]) if found else None for i, found in zip(supercomp_idx, supercomp.any(axis=1))],
+        hours[recovery_idx].tolist(),
+    )
+
+
+FATIGUE_SCENARIO_AXES = ("session_stress", "sleep_hours", "stress_level", "nutrition_status")
+
+
+def expand_fatigue_scenarios(
+    session_stress: float,
+    context: dict | None,
+    options: dict[str, list[float] | None],
+) -> list[tuple[float, dict]]:
+    """Cartesian product of the what-if axes over a base context.
+
+    options maps FATIGUE_SCENARIO_AXES names to candidate values; missing or
+    empty axes keep the base value. Returns (session_stress, context) pairs
+    in row-major order of the axes; grids over SCENARIO_MAX_CANDIDATES raise
+    ValueError.
+    """
+    base = {**(context or {}), "session_stress": session_stress}
+    axes = [options.get(name) or [base.get(name)] for name in FATIGUE_SCENARIO_AXES]
+    n_scenarios = math.prod(len(axis) for axis in axes)
+    if n_scenarios > SCENARIO_MAX_CANDIDATES:
+        raise ValueError(f"Scenario grid of {n_scenarios} candidates exceeds {SCENARIO_MAX_CANDIDATES}")
+
+    scenarios = []
+    for combo in product(*axes):
+        ctx = dict(context or {})
+        ctx.update((name, value) for name, value in zip(FATIGUE_SCENARIO_AXES, combo) if value is not None)
+        scenarios.append((float(ctx.pop("session_stress")), ctx))
+    return scenarios
+
+
+def _scenario_query_matrix(prediction_hours: list[float], scenarios: list[tuple[float, dict]]) -> np.ndarray:
+    """(S·H, 11) raw rows: every scenario repeated over every prediction hour."""
+    rows = np.array([_gp_context_row(stress, ctx) for stress, ctx in scenarios]).reshape(len(scenarios), 11)
+    X = np.repeat(rows, len(prediction_hours), axis=0)
+    X[:, 0] = np.tile(np.asarray(prediction_hours, dtype=float), len(scenarios))
+    return X
+
+
+def predict_fatigue_scenarios(
+    gp: GaussianProcessRegressor | IncrementalGP | SparseGP,
+    scaler: StandardScaler,
+    prediction_hours: list[float],
+    scenarios: list[tuple[float, dict]],
+) -> GPScenarioGridResponse:
+    """What-if grid: every scenario × prediction hour in one gp.predict call."""
+    X = _scenario_query_matrix(prediction_hours, scenarios)
+    if hasattr(scaler, "mean_") and scaler.mean_ is not None:
+        X = scaler.transform(X)
+    mean, std = gp.predict(X, return_std=True)
+    return _scenario_grid_from_moments(prediction_hours, scenarios, mean, std)
+
+
+def _scenario_grid_from_moments(
+    prediction_hours: list[float],
+    scenarios: list[tuple[float, dict]],
+    mean: np.ndarray,
+    std: np.ndarray,
+) -> GPScenarioGridResponse:
+    shape = (len(scenarios), len(prediction_hours))
+    mean, std = mean.reshape(shape), std.reshape(shape)
+    mean_clamped = np.clip(mean, 0, 1)
+    peak, supercomp, recovery = _fatigue_events(np.asarray(prediction_hours, dtype=float), mean_clamped)
+
+    return GPScenarioGridResponse(
+        hours=prediction_hours,
+        scenarios=[
+            FatigueScenario(
+                session_stress=stress,
+                sleep_hours=ctx.get("sleep_hours", 7.5),
+                stress_level=ctx.get("stress_level", 3.0),
+                nutrition_status=ctx.get("nutrition_status", 0.0),
+            )
+            for stress, ctx in scenarios
+        ],
+        mean_fatigue=np.round(mean_clamped, 4).tolist(),
+        upper_bound=np.round(np.clip(mean + 2 * std, 0, 1), 4).tolist(),
+        lower_bound=np.round(np.clip(mean - 2 * std, 0, 1), 4).tolist(),
+        peak_fatigue_hour=peak,
+        supercompensation_hour=supercomp,
+        full_recovery_hour=recovery,
     )
 
 
+@lru_cache(maxsize=1)
 def _build_prior_gp() -> GaussianProcessRegressor:
     """Build a GP with synthetic data from AUGE's exponential decay model.
 
     Used when the user has insufficient real data (<3 observations).
     The GP starts by "believing" in the exponential model, then deviates
     from it as real observations contradict the assumption.
+
+    The prior never changes, so it is fitted once per process (with a fixed
+    random_state) and shared; callers must treat it as read-only.
     """
+    X, y = _prior_training_set()
+
+    kernel = (
+        ConstantKernel(1.0, (1e-3, 1e3))
+        * Matern(length_scale=1.0, length_scale_bounds=(1e-2, 1e2), nu=2.5)
+        + WhiteKernel(noise_level=0.1, noise_level_bounds=(1e-4, 1.0))
+    )
+
+    gp = GaussianProcessRegressor(
+        kernel=kernel,
+        n_restarts_optimizer=3,
+        alpha=1e-4,
+        normalize_y=True,
+        random_state=0,
+    )
+    gp.fit(X, y)
+    return gp
+
+
+def _prior_training_set() -> tuple[np.ndarray, np.ndarray]:
+    """Synthetic (X, y) sampled from the exponential decay model."""
     hours = [0, 3, 6, 12, 18, 24, 36, 48, 60, 72, 96, 120]
     stress = 50.0
 
@@ -397,29 +739,359 @@ def _build_prior_gp() -> GaussianProcessRegressor:
             synthetic_X.append([h, stress, sleep, 0.0, 3.0, 25.0, 1.0, 0.0, 100.0, 100.0, 100.0])
             synthetic_y.append(modified_fatigue)
 
-    X = np.array(synthetic_X)
-    y = np.array(synthetic_y)
+    return np.array(synthetic_X), np.array(synthetic_y)
 
-    kernel = (
-        ConstantKernel(1.0, (1e-3, 1e3))
-        * Matern(length_scale=1.0, length_scale_bounds=(1e-2, 1e2), nu=2.5)
-        + WhiteKernel(noise_level=0.1, noise_level_bounds=(1e-4, 1.0))
+
+
+class IncrementalGP:
+    """GP posterior with frozen hyperparameters and an extendable Cholesky factor.
+
+    Equivalent to GaussianProcessRegressor(kernel=kernel_, optimizer=None,
+    normalize_y=True) fitted on the same data, but appending an observation
+    borders L with one row in O(n²) instead of refactoring K in O(n³):
+
+        l = L⁻¹ k(X, x),  d = √(k(x, x) + α − l·l),  L' = [[L, 0], [lᵀ, d]]
+
+    Exposes predict(X, return_std=True) so predict_fatigue_curve accepts it
+    in place of a fitted regressor.
+    """
+
+    __slots__ = (
+        "kernel", "alpha", "scaler", "X", "y", "L", "weights",
+        "y_mean", "y_std", "n_fit", "residuals", "fingerprint",
     )
 
-    gp = GaussianProcessRegressor(
-        kernel=kernel,
-        n_restarts_optimizer=3,
-        alpha=1e-4,
-        normalize_y=True,
+    def __init__(self, gp: GaussianProcessRegressor, scaler: StandardScaler,
+                 y: np.ndarray, fingerprint: str):
+        self.kernel = gp.kernel_
+        self.alpha = float(gp.alpha)
+        self.scaler = scaler
+        self.X = np.array(gp.X_train_, dtype=float)
+        self.y = np.array(y, dtype=float)
+        self.L = np.array(gp.L_, dtype=float)
+        self.n_fit = len(self.y)
+        self.residuals: list[float] = []
+        self.fingerprint = fingerprint
+        self._solve_weights()
+
+    def _solve_weights(self) -> None:
+        """Re-normalize y and solve K·w = ŷ with the current factor, O(n²)."""
+        self.y_mean = float(np.mean(self.y))
+        std = float(np.std(self.y))
+        self.y_std = std if std > 0 else 1.0
+        self.weights = cho_solve((self.L, True), (self.y - self.y_mean) / self.y_std, check_finite=False)
+
+    def append(self, x: np.ndarray, y: float) -> float:
+        """Add one scaled observation; returns its standardized residual z."""
+        k = self.kernel(self.X, x[None, :])[:, 0]
+        l = solve_triangular(self.L, k, lower=True, check_finite=False)
+        d2 = float(self.kernel.diag(x[None, :])[0]) + self.alpha - float(l @ l)
+        d = math.sqrt(max(d2, self.alpha))
+
+        z = ((y - self.y_mean) / self.y_std - float(k @ self.weights)) / d
+
+        n = len(self.y)
+        L = np.zeros((n + 1, n + 1))
+        L[:n, :n] = self.L
+        L[n, :n] = l
+        L[n, n] = d
+        self.L = L
+        self.X = np.vstack([self.X, x])
+        self.y = np.append(self.y, y)
+        self.residuals = (self.residuals + [z])[-GP_DRIFT_WINDOW:]
+        self._solve_weights()
+        return z
+
+    def predict(self, X: np.ndarray, return_std: bool = False):
+        K_trans = self.kernel(X, self.X)
+        mean = K_trans @ self.weights * self.y_std + self.y_mean
+        if not return_std:
+            return mean
+        V = solve_triangular(self.L, K_trans.T, lower=True, check_finite=False)
+        var = np.maximum(self.kernel.diag(X) - np.einsum("ij,ij->j", V, V), 0.0)
+        return mean, np.sqrt(var) * self.y_std
+
+    @property
+    def n_obs(self) -> int:
+        return len(self.y)
+
+    @property
+    def theta(self) -> np.ndarray:
+        return self.kernel.theta
+
+    def refit_reason(self) -> str | None:
+        return _refit_reason(self.n_obs, self.n_fit, self.residuals)
+
+
+def _refit_reason(n_obs: int, n_fit: int, residuals: list[float]) -> str | None:
+    """'schedule' or 'drift' when hyperparameters should be re-optimized."""
+    if n_obs - n_fit >= max(GP_REFIT_MIN_APPENDS, n_fit):
+        return "schedule"
+    if len(residuals) >= GP_DRIFT_WINDOW:
+        chi2 = float(np.sum(np.square(residuals)))
+        if chi2 > stats.chi2.ppf(1.0 - GP_DRIFT_SIGNIFICANCE, len(residuals)):
+            return "drift"
+    return None
+
+
+class SparseGP:
+    """Inducing-point GP (SGPR / DTC) for long-tenure users.
+
+    With m inducing inputs Z, signal kernel k and noise σ², every training
+    row contributes aᵢ = Lᵤ⁻¹ k(Z, xᵢ) / σ to
+
+        B = I + Σ aᵢaᵢᵀ,   c = Σ aᵢ ŷᵢ / σ
+
+    and predictions are
+        μ(x)  = t₂ᵀ L_B⁻¹ c
+        σ²(x) = k(x, x) − ‖t₁‖² + ‖t₂‖² + σ²_white
+    where t₁ = Lᵤ⁻¹ k(Z, x) and t₂ = L_B⁻¹ t₁.
+
+    Only the m×m accumulators are kept (rows are absorbed in chunks), so
+    memory is O(m²) regardless of n. Sums of aᵢ, aᵢyᵢ, y and y² are kept
+    separately so normalize_y stays exact as rows are appended. Each append
+    costs O(m³), independent of n. predict() matches GaussianProcessRegressor.
+    """
+
+    __slots__ = (
+        "kernel", "white", "noise", "Z", "Lu", "LB", "B0", "a_sum", "ay_sum",
+        "y_sum", "y_sq", "n_obs", "weights", "y_mean", "y_std",
+        "scaler", "n_fit", "residuals", "fingerprint",
     )
-    gp.fit(X, y)
-    return gp
 
+    def __init__(self, kernel, alpha: float, Z: np.ndarray, X: np.ndarray, y: np.ndarray):
+        self.kernel = kernel.k1
+        self.white = float(kernel.k2.noise_level)
+        self.noise = self.white + alpha
+        self.Z = np.array(Z, dtype=float)
+
+        Kuu = self.kernel(self.Z)
+        Kuu[np.diag_indices_from(Kuu)] += GP_SPARSE_JITTER * float(np.mean(np.diag(Kuu)))
+        self.Lu = cholesky(Kuu, lower=True, check_finite=False)
+
+        m = len(self.Z)
+        self.B0 = np.zeros((m, m))
+        self.a_sum = np.zeros(m)
+        self.ay_sum = np.zeros(m)
+        self.y_sum = self.y_sq = 0.0
+        self.n_obs = 0
+        for start in range(0, len(y), GP_SPARSE_CHUNK):
+            self._accumulate(X[start:start + GP_SPARSE_CHUNK], y[start:start + GP_SPARSE_CHUNK])
+
+        self.n_fit = self.n_obs
+        self.residuals: list[float] = []
+        self.scaler: StandardScaler | None = None
+        self.fingerprint = ""
+        self._solve_weights()
+
+    @classmethod
+    def fit(
+        cls,
+        X: np.ndarray,
+        y: np.ndarray,
+        n_inducing: int = GP_SPARSE_INDUCING,
+        fit_subset: int = GP_SPARSE_FIT_SUBSET,
+        random_state: int = GP_RANDOM_STATE,
+        warm_start: np.ndarray | None = None,
+        workers: int = 1,
+    ) -> SparseGP:
+        """Learn hyperparameters on a random subset, then absorb every row.
+
+        Inducing inputs are k-means++ seeds over the scaled features, which
+        spread them across the observed contexts.
+        """
+        rng = np.random.default_rng(random_state)
+        subset = rng.choice(len(y), size=min(fit_subset, len(y)), replace=False)
+        gp = fit_gp_hyperparameters(
+            X[subset], y[subset], warm_start=warm_start, workers=workers, random_state=random_state,
+        )
+        Z, _ = kmeans_plusplus(X, n_clusters=min(n_inducing, len(y)), random_state=random_state)
+        return cls(gp.kernel_, float(gp.alpha), Z, X, y)
+
+    def _features(self, X: np.ndarray) -> np.ndarray:
+        """t₁ = Lᵤ⁻¹ k(Z, X), shape (m, len(X))."""
+        return solve_triangular(self.Lu, self.kernel(self.Z, X), lower=True, check_finite=False)
+
+    def _accumulate(self, X: np.ndarray, y: np.ndarray) -> None:
+        A = self._features(X) / math.sqrt(self.noise)
+        self.B0 += A @ A.T
+        self.a_sum += A.sum(axis=1)
+        self.ay_sum += A @ y
+        self.y_sum += float(y.sum())
+        self.y_sq += float(y @ y)
+        self.n_obs += len(y)
+
+    def _solve_weights(self) -> None:
+        self.y_mean = self.y_sum / self.n_obs
+        std = math.sqrt(max(self.y_sq / self.n_obs - self.y_mean ** 2, 0.0))
+        self.y_std = std if std > 1e-12 else 1.0
+        B = self.B0 + np.eye(len(self.Z))
+        self.LB = cholesky(B, lower=True, check_finite=False)
+        c = (self.ay_sum - self.y_mean * self.a_sum) / (self.y_std * math.sqrt(self.noise))
+        self.weights = solve_triangular(self.LB, c, lower=True, check_finite=False)
+
+    def _normalized_moments(self, X: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        t1 = self._features(X)
+        t2 = solve_triangular(self.LB, t1, lower=True, check_finite=False)
+        mean = t2.T @ self.weights
+        var = self.kernel.diag(X) - np.sum(t1 * t1, axis=0) + np.sum(t2 * t2, axis=0) + self.white
+        return mean, np.maximum(var, 0.0)
+
+    def append(self, x: np.ndarray, y: float) -> float:
+        """Absorb one scaled observation; returns its standardized residual z."""
+        mean, var = self._normalized_moments(x[None, :])
+        z = ((y - self.y_mean) / self.y_std - float(mean[0])) / math.sqrt(max(float(var[0]), self.noise))
+        self._accumulate(x[None, :], np.array([y]))
+        self.residuals = (self.residuals + [z])[-GP_DRIFT_WINDOW:]
+        self._solve_weights()
+        return z
+
+    def predict(self, X: np.ndarray, return_std: bool = False):
+        mean, var = self._normalized_moments(np.asarray(X, dtype=float))
+        mean = mean * self.y_std + self.y_mean
+        if not return_std:
+            return mean
+        return mean, np.sqrt(var) * self.y_std
+
+    def refit_reason(self) -> str | None:
+        return _refit_reason(self.n_obs, self.n_fit, self.residuals)
+
+    @property
+    def theta(self) -> np.ndarray:
+        """θ of the full kernel (signal + white noise), for warm starts."""
+        return np.append(self.kernel.theta, math.log(self.white))
+
+
+def update_gp_fatigue_model(
+    state: IncrementalGP | SparseGP | None,
+    training_data: list[FatigueDataPoint],
+    warm_start: bool = False,
+    workers: int = 1,
+) -> tuple[IncrementalGP | SparseGP, str]:
+    """Advance a user's incremental GP to the given training data.
+
+    If the stored state covers a prefix of training_data, only the new rows
+    are appended (O(n²) each) with the hyperparameters held fixed. Edited
+    history, a missing state, the refit schedule or a drift alarm trigger a
+    full train_gp_fatigue_model fit instead. Rows are appended to a copy, as
+    the given state may be the one held by the shared model cache. An exact
+    state that outgrows GP_SPARSE_THRESHOLD is refitted so it switches to a
+    SparseGP.
+
+    Scheduled and drift refits always warm-start from the state's θ;
+    rebuilds do so only when warm_start is set.
+
+    Status is one of "reused", "appended", "refit_schedule", "refit_drift"
+    or "rebuilt".
+    """
+    n_prev = state.n_obs if state is not None else 0
+    resumable = (
+        state is not None
+        and len(training_data) >= n_prev
+        and gp_training_fingerprint(training_data[:n_prev]) == state.fingerprint
+    )
+
+    if resumable:
+        if len(training_data) == n_prev:
+            return state, "reused"
+
+        X_new, y_new = _gp_training_arrays(training_data[n_prev:])
+        X_new = state.scaler.transform(X_new)
+        state = copy.deepcopy(state)
+        for x, y in zip(X_new, y_new):
+            state.append(x, float(y))
+        state.fingerprint = gp_training_fingerprint(training_data)
+
+        reason = state.refit_reason()
+        if reason is None and isinstance(state, IncrementalGP) and state.n_obs > GP_SPARSE_THRESHOLD:
+            reason = "schedule"
+        if reason is None:
+            return state, "appended"
+        status = f"refit_{reason}"
+    else:
+        status = "rebuilt"
+
+    theta = state.theta if state is not None and (resumable or warm_start) else None
+    gp, scaler = train_gp_fatigue_model(training_data, warm_start=theta, workers=workers)
+    fingerprint = gp_training_fingerprint(training_data)
+    if isinstance(gp, SparseGP):
+        gp.scaler, gp.fingerprint = scaler, fingerprint
+        return gp, status
+    _, y = _gp_training_arrays(training_data)
+    return IncrementalGP(gp, scaler, y, fingerprint), status
+
+
+def compare_gp_backends(
+    training_data: list[FatigueDataPoint],
+    prediction_hours: list[float],
+    session_stress: float = 50.0,
+    context: dict | None = None,
+    inducing_points: list[int] | None = None,
+    holdout_fraction: float = 0.2,
+    random_state: int = 0,
+) -> dict:
+    """Accuracy-vs-latency benchmark of SparseGP against the exact GP.
+
+    Fits the exact GP and one SparseGP per inducing-point count on the same
+    training split. Each backend reports fit/predict wall time, pickled model
+    size and RMSE on held-out observations. Sparse backends also report
+    their deviation from the exact GP's fatigue curve. Run offline via
+    engines.gp_benchmark; exact fits take minutes at realistic sizes.
+    """
+    if len(training_data) < 2 * GP_MIN_OBSERVATIONS:
+        raise ValueError(f"Need at least {2 * GP_MIN_OBSERVATIONS} observations to benchmark")
+
+    X, y = _gp_training_arrays(training_data)
+    order = np.random.default_rng(random_state).permutation(len(y))
+    n_holdout = min(max(1, int(round(len(y) * holdout_fraction))), len(y) - GP_MIN_OBSERVATIONS)
+    test, train = order[:n_holdout], order[n_holdout:]
+
+    scaler = StandardScaler()
+    X_train = scaler.fit_transform(X[train])
+    X_test = scaler.transform(X[test])
+    X_curve = scaler.transform(_gp_query_matrix(prediction_hours, session_stress, context))
+
+    def _measure(fit) -> tuple[dict, np.ndarray, np.ndarray]:
+        t0 = time.perf_counter()
+        model = fit()
+        t1 = time.perf_counter()
+        held_out = model.predict(X_test)
+        mean, std = model.predict(X_curve, return_std=True)
+        t2 = time.perf_counter()
+        return {
+            "fit_ms": round((t1 - t0) * 1000, 2),
+            "predict_ms": round((t2 - t1) * 1000, 3),
+            "model_bytes": len(pickle.dumps(model, protocol=pickle.HIGHEST_PROTOCOL)),
+            "holdout_rmse": round(float(np.sqrt(np.mean((held_out - y[test]) ** 2))), 5),
+        }, mean, std
+
+    exact, exact_mean, exact_std = _measure(
+        lambda: fit_gp_hyperparameters(X_train, y[train], random_state=random_state)
+    )
+    results = {"exact": exact}
+    for m in inducing_points or [64, 128, GP_SPARSE_INDUCING]:
+        report, mean, std = _measure(
+            lambda: SparseGP.fit(X_train, y[train], n_inducing=m, random_state=random_state)
+        )
+        report["curve_max_abs_dev_mean"] = round(float(np.max(np.abs(mean - exact_mean))), 5)
+        report["curve_max_abs_dev_std"] = round(float(np.max(np.abs(std - exact_std))), 5)
+        results[f"sparse_{m}"] = report
+
+    return {
+        "n_train": len(train),
+        "n_holdout": len(test),
+        "backends": results,
+    }
 
 # ═══════════════════════════════════════════════════════════════════
 # 3. SELF-IMPROVEMENT LOOP
 # ═══════════════════════════════════════════════════════════════════
 
+TREND_WINDOW = 5
+# Predictions still waiting for an outcome; the oldest are dropped beyond this.
+LEDGER_MAX_PENDING = 5000
+
+
 def evaluate_prediction_accuracy(
     predictions: list[PredictionRecord],
     outcomes: list[OutcomeRecord],
@@ -445,27 +1117,40 @@ def evaluate_prediction_accuracy(
             paired[system] = []
         paired[system].append((pred.predicted_value, outcome.actual_value))
 
-    accuracy_list: list[ModelAccuracy] = []
-    all_errors: list[float] = []
-    adjustments: dict[str, float] = {}
-    recommendations: list[str] = []
-
+    metrics = []
     for system, pairs in paired.items():
-        if len(pairs) < 2:
-            continue
-
         predicted = np.array([p[0] for p in pairs])
         actual = np.array([p[1] for p in pairs])
-
         errors = predicted - actual
-        abs_errors = np.abs(errors)
+        metrics.append((
+            system,
+            len(pairs),
+            float(np.sum(np.abs(errors))),
+            float(np.sqrt(np.mean(errors ** 2))),
+            float(np.mean(errors)),
+            float(np.sum(errors ** 2)),
+            float(np.sum((actual - np.mean(actual)) ** 2)),
+        ))
 
-        mae = float(np.mean(abs_errors))
-        rmse = float(np.sqrt(np.mean(errors ** 2)))
-        bias = float(np.mean(errors))
+    return _self_improvement_response(metrics, _compute_improvement_trend(predictions, outcomes))
 
-        ss_res = float(np.sum((actual - predicted) ** 2))
-        ss_tot = float(np.sum((actual - np.mean(actual)) ** 2))
+
+def _self_improvement_response(
+    metrics: list[tuple[str, int, float, float, float, float, float]],
+    trend: list[float],
+) -> SelfImprovementResponse:
+    """Accuracy report from per-system (system, n, Σ|e|, RMSE, bias, SS_res, SS_tot)."""
+    accuracy_list: list[ModelAccuracy] = []
+    abs_error_total = 0.0
+    error_count = 0
+    adjustments: dict[str, float] = {}
+    recommendations: list[str] = []
+
+    for system, n, abs_error_sum, rmse, bias, ss_res, ss_tot in metrics:
+        if n < 2:
+            continue
+
+        mae = abs_error_sum / n
         r2 = 1.0 - (ss_res / ss_tot) if ss_tot > 0 else 0.0
 
         accuracy_list.append(ModelAccuracy(
@@ -474,9 +1159,10 @@ def evaluate_prediction_accuracy(
             rmse=round(rmse, 2),
             bias=round(bias, 2),
             r_squared=round(r2, 3),
-            sample_size=len(pairs),
+            sample_size=n,
         ))
-        all_errors.extend(abs_errors.tolist())
+        abs_error_total += abs_error_sum
+        error_count += n
 
         if abs(bias) > 5:
             direction = "sobreestimando" if bias > 0 else "subestimando"
@@ -493,9 +1179,9 @@ def evaluate_prediction_accuracy(
             )
 
     overall_score = 0.0
-    if all_errors:
+    if error_count:
         max_acceptable_error = 20.0
-        avg_error = float(np.mean(all_errors))
+        avg_error = abs_error_total / error_count
         overall_score = max(0, min(100, (1 - avg_error / max_acceptable_error) * 100))
 
     if not recommendations:
@@ -503,8 +1189,6 @@ def evaluate_prediction_accuracy(
             "AUGE tiene precisión aceptable. Sigue registrando feedback para mejorar."
         )
 
-    trend = _compute_improvement_trend(predictions, outcomes)
-
     return SelfImprovementResponse(
         accuracy_by_system=accuracy_list,
         suggested_adjustments=adjustments,
@@ -514,6 +1198,84 @@ def evaluate_prediction_accuracy(
     )
 
 
+# ─── Accuracy ledger ─────────────────────────────────────────────
+
+def update_accuracy_ledger(
+    ledger: AccuracyLedger,
+    pending: PendingPredictions,
+    predictions: list[PredictionRecord],
+    outcomes: list[OutcomeRecord],
+) -> tuple[AccuracyLedger, PendingPredictions, list[tuple[str, str, float]]]:
+    """Fold new predictions and outcomes into the ledger in O(new records).
+
+    Predictions are parked in pending until their outcome arrives; each
+    matched pair updates its system's running sums (Welford for the actual
+    values) and the trend window. Outcomes without a pending prediction are
+    ignored. Also returns the matched (timestamp, system, error) rows for
+    the error stream.
+    """
+    waiting = dict(pending.predictions)
+    for pred in predictions:
+        waiting.pop(pred.prediction_id, None)
+        waiting[pred.prediction_id] = pred
+    while len(waiting) > LEDGER_MAX_PENDING:
+        del waiting[next(iter(waiting))]
+
+    systems = dict(ledger.systems)
+    trend, partial = list(ledger.trend), list(ledger.trend_partial)
+    matched: list[tuple[str, str, float]] = []
+    for outcome in outcomes:
+        pred = waiting.pop(outcome.prediction_id, None)
+        if pred is None:
+            continue
+
+        acc = systems.get(pred.system)
+        acc = acc.model_copy() if acc is not None else SystemAccuracyStats()
+        systems[pred.system] = acc
+        error = pred.predicted_value - outcome.actual_value
+        matched.append((pred.timestamp, pred.system, error))
+        acc.count += 1
+        acc.error_sum += error
+        acc.abs_error_sum += abs(error)
+        acc.sq_error_sum += error * error
+        delta = outcome.actual_value - acc.actual_mean
+        acc.actual_mean += delta / acc.count
+        acc.actual_m2 += delta * (outcome.actual_value - acc.actual_mean)
+
+        partial.append(abs(error))
+        if len(partial) == TREND_WINDOW:
+            trend.append(round(sum(partial) / TREND_WINDOW, 2))
+            partial = []
+
+    return (
+        AccuracyLedger(systems=systems, trend=trend, trend_partial=partial),
+        PendingPredictions(predictions=waiting),
+        matched,
+    )
+
+
+def accuracy_from_ledger(ledger: AccuracyLedger) -> SelfImprovementResponse:
+    """Same report as evaluate_prediction_accuracy, read off the running sums.
+
+    The trend follows outcome arrival order rather than prediction time.
+    """
+    metrics = [
+        (
+            system,
+            acc.count,
+            acc.abs_error_sum,
+            math.sqrt(acc.sq_error_sum / acc.count),
+            acc.error_sum / acc.count,
+            acc.sq_error_sum,
+            acc.actual_m2,
+        )
+        for system, acc in ledger.systems.items()
+        if acc.count
+    ]
+    trend = ledger.trend if ledger.trend else ledger.trend_partial
+    return _self_improvement_response(metrics, list(trend))
+
+
 def _compute_improvement_trend(
     predictions: list[PredictionRecord],
     outcomes: list[OutcomeRecord],
@@ -523,25 +1285,182 @@ def _compute_improvement_trend(
     Groups prediction-outcome pairs into windows of 5 and computes
     the MAE for each window. A decreasing trend = AUGE is learning.
     """
-    outcome_map = {o.prediction_id: o for o in outcomes}
-    errors_chronological: list[float] = []
+    index = build_error_index(*paired_prediction_errors(predictions, outcomes))
+    if index.sample_count < TREND_WINDOW:
+        return index.abs_errors().tolist()
+    return [w.mae for w in index.windows(window=TREND_WINDOW, stride=TREND_WINDOW)]
+
+
+# ─── Trend index ─────────────────────────────────────────────────
+
+ALL_SYSTEMS = "*"
+_EPOCH_WEEK_OFFSET_DAYS = 3  # 1970-01-01 was a Thursday
+
 
-    sorted_preds = sorted(predictions, key=lambda p: p.timestamp)
-    for pred in sorted_preds:
+def paired_prediction_errors(
+    predictions: list[PredictionRecord],
+    outcomes: list[OutcomeRecord],
+) -> tuple[list[str], list[str], np.ndarray]:
+    """(timestamps, systems, predicted − actual) for every matched prediction."""
+    outcome_map = {o.prediction_id: o for o in outcomes}
+    timestamps, systems, errors = [], [], []
+    for pred in predictions:
         outcome = outcome_map.get(pred.prediction_id)
         if outcome:
-            errors_chronological.append(abs(pred.predicted_value - outcome.actual_value))
+            timestamps.append(pred.timestamp)
+            systems.append(pred.system)
+            errors.append(pred.predicted_value - outcome.actual_value)
+    return timestamps, systems, np.asarray(errors, dtype=float)
+
+
+def _parse_epochs(timestamps: list[str]) -> np.ndarray | None:
+    """UTC epoch seconds, or None if any timestamp is not ISO-8601."""
+    epochs = np.empty(len(timestamps))
+    for i, ts in enumerate(timestamps):
+        try:
+            dt = datetime.fromisoformat(ts)
+        except ValueError:
+            return None
+        if dt.tzinfo is None:
+            dt = dt.replace(tzinfo=timezone.utc)
+        epochs[i] = dt.timestamp()
+    return epochs
+
+
+class _ErrorStream:
+    """One time-ordered error series with prefix sums.
+
+    cum_abs[i] = Σ|e| and cum_err[i] = Σe over the first i errors, so any
+    window [a, b) costs two lookups. Calendar period bounds are found once
+    at build time.
+    """
+
+    __slots__ = ("timestamps", "cum_abs", "cum_err", "period_bounds")
+
+    def __init__(self, timestamps: list[str], errors: np.ndarray, epochs: np.ndarray | None):
+        self.timestamps = timestamps
+        self.cum_abs = np.concatenate([[0.0], np.cumsum(np.abs(errors))])
+        self.cum_err = np.concatenate([[0.0], np.cumsum(errors)])
+        self.period_bounds: dict[str, tuple[np.ndarray, np.ndarray]] = {}
+        if epochs is not None and len(epochs):
+            for period, keys in _period_keys(epochs).items():
+                starts = np.flatnonzero(np.diff(keys, prepend=keys[0] - 1))
+                self.period_bounds[period] = (np.append(starts, len(keys)), keys[starts])
+
+    def _window(self, a: int, b: int, start: str, end: str) -> TrendWindow:
+        n = b - a
+        return TrendWindow(
+            start=start,
+            end=end,
+            sample_count=n,
+            mae=round(float((self.cum_abs[b] - self.cum_abs[a]) / n), 2),
+            bias=round(float((self.cum_err[b] - self.cum_err[a]) / n), 2),
+        )
+
+    def windows(self, window: int, stride: int) -> list[TrendWindow]:
+        n = len(self.timestamps)
+        return [
+            self._window(a, a + window, self.timestamps[a], self.timestamps[a + window - 1])
+            for a in range(0, n - window + 1, stride)
+        ]
+
+    def periods(self, period: str) -> list[TrendWindow]:
+        if period not in self.period_bounds:
+            return []
+        bounds, keys = self.period_bounds[period]
+        starts, ends = _period_labels(period, keys), _period_labels(period, keys + 1)
+        return [
+            self._window(int(a), int(b), starts[i], ends[i])
+            for i, (a, b) in enumerate(zip(bounds[:-1], bounds[1:]))
+        ]
+
+
+def _period_keys(epochs: np.ndarray) -> dict[str, np.ndarray]:
+    """Integer week (Monday-start) and month numbers since the epoch, UTC."""
+    days = np.floor(epochs / 86400.0).astype(np.int64)
+    months = epochs.astype("datetime64[s]").astype("datetime64[M]").astype(np.int64)
+    return {"week": (days + _EPOCH_WEEK_OFFSET_DAYS) // 7, "month": months}
+
+
+def _period_labels(period: str, keys: np.ndarray) -> list[str]:
+    if period == "week":
+        starts = (keys * 7 - _EPOCH_WEEK_OFFSET_DAYS).astype("datetime64[D]")
+    else:
+        starts = keys.astype("datetime64[M]").astype("datetime64[D]")
+    return [str(d) for d in starts]
+
 
-    if len(errors_chronological) < 5:
-        return errors_chronological
+class ErrorTrendIndex:
+    """Prefix-sum index over the time-ordered prediction error stream.
+
+    Built once in O(n log n) (one stable sort, one cumsum per system);
+    every MAE/bias window afterwards is O(1). Picklable, so it can be
+    cached per user.
+    """
+
+    __slots__ = ("streams", "_errors")
+
+    def __init__(self, streams: dict[str, _ErrorStream], errors: np.ndarray):
+        self.streams = streams
+        self._errors = errors
+
+    @property
+    def sample_count(self) -> int:
+        return len(self._errors)
+
+    def abs_errors(self) -> np.ndarray:
+        return np.abs(self._errors)
+
+    def windows(self, window: int, stride: int | None = None, system: str = ALL_SYSTEMS) -> list[TrendWindow]:
+        stream = self.streams.get(system)
+        return stream.windows(window, stride or window) if stream else []
+
+    def periods(self, period: str, system: str = ALL_SYSTEMS) -> list[TrendWindow]:
+        stream = self.streams.get(system)
+        return stream.periods(period) if stream else []
+
+    def query(self, query: AccuracyTrendQuery) -> AccuracyTrendResponse:
+        def read(system: str) -> list[TrendWindow]:
+            if query.period:
+                return self.periods(query.period, system)
+            return self.windows(query.window, query.stride, system)
+
+        if query.period and self.sample_count and query.period not in self.streams[ALL_SYSTEMS].period_bounds:
+            raise ValueError("Calendar trend windows need ISO-8601 prediction timestamps")
+        return AccuracyTrendResponse(
+            overall=read(ALL_SYSTEMS),
+            by_system={s: read(s) for s in self.streams if s != ALL_SYSTEMS} if query.by_system else {},
+            sample_count=self.sample_count,
+        )
+
+
+def build_error_index(timestamps: list[str], systems: list[str], errors: np.ndarray) -> ErrorTrendIndex:
+    """Sort the stream by time (ISO instants, else the raw strings) and index it."""
+    epochs = _parse_epochs(timestamps)
+    order_key = epochs if epochs is not None else np.array(timestamps, dtype=object)
+    order = np.argsort(order_key, kind="stable") if len(timestamps) else np.array([], dtype=int)
+
+    timestamps = [timestamps[i] for i in order]
+    systems_sorted = np.array([systems[i] for i in order], dtype=object)
+    errors = np.asarray(errors, dtype=float)[order]
+    epochs = epochs[order] if epochs is not None else None
+
+    streams = {ALL_SYSTEMS: _ErrorStream(timestamps, errors, epochs)}
+    for system in dict.fromkeys(systems_sorted.tolist()):
+        mask = systems_sorted == system
+        rows = np.flatnonzero(mask)
+        streams[system] = _ErrorStream(
+            [timestamps[i] for i in rows], errors[mask], epochs[mask] if epochs is not None else None,
+        )
+    return ErrorTrendIndex(streams, errors)
 
-    window = 5
-    trend: list[float] = []
-    for i in range(0, len(errors_chronological) - window + 1, window):
-        chunk = errors_chronological[i:i + window]
-        trend.append(round(float(np.mean(chunk)), 2))
 
-    return trend
+def error_stream_fingerprint(timestamps: list[str], systems: list[str], errors: np.ndarray) -> str:
+    digest = hashlib.sha1()
+    digest.update("\x1f".join(timestamps).encode("utf-8"))
+    digest.update("\x1f".join(systems).encode("utf-8"))
+    digest.update(np.ascontiguousarray(errors, dtype=float).tobytes())
+    return digest.hexdigest()
 
 
 def compute_adaptive_corrections(
@@ -1,21 +1,21 @@
 """Analysis service – faithful port of services/analysisService.ts"""
 from __future__ import annotations
 import math
+from bisect import bisect_right
 from datetime import datetime, timezone, timedelta
 from models.common import (
     Program, ExerciseMuscleInfo, Settings, Session, MuscleHierarchy,
     WorkoutLog, ProgramWeek, NutritionLog, BodyProgressLog,
 )
+from engines.athlete_context import AthleteContext, ensure_context
 from engines.exercise_index import ExerciseIndex
 from engines.fatigue_engine import is_set_effective, calculate_completed_session_stress
 from engines.volume_engine import MUSCLE_ROLE_MULTIPLIERS
 
 
-def _parse_date_ms(d: str) -> float:
-    try:
-        return datetime.fromisoformat(d.replace("Z", "+00:00")).timestamp() * 1000
-    except Exception:
-        return 0
+# Calendar windows are matched on each log's own date string, which may be
+# written in any UTC offset; epoch-ms window slices are widened by this much.
+DATE_OFFSET_SLACK = timedelta(days=2)
 
 
 def _create_child_to_parent(hierarchy: MuscleHierarchy) -> dict[str, str]:
@@ -149,13 +149,16 @@ def calculate_acwr(
     history: list[WorkoutLog],
     settings: Settings,
     exercise_list: list[ExerciseMuscleInfo],
+    context: AthleteContext | None = None,
 ) -> dict:
-    if len(history) < 7:
+    ctx = ensure_context(context, history)
+    if len(ctx.history) < 7:
         return {"acwr": 0, "interpretation": "Datos insuficientes", "color": "text-slate-400"}
 
     today = datetime.now(timezone.utc)
+    recent, _ = ctx.history_since((today - timedelta(days=28) - DATE_OFFSET_SLACK).timestamp() * 1000)
     stress_by_day: dict[str, float] = {}
-    for log in history:
+    for log in recent:
         ds = log.date[:10]
         stress = log.sessionStressScore if log.sessionStressScore is not None else calculate_completed_session_stress(log.completedExercises, exercise_list)
         stress_by_day[ds] = stress_by_day.get(ds, 0) + stress
@@ -196,17 +199,18 @@ def _get_week_id(d: datetime, start_on: int | None = None) -> str:
 def calculate_weekly_tonnage_comparison(
     history: list[WorkoutLog],
     settings: Settings,
+    context: AthleteContext | None = None,
 ) -> dict:
+    ctx = ensure_context(context, history)
     today = datetime.now(timezone.utc)
     cw_id = _get_week_id(today, settings.startWeekOn)
     pw_start = datetime.fromisoformat(cw_id) - timedelta(days=7)
     pw_id = pw_start.strftime("%Y-%m-%d")
 
+    lo = bisect_right(ctx.history_ms, (pw_start.replace(tzinfo=timezone.utc) - DATE_OFFSET_SLACK).timestamp() * 1000)
     current = previous = 0.0
-    for log in history:
-        try:
-            ld = datetime.fromisoformat(log.date.replace("Z", "+00:00"))
-        except Exception:
+    for log, ld in zip(ctx.history[lo:], ctx.history_dt[lo:]):
+        if ld is None:
             continue
         lid = _get_week_id(ld, settings.startWeekOn)
         vol = 0.0
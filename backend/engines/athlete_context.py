@@ -0,0 +1,154 @@
+"""Pre-parsed athlete logs shared by the recovery and analysis engines.
+
+Every engine used to re-parse the same ISO date strings, re-sort the sleep
+logs and scan the wellbeing logs for today's entry. An AthleteContext does
+that once per request (or per user) and is passed to each engine in place
+of the raw lists:
+
+    history        time-sorted (ascending, stable) with parallel epoch-ms
+    nutrition      time-sorted (ascending, stable) with parallel epoch-ms
+    sleep          newest first by endTime, as every consumer reads the top
+    wellbeing      date → first log of that date, plus the last-log fallback
+                   (or, for a past instant, the latest earlier day)
+    feedback       original order with parallel epoch-ms
+
+Unparseable dates map to 0 ms (and a None datetime), as before. Time
+windows over history and nutrition are binary-searched slices, so their
+cost follows the window, not the lifetime log.
+"""
+from __future__ import annotations
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timezone
+from models.common import (
+    WorkoutLog, SleepLog, DailyWellbeingLog, NutritionLog, PostSessionFeedback,
+)
+
+SLEEP_WEIGHTS = (0.5, 0.3, 0.2)
+
+
+def _parse_datetime(date_str: str) -> datetime | None:
+    try:
+        return datetime.fromisoformat(date_str.replace("Z", "+00:00"))
+    except Exception:
+        return None
+
+
+def _parse_date_ms(date_str: str) -> float:
+    dt = _parse_datetime(date_str)
+    return dt.timestamp() * 1000 if dt is not None else 0
+
+
+def _time_sorted(logs: list, ms: list[float], reverse: bool = False) -> tuple[list, list[float]]:
+    order = sorted(range(len(logs)), key=ms.__getitem__, reverse=reverse)
+    return [logs[i] for i in order], [ms[i] for i in order]
+
+
+class AthleteContext:
+    __slots__ = (
+        "history", "history_ms", "history_dt",
+        "sleep_logs", "sleep_end_ms", "_sleep_end_desc",
+        "daily_wellbeing", "wellbeing_by_date", "_wellbeing_dates",
+        "nutrition_logs", "nutrition_ms",
+        "post_session_feedback", "feedback_ms",
+    )
+
+    def __init__(
+        self,
+        history: list[WorkoutLog] | None = None,
+        sleep_logs: list[SleepLog] | None = None,
+        daily_wellbeing: list[DailyWellbeingLog] | None = None,
+        nutrition_logs: list[NutritionLog] | None = None,
+        post_session_feedback: list[PostSessionFeedback] | None = None,
+    ):
+        history = list(history or [])
+        dts = [_parse_datetime(l.date) for l in history]
+        ms = [dt.timestamp() * 1000 if dt is not None else 0 for dt in dts]
+        order = sorted(range(len(history)), key=ms.__getitem__)
+        self.history: list[WorkoutLog] = [history[i] for i in order]
+        self.history_ms: list[float] = [ms[i] for i in order]
+        self.history_dt: list[datetime | None] = [dts[i] for i in order]
+
+        sleep_logs = list(sleep_logs or [])
+        self.sleep_logs, self.sleep_end_ms = _time_sorted(
+            sleep_logs, [_parse_date_ms(s.endTime) for s in sleep_logs], reverse=True,
+        )
+        self._sleep_end_desc = [-ms for ms in self.sleep_end_ms]
+
+        self.daily_wellbeing: list[DailyWellbeingLog] = list(daily_wellbeing or [])
+        self.wellbeing_by_date: dict[str, DailyWellbeingLog] = {}
+        for wb in self.daily_wellbeing:
+            self.wellbeing_by_date.setdefault(wb.date, wb)
+        self._wellbeing_dates = sorted(self.wellbeing_by_date)
+
+        nutrition_logs = list(nutrition_logs or [])
+        self.nutrition_logs, self.nutrition_ms = _time_sorted(
+            nutrition_logs, [_parse_date_ms(n.date) for n in nutrition_logs],
+        )
+
+        self.post_session_feedback: list[PostSessionFeedback] = list(post_session_feedback or [])
+        self.feedback_ms: list[float] = [_parse_date_ms(f.date) for f in self.post_session_feedback]
+
+    # ─── Derived features ────────────────────────────────────────
+
+    def weighted_sleep(self, fill: float = 7.5, default: float = 7.5, as_of: float | None = None) -> float:
+        """0.5·last + 0.3·previous + 0.2·third night; missing nights are `fill`.
+
+        as_of (epoch ms) only considers nights that had ended by then.
+        """
+        first = 0 if as_of is None else bisect_left(self._sleep_end_desc, -as_of)
+        if first >= len(self.sleep_logs):
+            return default
+        nights = [s.duration for s in self.sleep_logs[first:first + 3]]
+        nights += [fill] * (3 - len(nights))
+        return nights[0] * SLEEP_WEIGHTS[0] + nights[1] * SLEEP_WEIGHTS[1] + nights[2] * SLEEP_WEIGHTS[2]
+
+    def last_sleep_hours(self, default: float = 7.5) -> float:
+        return self.sleep_logs[0].duration if self.sleep_logs else default
+
+    def wellbeing_on(self, date_str: str) -> DailyWellbeingLog | None:
+        """The first log of that date, else the most recently appended log."""
+        wb = self.wellbeing_by_date.get(date_str)
+        if wb is None and self.daily_wellbeing:
+            return self.daily_wellbeing[-1]
+        return wb
+
+    def today_wellbeing(self) -> DailyWellbeingLog | None:
+        return self.wellbeing_on(datetime.now(timezone.utc).strftime("%Y-%m-%d"))
+
+    def wellbeing_as_of(self, date_str: str) -> DailyWellbeingLog | None:
+        """The first log of that date, else the first log of the latest earlier date."""
+        wb = self.wellbeing_by_date.get(date_str)
+        if wb is None:
+            pos = bisect_left(self._wellbeing_dates, date_str)
+            if pos:
+                return self.wellbeing_by_date[self._wellbeing_dates[pos - 1]]
+        return wb
+
+    # ─── Time windows ────────────────────────────────────────────
+
+    def history_since(
+        self, after_ms: float, until_ms: float | None = None,
+    ) -> tuple[list[WorkoutLog], list[float]]:
+        """(logs, epoch ms) with after_ms < t ≤ until_ms (no upper bound if None)."""
+        lo = bisect_right(self.history_ms, after_ms)
+        hi = len(self.history_ms) if until_ms is None else bisect_right(self.history_ms, until_ms)
+        return self.history[lo:hi], self.history_ms[lo:hi]
+
+    def nutrition_since(self, cutoff_ms: float, until_ms: float | None = None) -> list[NutritionLog]:
+        lo = bisect_right(self.nutrition_ms, cutoff_ms)
+        hi = len(self.nutrition_ms) if until_ms is None else bisect_right(self.nutrition_ms, until_ms)
+        return self.nutrition_logs[lo:hi]
+
+
+def ensure_context(
+    context: AthleteContext | None,
+    history: list[WorkoutLog] | None = None,
+    sleep_logs: list[SleepLog] | None = None,
+    daily_wellbeing: list[DailyWellbeingLog] | None = None,
+    nutrition_logs: list[NutritionLog] | None = None,
+    post_session_feedback: list[PostSessionFeedback] | None = None,
+) -> AthleteContext:
+    """The caller's context, or one built from the raw lists."""
+    if context is not None:
+        return context
+    return AthleteContext(history, sleep_logs, daily_wellbeing, nutrition_logs, post_session_feedback)
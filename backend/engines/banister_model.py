@@ -22,24 +22,54 @@ Each with its own time constants and coupling terms, because a deadlift
 doesn't affect your biceps the same way it affects your erectors.
 
 We use SciPy's solve_ivp (Runge-Kutta 4/5) for numerical integration and
-scipy.optimize.minimize for parameter estimation from actual performance data.
+scipy.optimize.minimize (L-BFGS-B with analytic gradients) for parameter
+estimation from actual performance data.
+
+Because the system is linear with exponential kernels, it also has an exact
+closed-form solution. The "recursive" solver evaluates it in O(N + T): each
+Gaussian pulse is integrated analytically while it is active, and once it has
+settled its contribution is carried forward by a first-order recurrence
+X[k] = X[k-1]·e^(−Δt/τ) + B[k] instead of re-summing the whole history.
 """
 from __future__ import annotations
 
+import hashlib
+import math
+import time
+
 import numpy as np
 from scipy.integrate import solve_ivp
 from scipy.optimize import minimize
+from scipy.signal import lfilter
+from scipy.special import ndtr
 
 from models.adaptive import (
     BanisterParams,
     TrainingImpulse,
     BanisterResponse,
+    BanisterFitDiagnostics,
+    BanisterStateCheckpoint,
+    RosterAthlete,
+    BanisterAthleteSummary,
+    BanisterRosterResponse,
+    TemplateSession,
+    TaperCandidate,
+    TaperPlanResponse,
+    TimelineOutput,
+    TAPER_MAX_CANDIDATES,
 )
+from engines.series_codec import encode_series, select_output_indices
+from engines.worker_pool import clamp_workers, shared_pool
+
+
+PULSE_SIGMA = 1.0
+SETTLE_SIGMAS = 8.0
+BANISTER_SOLVERS = ("ode", "recursive")
 
 
 def _build_impulse_function(
     impulses: list[TrainingImpulse],
-    sigma: float = 1.0,
+    sigma: float = PULSE_SIGMA,
 ) -> callable:
     """Create a continuous training impulse function w(t) from discrete sessions.
 
@@ -94,13 +124,167 @@ def _normalize_impulses(
     return normalized, float(normalized[-1].timestamp_hours)
 
 
+def _impulse_arrays(impulses: list[TrainingImpulse]) -> tuple[np.ndarray, np.ndarray]:
+    """Sorted zero-based impulse times and magnitudes, without rebuilding models."""
+    if not impulses:
+        return np.zeros(0), np.zeros(0)
+
+    times = np.array([float(imp.timestamp_hours) for imp in impulses])
+    magnitudes = np.array([float(imp.impulse) for imp in impulses])
+    order = np.argsort(times, kind="stable")
+    times = times[order]
+    return times - times[0], magnitudes[order]
+
+
+def _linear_recurrence(increments: np.ndarray, decay: np.ndarray) -> np.ndarray:
+    """Evaluate X[0] = B[0], X[k] = X[k-1]·decay[k-1] + B[k].
+
+    decay holds one factor per grid step (len(increments) − 1). The uniform
+    prefix of the grid runs as a single IIR filter; any ragged tail (e.g. the
+    forecast end appended after the last dt step) is finished in a short loop.
+    """
+    if len(increments) <= 1:
+        return increments.copy()
+
+    ragged = np.flatnonzero(~np.isclose(decay, decay[0]))
+    uniform = int(ragged[0]) if len(ragged) else len(decay)
+
+    out = np.empty_like(increments)
+    out[:uniform + 1] = lfilter([1.0], [1.0, -float(decay[0])], increments[:uniform + 1])
+    for k in range(uniform + 1, len(increments)):
+        out[k] = out[k - 1] * decay[k - 1] + increments[k]
+    return out
+
+
+def _settled_mass(
+    times: np.ndarray,
+    magnitudes: np.ndarray,
+    taus: np.ndarray,
+    sigma: float = PULSE_SIGMA,
+) -> np.ndarray:
+    """Effective (N, S) mass of each pulse once it has fully settled.
+
+    Integration starts at t=0, so pulses near the origin (the first one is
+    cut in half) contribute less than their nominal magnitude.
+    """
+    shift = sigma / taus
+    return magnitudes * np.exp(0.5 * shift * shift) * (1.0 - ndtr(-times[:, None] / sigma - shift))
+
+
+def _closed_form_responses(
+    times: np.ndarray,
+    magnitudes: np.ndarray,
+    taus: np.ndarray,
+    t_eval: np.ndarray,
+    sigma: float = PULSE_SIGMA,
+) -> np.ndarray:
+    """Exact solution of dX/dt = −X/τ + w(t), X(0) = 0, on a sorted grid.
+
+    magnitudes is an (N, S) impulse matrix and taus holds one time constant
+    per column, so several fitness/fatigue states are solved in one pass and
+    the result is (T, S). For a Gaussian pulse of mass m at tᵢ the integral
+    from 0 to t is an exponentially-modified Gaussian:
+
+        m·e^(−u/τ + σ²/2τ²)·[Φ(u/σ − σ/τ) − Φ(−tᵢ/σ − σ/τ)],  u = t − tᵢ
+
+    Grid points within SETTLE_SIGMAS·σ of a pulse use that formula directly.
+    Past that window Φ(·) = 1 to machine precision, so the settled pulse is a
+    pure exponential and is handed to the recurrence at its first grid point.
+    """
+    taus = np.asarray(taus, dtype=float)
+    response = np.zeros((len(t_eval), len(taus)), dtype=float)
+    if len(times) == 0 or len(t_eval) == 0:
+        return response
+
+    reach = SETTLE_SIGMAS * sigma
+    shift = sigma / taus
+    growth = np.exp(0.5 * shift * shift)
+    mass = _settled_mass(times, magnitudes, taus, sigma)
+
+    # Active pulses: exact EMG on the few grid points inside the window.
+    lo = np.searchsorted(t_eval, times - reach, side="right")
+    settle = np.searchsorted(t_eval, times + reach, side="left")
+    counts = settle - lo
+    if counts.sum() > 0:
+        owner = np.repeat(np.arange(len(times)), counts)
+        starts = np.repeat(lo - np.cumsum(counts) + counts, counts)
+        grid_idx = np.arange(counts.sum()) + starts
+        u = (t_eval[grid_idx] - times[owner])[:, None]
+        near = (
+            magnitudes[owner]
+            * np.exp(-u / taus) * growth
+            * (ndtr(u / sigma - shift) - ndtr(-times[owner, None] / sigma - shift))
+        )
+        for col in range(len(taus)):
+            response[:, col] += np.bincount(grid_idx, weights=near[:, col], minlength=len(t_eval))
+
+    # Settled pulses: inject once, then carry forward by exponential decay.
+    landed = settle < len(t_eval)
+    if np.any(landed):
+        k = settle[landed]
+        injected = mass[landed] * np.exp(-(t_eval[k] - times[landed])[:, None] / taus)
+        steps = np.diff(t_eval)
+        for col in range(len(taus)):
+            increments = np.bincount(k, weights=injected[:, col], minlength=len(t_eval))
+            response[:, col] += _linear_recurrence(increments, np.exp(-steps / taus[col]))
+
+    return response
+
+
+def _closed_form_response(
+    times: np.ndarray,
+    magnitudes: np.ndarray,
+    tau: float,
+    t_eval: np.ndarray,
+    sigma: float = PULSE_SIGMA,
+) -> np.ndarray:
+    """Single-state convenience wrapper around _closed_form_responses."""
+    return _closed_form_responses(times, magnitudes[:, None], np.array([tau]), t_eval, sigma)[:, 0]
+
+
+def _first_local_peak(timeline: np.ndarray, performance: np.ndarray) -> int | None:
+    """Index of the first future point that is ≥ both neighbours, if any.
+
+    The last point is compared against itself on the right, matching the
+    original scalar scan.
+    """
+    if len(performance) < 2:
+        return None
+    following = np.append(performance[2:], performance[-1])
+    is_peak = (
+        (timeline[1:] > 0)
+        & (performance[1:] >= performance[:-1])
+        & (performance[1:] >= following)
+    )
+    hits = np.flatnonzero(is_peak)
+    return int(hits[0]) + 1 if len(hits) else None
+
+
+def _evaluation_grid(last_impulse_t: float, forecast_window: float, dt: float) -> tuple[np.ndarray, float]:
+    """Uniform dt grid from 0 through t_end, closed with t_end itself."""
+    t_end = last_impulse_t + forecast_window
+    t_eval = np.arange(0.0, t_end + dt, dt)
+    t_eval = t_eval[t_eval <= t_end]
+    if len(t_eval) == 0 or t_eval[-1] < t_end:
+        t_eval = np.append(t_eval, t_end)
+    return t_eval, t_end
+
+
 def _solve_banister_trajectory(
     impulses: list[TrainingImpulse],
     params: BanisterParams,
     forecast_hours: float,
     dt: float = 1.0,
+    solver: str = "ode",
 ) -> dict:
-    """Solve the full Banister trajectory from the first impulse through forecast."""
+    """Solve the full Banister trajectory from the first impulse through forecast.
+
+    solver="ode" integrates with RK45; solver="recursive" evaluates the exact
+    closed-form solution in O(N + T).
+    """
+    if solver not in BANISTER_SOLVERS:
+        raise ValueError(f"Unknown Banister solver: {solver}")
+
     forecast_window = max(float(forecast_hours), 24.0)
 
     if not impulses:
@@ -115,11 +299,23 @@ def _solve_banister_trajectory(
             "current_index": 0,
         }
 
+    if solver == "recursive":
+        times, magnitudes = _impulse_arrays(impulses)
+        last_impulse_t = float(times[-1])
+        t_eval, _ = _evaluation_grid(last_impulse_t, forecast_window, dt)
+        fitness = _closed_form_response(times, magnitudes, params.tau1, t_eval)
+        fatigue = _closed_form_response(times, magnitudes, params.tau2, t_eval)
+        current_index = int(np.searchsorted(t_eval, last_impulse_t, side="left"))
+        return {
+            "timeline": t_eval,
+            "fitness": fitness,
+            "fatigue": fatigue,
+            "performance": params.p0 + params.k1 * fitness - params.k2 * fatigue,
+            "current_index": min(max(current_index, 0), len(t_eval) - 1),
+        }
+
     normalized_impulses, last_impulse_t = _normalize_impulses(impulses)
-    t_end = last_impulse_t + forecast_window
-    t_eval = np.arange(0.0, t_end + dt, dt)
-    if len(t_eval) == 0 or t_eval[-1] < t_end:
-        t_eval = np.append(t_eval, t_end)
+    t_eval, t_end = _evaluation_grid(last_impulse_t, forecast_window, dt)
 
     w_func = _build_impulse_function(normalized_impulses)
 
@@ -150,117 +346,581 @@ def solve_banister(
     params: BanisterParams,
     t_end: float,
     dt: float = 1.0,
+    solver: str = "ode",
+    output: TimelineOutput | None = None,
 ) -> BanisterResponse:
     """Solve the Banister model forward in time.
 
     Returns the current-to-future timeline of Fitness, Fatigue, and predicted
-    Performance, anchored at the most recent training session.
+    Performance, anchored at the most recent training session. `output`
+    controls downsampling and encoding of the returned series.
     """
-    trajectory = _solve_banister_trajectory(impulses, params, t_end, dt=dt)
+    trajectory = _solve_banister_trajectory(impulses, params, t_end, dt=dt, solver=solver)
+    return _format_banister_response(trajectory, output)
+
+
+def _format_banister_response(trajectory: dict, output: TimelineOutput | None = None) -> BanisterResponse:
     current_index = trajectory["current_index"]
     full_timeline = trajectory["timeline"]
-    timeline = (full_timeline[current_index:] - full_timeline[current_index]).tolist()
-    fitness = trajectory["fitness"][current_index:].tolist()
-    fatigue = trajectory["fatigue"][current_index:].tolist()
-    performance = trajectory["performance"][current_index:].tolist()
-
-    peak_idx = int(np.argmax(performance)) if performance else 0
-    peak_hour = timeline[peak_idx] if performance else None
-
-    optimal_next = None
-    for i, t in enumerate(timeline):
-        if t <= 0 or i == 0:
-            continue
-        prev_perf = performance[i - 1]
-        next_perf = performance[i + 1] if i + 1 < len(performance) else performance[i]
-        if performance[i] >= prev_perf and performance[i] >= next_perf:
-            optimal_next = t
-            break
+    timeline = full_timeline[current_index:] - full_timeline[current_index]
+    series = {
+        "fitness": trajectory["fitness"][current_index:],
+        "fatigue": trajectory["fatigue"][current_index:],
+        "performance": trajectory["performance"][current_index:],
+    }
+    performance = series["performance"]
+
+    # Peak and optimal hours come from the full-resolution curve so that
+    # downsampling never moves them.
+    peak_idx = int(np.argmax(performance)) if len(performance) else None
+    peak_hour = float(timeline[peak_idx]) if peak_idx is not None else None
+
+    optimal_idx = _first_local_peak(timeline, performance)
+    optimal_next = float(timeline[optimal_idx]) if optimal_idx is not None else None
+
+    keep = select_output_indices(timeline, performance, output, keep=[peak_idx, optimal_idx])
+    if keep is not None:
+        timeline = timeline[keep]
+        series = {name: values[keep] for name, values in series.items()}
+
+    columns = {"timeline_hours": (timeline, 1), "fitness": (series["fitness"], 2),
+               "fatigue": (series["fatigue"], 2), "performance": (series["performance"], 1)}
+    encoded = None
+    if output is not None and output.encoding != "json":
+        encoded = {name: encode_series(values, output.encoding, decimals)
+                   for name, (values, decimals) in columns.items()}
+        lists = {name: [] for name in columns}
+    else:
+        lists = {name: np.round(values, decimals).tolist() for name, (values, decimals) in columns.items()}
 
     return BanisterResponse(
-        timeline_hours=[round(t, 1) for t in timeline],
-        fitness=[round(f, 2) for f in fitness],
-        fatigue=[round(f, 2) for f in fatigue],
-        performance=[round(p, 1) for p in performance],
+        **lists,
         next_optimal_session_hour=round(optimal_next, 1) if optimal_next is not None else None,
         predicted_peak_performance_hour=round(peak_hour, 1) if peak_hour is not None else None,
+        encoded=encoded,
     )
 
 
-def optimize_banister_params(
+def compare_banister_solvers(
+    impulses: list[TrainingImpulse],
+    params: BanisterParams,
+    forecast_hours: float = 168.0,
+    dt: float = 1.0,
+) -> dict:
+    """Parity check: run the ODE and recursive solvers on the same input.
+
+    Returns the maximum absolute deviation per series. The recursive solver is
+    exact, so any deviation is the RK45 integration error of the ODE path.
+    """
+    ode = _solve_banister_trajectory(impulses, params, forecast_hours, dt=dt, solver="ode")
+    rec = _solve_banister_trajectory(impulses, params, forecast_hours, dt=dt, solver="recursive")
+
+    deviations = {
+        key: float(np.max(np.abs(ode[key] - rec[key]))) if len(ode[key]) else 0.0
+        for key in ("fitness", "fatigue", "performance")
+    }
+    return {
+        "points": len(rec["timeline"]),
+        "max_abs_deviation": deviations,
+        "current_index_match": ode["current_index"] == rec["current_index"],
+    }
+
+
+def _kernel_at(
+    times: np.ndarray,
+    tau: float,
+    t_obs: np.ndarray,
+    sigma: float = PULSE_SIGMA,
+) -> tuple[np.ndarray, np.ndarray]:
+    """(M, N) unit-impulse responses and their ∂/∂τ at t_obs.
+
+    Same exponentially-modified Gaussian as _closed_form_responses, evaluated
+    directly per (observation, impulse) pair. Differentiating the kernel gives
+
+        ∂h/∂τ = E·[(u/τ² − σ²/τ³)·(Φ(a) − Φ(b)) + (φ(a) − φ(b))·σ/τ²]
+
+    with E = e^(−u/τ + σ²/2τ²), a = u/σ − σ/τ, b = −tᵢ/σ − σ/τ.
+    """
+    u = t_obs[:, None] - times[None, :]
+    active = u > -SETTLE_SIGMAS * sigma
+    shift = sigma / tau
+
+    a = u / sigma - shift
+    b = -times[None, :] / sigma - shift
+    envelope = np.exp(np.where(active, -u / tau + 0.5 * shift * shift, -np.inf))
+    window = ndtr(a) - ndtr(b)
+    density = (np.exp(-0.5 * a * a) - np.exp(-0.5 * b * b)) / np.sqrt(2 * np.pi)
+
+    value = envelope * window
+    d_tau = envelope * ((u / tau**2 - sigma**2 / tau**3) * window + density * sigma / tau**2)
+    return value, d_tau
+
+
+def _response_at(
+    times: np.ndarray,
+    magnitudes: np.ndarray,
+    tau: float,
+    t_obs: np.ndarray,
+    sigma: float = PULSE_SIGMA,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Closed-form response X(t) and ∂X/∂τ evaluated only at t_obs (O(M·N))."""
+    value, d_tau = _kernel_at(times, tau, t_obs, sigma)
+    return value @ magnitudes, d_tau @ magnitudes
+
+
+def fit_banister_params(
     impulses: list[TrainingImpulse],
     performance_observations: list[dict],
     initial_params: BanisterParams | None = None,
-) -> BanisterParams:
-    """Fit Banister parameters to actual performance data.
+) -> tuple[BanisterParams, BanisterFitDiagnostics | None]:
+    """Fit Banister parameters with L-BFGS-B and an analytic gradient.
 
-    Uses Nelder-Mead optimization to minimize the squared error between
-    model predictions and observed performance outcomes (e.g. 1RM estimates,
-    readiness scores, or battery calibration values).
+    The model is evaluated in closed form only at the observation times, so
+    each objective call costs O(M·N) instead of a full ODE solve. Bounds
+    mirror the legacy clamps (k ≥ 0.01, τ₁ ≥ 5, τ₂ ≥ 2) and τ₁ ≥ τ₂ + 1 is
+    enforced with a quadratic penalty, since L-BFGS-B only supports boxes.
 
     performance_observations: [{"time_hours": float, "performance": float}, ...]
+    with time_hours measured from the first impulse.
     """
     params = initial_params or BanisterParams()
 
     if not performance_observations or len(performance_observations) < 3:
-        return params
-
-    obs_times = np.array([o["time_hours"] for o in performance_observations])
-    obs_perf = np.array([o["performance"] for o in performance_observations])
-    t_end = float(np.max(obs_times)) + 24
-
-    def objective(x):
-        trial = BanisterParams(
-            p0=x[0],
-            k1=max(0.01, x[1]),
-            k2=max(0.01, x[2]),
-            tau1=max(5.0, x[3]),
-            tau2=max(2.0, min(x[3] - 1, x[4])),
-        )
-
-        try:
-            trajectory = _solve_banister_trajectory(impulses, trial, t_end, dt=1.0)
-        except Exception:
-            return 1e10
-
-        predicted = []
-        for t_obs in obs_times:
-            idx = int(round(t_obs))
-            idx = max(0, min(idx, len(trajectory["performance"]) - 1))
-            predicted.append(float(trajectory["performance"][idx]))
-
-        predicted = np.array(predicted)
-        return float(np.sum((predicted - obs_perf) ** 2))
-
-    x0 = [params.p0, params.k1, params.k2, params.tau1, params.tau2]
+        return params, None
+
+    started = time.perf_counter()
+    times, magnitudes = _impulse_arrays(impulses)
+    obs_times = np.array([float(o["time_hours"]) for o in performance_observations])
+    obs_perf = np.array([float(o["performance"]) for o in performance_observations])
+    penalty_weight = 1e4
+
+    def objective(x: np.ndarray) -> tuple[float, np.ndarray]:
+        p0, k1, k2, tau1, tau2 = x
+        fitness, d_fitness = _response_at(times, magnitudes, tau1, obs_times)
+        fatigue, d_fatigue = _response_at(times, magnitudes, tau2, obs_times)
+        residual = p0 + k1 * fitness - k2 * fatigue - obs_perf
+
+        loss = float(residual @ residual)
+        grad = 2.0 * np.array([
+            residual.sum(),
+            residual @ fitness,
+            -(residual @ fatigue),
+            k1 * (residual @ d_fitness),
+            -k2 * (residual @ d_fatigue),
+        ])
+
+        overlap = tau2 - tau1 + 1.0
+        if overlap > 0:
+            loss += penalty_weight * overlap**2
+            grad[3] -= 2.0 * penalty_weight * overlap
+            grad[4] += 2.0 * penalty_weight * overlap
+        return loss, grad
+
+    x0 = np.array([params.p0, params.k1, params.k2, params.tau1, params.tau2], dtype=float)
+    bounds = [(None, None), (0.01, None), (0.01, None), (5.0, None), (2.0, None)]
+    x0 = np.array([np.clip(v, lo, hi) for v, (lo, hi) in zip(x0, bounds)])
 
     result = minimize(
         objective,
         x0,
-        method="Nelder-Mead",
-        options={"maxiter": 500, "xatol": 0.1, "fatol": 0.5},
+        jac=True,
+        method="L-BFGS-B",
+        bounds=bounds,
+        options={"maxiter": 200},
     )
 
-    if result.success or result.fun < objective(x0):
+    diagnostics = BanisterFitDiagnostics(
+        method="L-BFGS-B",
+        iterations=int(result.nit),
+        function_evaluations=int(result.nfev),
+        fit_time_ms=round((time.perf_counter() - started) * 1000, 2),
+        loss=round(float(result.fun), 4),
+        converged=bool(result.success),
+    )
+
+    if result.success or result.fun < objective(x0)[0]:
         x = result.x
+        tau1 = max(5.0, float(x[3]))
         return BanisterParams(
             p0=round(float(x[0]), 1),
             k1=round(max(0.01, float(x[1])), 3),
             k2=round(max(0.01, float(x[2])), 3),
-            tau1=round(max(5.0, float(x[3])), 1),
-            tau2=round(max(2.0, float(x[4])), 1),
-        )
+            tau1=round(tau1, 1),
+            tau2=round(max(2.0, min(tau1 - 1, float(x[4]))), 1),
+        ), diagnostics
+
+    return params, diagnostics
+
+
+def optimize_banister_params(
+    impulses: list[TrainingImpulse],
+    performance_observations: list[dict],
+    initial_params: BanisterParams | None = None,
+) -> BanisterParams:
+    """Fit Banister parameters to actual performance data.
+
+    Minimizes the squared error between model predictions and observed
+    performance outcomes (e.g. 1RM estimates, readiness scores, or battery
+    calibration values). See fit_banister_params for the optimizer details.
 
+    performance_observations: [{"time_hours": float, "performance": float}, ...]
+    """
+    params, _ = fit_banister_params(impulses, performance_observations, initial_params)
     return params
 
 
+# ═══════════════════════════════════════════════════════════════════
+# ROSTER-SCALE BATCH SOLVER
+# ═══════════════════════════════════════════════════════════════════
+
+def _solve_roster_chunk(
+    athletes: list[RosterAthlete],
+    forecast_hours: float,
+    include_timelines: bool,
+    dt: float = 1.0,
+) -> list[BanisterAthleteSummary]:
+    """Solve many athletes at once on a padded (athletes × hours) grid.
+
+    All impulses are concatenated with a segment id per athlete. Settled
+    amplitudes at each athlete's last impulse are one bincount per state,
+    the forecast is a broadcast exponential, and pulses still rising at the
+    last impulse are corrected exactly as in _checkpoint_states. The grid and
+    summaries match solve_banister(solver="recursive") athlete by athlete.
+    """
+    summaries: dict[int, BanisterAthleteSummary] = {}
+    active: list[int] = []
+    for i, athlete in enumerate(athletes):
+        if athlete.training_history:
+            active.append(i)
+        else:
+            summaries[i] = _roster_summary(
+                athlete, solve_banister([], athlete.params, forecast_hours, dt=dt, solver="recursive"),
+                include_timelines,
+            )
+
+    if active:
+        arrays = [_impulse_arrays(athletes[i].training_history) for i in active]
+        lengths = np.array([len(times) for times, _ in arrays])
+        seg = np.repeat(np.arange(len(active)), lengths)
+        times = np.concatenate([times for times, _ in arrays])
+        magnitudes = np.concatenate([mags for _, mags in arrays])
+
+        params = [athletes[i].params for i in active]
+        taus = np.array([[p.tau1, p.tau2] for p in params])
+        p0 = np.array([p.p0 for p in params])[:, None]
+        k1 = np.array([p.k1 for p in params])[:, None]
+        k2 = np.array([p.k2 for p in params])[:, None]
+
+        t_last = times[np.cumsum(lengths) - 1]
+        shift = PULSE_SIGMA / taus[seg]
+        mass = magnitudes[:, None] * np.exp(0.5 * shift * shift) * (1.0 - ndtr(-times[:, None] / PULSE_SIGMA - shift))
+        decayed = mass * np.exp(-(t_last[seg] - times)[:, None] / taus[seg])
+        amplitudes = np.column_stack([
+            np.bincount(seg, weights=decayed[:, s], minlength=len(active)) for s in range(2)
+        ])
+
+        # Same grid as _forecast_grid: k·dt points from the first one at/after
+        # the last impulse, closed with t_end.
+        t_end = t_last + max(float(forecast_hours), 24.0)
+        k0 = np.ceil(t_last / dt)
+        k0 = np.where((k0 - 1) * dt >= t_last, k0 - 1, k0)
+        width = int(np.max(np.floor((t_end - k0 * dt) / dt))) + 3
+        grid = (k0[:, None] + np.arange(width)) * dt
+        valid = grid <= t_end[:, None]
+        n_valid = valid.sum(axis=1)
+        rows = np.arange(len(active))
+        open_end = grid[rows, n_valid - 1] < t_end
+        grid[rows[open_end], n_valid[open_end]] = t_end[open_end]
+        valid[rows[open_end], n_valid[open_end]] = True
+        n_valid = n_valid + open_end
+
+        states = amplitudes[:, None, :] * np.exp(-(grid - t_last[:, None])[:, :, None] / taus[:, None, :])
+        tail = times > t_last[seg] - SETTLE_SIGMAS * PULSE_SIGMA
+        if np.any(tail):
+            tail_seg = seg[tail]
+            tail_shift = shift[tail][:, None, :]
+            u = (grid[tail_seg] - times[tail][:, None])[:, :, None]
+            pending = np.where(
+                u < SETTLE_SIGMAS * PULSE_SIGMA,
+                np.exp(-u / taus[tail_seg][:, None, :] + 0.5 * tail_shift * tail_shift)
+                * ndtr(tail_shift - u / PULSE_SIGMA),
+                0.0,
+            )
+            np.add.at(states, tail_seg, -pending * magnitudes[tail][:, None, None])
+
+        fitness, fatigue = states[:, :, 0], states[:, :, 1]
+        performance = p0 + k1 * fitness - k2 * fatigue
+        hours = grid - grid[:, :1]
+
+        masked = np.where(valid, performance, -np.inf)
+        peak_idx = np.argmax(masked, axis=1)
+        inner = np.arange(1, width - 1)
+        following = np.where(inner + 1 < n_valid[:, None], masked[:, 2:], masked[:, 1:-1])
+        is_peak = (
+            (inner < n_valid[:, None])
+            & (hours[:, 1:-1] > 0)
+            & (masked[:, 1:-1] >= masked[:, :-2])
+            & (masked[:, 1:-1] >= following)
+        )
+        has_peak = is_peak.any(axis=1)
+        optimal_idx = np.argmax(is_peak, axis=1) + 1
+
+        for row, i in enumerate(active):
+            timeline = None
+            if include_timelines:
+                n = n_valid[row]
+                timeline = _format_banister_response({
+                    "timeline": grid[row, :n],
+                    "fitness": fitness[row, :n],
+                    "fatigue": fatigue[row, :n],
+                    "performance": performance[row, :n],
+                    "current_index": 0,
+                })
+            summaries[i] = BanisterAthleteSummary(
+                athlete_id=athletes[i].athlete_id,
+                current_performance=round(float(performance[row, 0]), 1),
+                current_fitness=round(float(fitness[row, 0]), 2),
+                current_fatigue=round(float(fatigue[row, 0]), 2),
+                peak_performance=round(float(masked[row, peak_idx[row]]), 1),
+                predicted_peak_performance_hour=round(float(hours[row, peak_idx[row]]), 1),
+                next_optimal_session_hour=round(float(hours[row, optimal_idx[row]]), 1) if has_peak[row] else None,
+                timeline=timeline,
+            )
+
+    return [summaries[i] for i in range(len(athletes))]
+
+
+def _roster_summary(
+    athlete: RosterAthlete,
+    response: BanisterResponse,
+    include_timelines: bool,
+) -> BanisterAthleteSummary:
+    peak = max(response.performance)
+    return BanisterAthleteSummary(
+        athlete_id=athlete.athlete_id,
+        current_performance=response.performance[0],
+        current_fitness=response.fitness[0],
+        current_fatigue=response.fatigue[0],
+        peak_performance=peak,
+        predicted_peak_performance_hour=response.predicted_peak_performance_hour,
+        next_optimal_session_hour=response.next_optimal_session_hour,
+        timeline=response if include_timelines else None,
+    )
+
+
+def solve_banister_roster(
+    athletes: list[RosterAthlete],
+    forecast_hours: float = 168.0,
+    include_timelines: bool = False,
+    workers: int = 1,
+) -> BanisterRosterResponse:
+    """Project fitness/fatigue for a whole roster in one call.
+
+    The roster is solved as one vectorized batch. With workers > 1 it is
+    split into contiguous chunks fanned out over the shared process pool,
+    which pays off once the roster is large enough to amortize the transfer.
+    """
+    started = time.perf_counter()
+    workers = clamp_workers(workers, len(athletes))
+
+    if workers == 1:
+        summaries = _solve_roster_chunk(athletes, forecast_hours, include_timelines)
+    else:
+        bounds = np.linspace(0, len(athletes), workers + 1).astype(int)
+        chunks = [athletes[lo:hi] for lo, hi in zip(bounds[:-1], bounds[1:])]
+        results = shared_pool().map(
+            _solve_roster_chunk,
+            chunks,
+            [forecast_hours] * len(chunks),
+            [include_timelines] * len(chunks),
+        )
+        summaries = [summary for chunk in results for summary in chunk]
+
+    return BanisterRosterResponse(
+        athletes=summaries,
+        solve_time_ms=round((time.perf_counter() - started) * 1000, 2),
+    )
+
+
+# ═══════════════════════════════════════════════════════════════════
+# TAPER / PEAKING PLANNER
+# ═══════════════════════════════════════════════════════════════════
+
+TAPER_BATCH_SIZE = 4096
+
+
+def _expand_weekly_template(
+    template: list[TemplateSession],
+    plan_start: float,
+    competition_hour: float,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Repeat the weekly template from plan_start up to (excluding) competition."""
+    if not template:
+        return np.zeros(0), np.zeros(0), np.zeros(0, dtype=bool)
+
+    offsets = np.array([s.day_offset_hours for s in template])
+    weeks = np.arange(int(np.ceil((competition_hour - plan_start) / 168.0)) + 1)
+    times = (plan_start + weeks[:, None] * 168.0 + offsets[None, :]).ravel()
+    magnitudes = np.tile([s.impulse for s in template], len(weeks))
+    heavy = np.tile([s.heavy for s in template], len(weeks))
+
+    keep = (times > plan_start) & (times < competition_hour)
+    order = np.argsort(times[keep], kind="stable")
+    return times[keep][order], magnitudes[keep][order], heavy[keep][order]
+
+
+def plan_taper(
+    impulses: list[TrainingImpulse],
+    params: BanisterParams,
+    competition_hour: float,
+    template: list[TemplateSession],
+    plan_start_hour: float | None = None,
+    taper_days_options: list[int] | None = None,
+    volume_reduction_options: list[float] | None = None,
+    last_heavy_days_options: list[int] | None = None,
+    top_k: int = 5,
+) -> TaperPlanResponse:
+    """Search taper schedules that maximize performance on competition day.
+
+    A schedule is the weekly template repeated up to the competition with:
+        - every session inside the last taper_days scaled by (1 − reduction)
+        - heavy sessions dropped inside the last last_heavy_days_out days
+
+    Performance at a fixed target hour is linear in the planned impulses,
+    so each slot gets one weight w = k₁·h(τ₁) − k₂·h(τ₂) and a candidate
+    scores base + (m ⊙ scale)·w. Candidates are scored in matrix batches,
+    which keeps a few thousand schedules well under a second.
+    """
+    started = time.perf_counter()
+    if taper_days_options is None:
+        taper_days_options = list(range(0, 22))
+    if volume_reduction_options is None:
+        volume_reduction_options = [round(0.05 * i, 2) for i in range(0, 17)]
+    if last_heavy_days_options is None:
+        last_heavy_days_options = list(range(0, 15))
+
+    if impulses:
+        last_impulse = max(imp.timestamp_hours for imp in impulses)
+        origin = _history_origin(impulses)
+    else:
+        last_impulse = None
+        origin = None
+    plan_start = plan_start_hour if plan_start_hour is not None else (
+        last_impulse if last_impulse is not None else competition_hour - 4 * 168.0
+    )
+    origin = origin if origin is not None else plan_start
+
+    target = np.array([competition_hour - origin])
+    base = params.p0
+    if impulses:
+        times, magnitudes = _impulse_arrays(impulses)
+        fitness, _ = _response_at(times, magnitudes, params.tau1, target)
+        fatigue, _ = _response_at(times, magnitudes, params.tau2, target)
+        base += params.k1 * float(fitness[0]) - params.k2 * float(fatigue[0])
+
+    slot_times, slot_magnitudes, slot_heavy = _expand_weekly_template(template, plan_start, competition_hour)
+    rel_times = slot_times - origin
+    fitness_kernel, _ = _kernel_at(rel_times, params.tau1, target)
+    fatigue_kernel, _ = _kernel_at(rel_times, params.tau2, target)
+    weights = slot_magnitudes * (params.k1 * fitness_kernel[0] - params.k2 * fatigue_kernel[0])
+    days_out = (competition_hour - slot_times) / 24.0
+
+    axes = [
+        np.asarray(taper_days_options, dtype=float),
+        np.asarray(volume_reduction_options, dtype=float),
+        np.asarray(last_heavy_days_options, dtype=float),
+    ]
+    shape = tuple(len(axis) for axis in axes)
+    n_candidates = math.prod(shape)
+    if n_candidates == 0:
+        raise ValueError("Every taper option list needs at least one value")
+    if n_candidates > TAPER_MAX_CANDIDATES:
+        raise ValueError(f"Taper grid of {n_candidates} candidates exceeds {TAPER_MAX_CANDIDATES}")
+
+    def grid(flat: np.ndarray) -> np.ndarray:
+        # Rows of the (taper_days, reduction, last_heavy) product, built per batch.
+        return np.column_stack([axis[i] for axis, i in zip(axes, np.unravel_index(flat, shape))])
+
+    scores = np.empty(n_candidates)
+    for lo in range(0, n_candidates, TAPER_BATCH_SIZE):
+        hi = min(lo + TAPER_BATCH_SIZE, n_candidates)
+        scores[lo:hi] = base + _taper_scales(grid(np.arange(lo, hi)), days_out, slot_heavy) @ weights
+
+    baseline = base + float(weights.sum())
+    ranked = np.argsort(-scores, kind="stable")[:max(1, top_k)]
+    ranked_grid = grid(ranked)
+    candidates = [
+        TaperCandidate(
+            taper_days=int(row[0]),
+            volume_reduction=round(float(row[1]), 3),
+            last_heavy_days_out=int(row[2]),
+            predicted_performance=round(float(scores[i]), 2),
+        )
+        for i, row in zip(ranked, ranked_grid)
+    ]
+
+    best_scale = _taper_scales(ranked_grid[:1], days_out, slot_heavy)[0]
+    planned = [
+        TrainingImpulse(timestamp_hours=round(float(t), 2), impulse=round(float(m), 2))
+        for t, m in zip(slot_times, slot_magnitudes * best_scale)
+        if m > 0
+    ]
+
+    return TaperPlanResponse(
+        best=candidates[0],
+        baseline_performance=round(baseline, 2),
+        predicted_gain=round(candidates[0].predicted_performance - baseline, 2),
+        top_candidates=candidates,
+        planned_sessions=planned,
+        candidates_evaluated=n_candidates,
+        search_time_ms=round((time.perf_counter() - started) * 1000, 2),
+    )
+
+
+def _taper_scales(candidates: np.ndarray, days_out: np.ndarray, heavy: np.ndarray) -> np.ndarray:
+    """(C, J) multipliers per candidate (taper_days, reduction, last_heavy) and slot."""
+    taper_days, reduction, last_heavy = candidates[:, 0:1], candidates[:, 1:2], candidates[:, 2:3]
+    scale = np.where(days_out[None, :] <= taper_days, 1.0 - reduction, 1.0)
+    return np.where(heavy[None, :] & (days_out[None, :] <= last_heavy), 0.0, scale)
+
+
 # ═══════════════════════════════════════════════════════════════════
 # EXTENDED 3-SYSTEM BANISTER (AUGE-SPECIFIC)
 # ═══════════════════════════════════════════════════════════════════
 
+AUGE_SYSTEMS: dict[str, BanisterParams] = {
+    "muscular": BanisterParams(p0=100, k1=0.8, k2=1.5, tau1=42*24, tau2=12*24),
+    "cns": BanisterParams(p0=100, k1=1.0, k2=2.0, tau1=35*24, tau2=8*24),
+    "spinal": BanisterParams(p0=100, k1=0.5, k2=1.2, tau1=60*24, tau2=20*24),
+}
+AUGE_SYSTEM_WEIGHTS = np.array([0.4, 0.35, 0.25])
+AUGE_DT_HOURS = 6.0
+
+
+def _auge_impulse_matrix(impulses: list[TrainingImpulse]) -> tuple[np.ndarray, np.ndarray]:
+    """Zero-based sorted times and an (N, 3) muscular/CNS/spinal impulse matrix.
+
+    Missing CNS and spinal impulses fall back to 80% and 60% of the muscular
+    impulse respectively.
+    """
+    if not impulses:
+        return np.zeros(0), np.zeros((0, len(AUGE_SYSTEMS)))
+
+    raw = np.array([
+        [float(imp.timestamp_hours), float(imp.impulse), float(imp.cns_impulse or 0.0), float(imp.spinal_impulse or 0.0)]
+        for imp in impulses
+    ])
+    raw = raw[np.argsort(raw[:, 0], kind="stable")]
+    muscular = raw[:, 1]
+    cns = np.where(raw[:, 2] != 0, raw[:, 2], muscular * 0.8)
+    spinal = np.where(raw[:, 3] != 0, raw[:, 3], muscular * 0.6)
+    return raw[:, 0] - raw[0, 0], np.column_stack([muscular, cns, spinal])
+
+
 def solve_auge_banister(
     impulses: list[TrainingImpulse],
     forecast_hours: float = 168.0,
+    output: TimelineOutput | None = None,
 ) -> dict:
     """Solve the extended 3-system Banister model for AUGE.
 
@@ -270,66 +930,88 @@ def solve_auge_banister(
     Muscular: τ₁=42d, τ₂=12d (muscle adaptation is slow, fatigue clears fast)
     CNS:      τ₁=35d, τ₂=8d  (neural adaptation moderate, fatigue clears fastest)
     Spinal:   τ₁=60d, τ₂=20d (connective tissue adapts slowest, fatigue lingers)
+
+    The three systems are the columns of one impulse matrix, so all six
+    fitness/fatigue states come out of a single closed-form pass.
     """
-    systems = {
-        "muscular": BanisterParams(p0=100, k1=0.8, k2=1.5, tau1=42*24, tau2=12*24),
-        "cns": BanisterParams(p0=100, k1=1.0, k2=2.0, tau1=35*24, tau2=8*24),
-        "spinal": BanisterParams(p0=100, k1=0.5, k2=1.2, tau1=60*24, tau2=20*24),
-    }
+    times, matrix = _auge_impulse_matrix(impulses)
+    t_eval, current_index = _forecast_grid(times, forecast_hours, AUGE_DT_HOURS)
+    taus = np.array([p.tau1 for p in AUGE_SYSTEMS.values()] + [p.tau2 for p in AUGE_SYSTEMS.values()])
+    states = _closed_form_responses(times, np.hstack([matrix, matrix]), taus, t_eval)[current_index:]
+    return _format_auge_response(t_eval[current_index:], states[:, :3], states[:, 3:], output)
+
+
+def _forecast_grid(times: np.ndarray, forecast_hours: float, dt: float) -> tuple[np.ndarray, int]:
+    """Evaluation grid and the index of the first point at/after the last impulse."""
+    forecast_window = max(float(forecast_hours), 24.0)
+    if not len(times):
+        return np.arange(0.0, forecast_window + dt, dt), 0
+    t_eval, _ = _evaluation_grid(float(times[-1]), forecast_window, dt)
+    return t_eval, min(int(np.searchsorted(t_eval, times[-1], side="left")), len(t_eval) - 1)
+
+
+def _format_auge_response(
+    t_future: np.ndarray,
+    fitness: np.ndarray,
+    fatigue: np.ndarray,
+    output: TimelineOutput | None = None,
+) -> dict:
+    """Build the AUGE payload from (T, 3) fitness/fatigue states from 'now' on.
+
+    Peaks, optimal hours and the verdict are read off the full curves; `output`
+    only thins/encodes what is sent back. All systems share the points
+    selected on the combined performance curve.
+    """
+    params = list(AUGE_SYSTEMS.values())
+    p0 = np.array([p.p0 for p in params])
+    k1 = np.array([p.k1 for p in params])
+    k2 = np.array([p.k2 for p in params])
+    performance = np.round(p0 + k1 * fitness - k2 * fatigue, 1)
+    timeline = np.round(t_future - t_future[0], 1)
+    combined = np.round(performance @ AUGE_SYSTEM_WEIGHTS, 1)
+
+    peak_idx = [int(np.argmax(performance[:, col])) if len(timeline) else None for col in range(len(params))]
+    optimal_idx = [_first_local_peak(timeline, performance[:, col]) for col in range(len(params))]
+    combined_optimal = _first_local_peak(timeline, combined)
+
+    keep = select_output_indices(timeline, combined, output, keep=peak_idx + optimal_idx + [combined_optimal])
+    rows = keep if keep is not None else slice(None)
+    encoding = output.encoding if output is not None else "json"
+
+    def _pack(values: np.ndarray, decimals: int):
+        values = np.round(values[rows], decimals)
+        return encode_series(values, encoding, decimals) if encoding != "json" else values.tolist()
 
     results = {}
-    for system_name, system_params in systems.items():
-        system_impulses = []
-        for imp in impulses:
-            magnitude = imp.impulse
-            if system_name == "cns":
-                magnitude = imp.cns_impulse if imp.cns_impulse else imp.impulse * 0.8
-            elif system_name == "spinal":
-                magnitude = imp.spinal_impulse if imp.spinal_impulse else imp.impulse * 0.6
-
-            system_impulses.append(TrainingImpulse(
-                timestamp_hours=imp.timestamp_hours,
-                impulse=magnitude,
-            ))
-
-        result = solve_banister(system_impulses, system_params, forecast_hours, dt=6.0)
-        results[system_name] = {
-            "timeline_hours": result.timeline_hours,
-            "fitness": result.fitness,
-            "fatigue": result.fatigue,
-            "performance": result.performance,
-            "next_optimal_session_hour": result.next_optimal_session_hour,
-            "predicted_peak_performance_hour": result.predicted_peak_performance_hour,
+    for col, system_name in enumerate(AUGE_SYSTEMS):
+        columns = {
+            "timeline_hours": _pack(timeline, 1),
+            "fitness": _pack(fitness[:, col], 2),
+            "fatigue": _pack(fatigue[:, col], 2),
+            "performance": _pack(performance[:, col], 1),
         }
+        if encoding != "json":
+            results[system_name] = {name: [] for name in columns}
+            results[system_name]["encoded"] = columns
+        else:
+            results[system_name] = columns
+        results[system_name]["next_optimal_session_hour"] = (
+            float(timeline[optimal_idx[col]]) if optimal_idx[col] is not None else None
+        )
+        results[system_name]["predicted_peak_performance_hour"] = (
+            float(timeline[peak_idx[col]]) if peak_idx[col] is not None else None
+        )
 
-    combined_perf = []
-    if results.get("muscular") and results["muscular"]["performance"]:
-        n = len(results["muscular"]["performance"])
-        for i in range(n):
-            musc = results["muscular"]["performance"][i]
-            cns = results["cns"]["performance"][i] if i < len(results["cns"]["performance"]) else 100
-            spinal = results["spinal"]["performance"][i] if i < len(results["spinal"]["performance"]) else 100
-            combined = musc * 0.4 + cns * 0.35 + spinal * 0.25
-            combined_perf.append(round(combined, 1))
-
-    optimal_window = None
-    if combined_perf:
-        timeline = results["muscular"]["timeline_hours"]
-        for i, t in enumerate(timeline):
-            if t <= 0 or i == 0 or i >= len(combined_perf):
-                continue
-            prev_perf = combined_perf[i - 1]
-            next_perf = combined_perf[i + 1] if i + 1 < len(combined_perf) else combined_perf[i]
-            if combined_perf[i] >= prev_perf and combined_perf[i] >= next_perf:
-                optimal_window = timeline[i]
-                break
-
-    return {
+    combined_perf = combined.tolist()
+    payload = {
         "systems": results,
-        "combined_performance": combined_perf,
-        "optimal_next_session_hour": optimal_window,
+        "combined_performance": _pack(combined, 1) if encoding == "json" else [],
+        "optimal_next_session_hour": float(timeline[combined_optimal]) if combined_optimal is not None else None,
         "verdict": _generate_banister_verdict(results, combined_perf),
     }
+    if encoding != "json":
+        payload["combined_performance_encoded"] = _pack(combined, 1)
+    return payload
 
 
 def _generate_banister_verdict(results: dict, combined: list[float]) -> str:
@@ -376,3 +1058,222 @@ def _generate_banister_verdict(results: dict, combined: list[float]) -> str:
             "Tu balance fitness-fatiga es estable. "
             "Sigue con tu plan actual y ajusta según el semáforo diario AUGE."
         )
+
+
+# ═══════════════════════════════════════════════════════════════════
+# INCREMENTAL STATE CHECKPOINTS
+# ═══════════════════════════════════════════════════════════════════
+
+def _history_fingerprint(origin: float, times: np.ndarray, magnitudes: np.ndarray) -> str:
+    digest = hashlib.sha1(np.float64(origin).tobytes())
+    digest.update(np.ascontiguousarray(times, dtype=float).tobytes())
+    digest.update(np.ascontiguousarray(magnitudes, dtype=float).tobytes())
+    return digest.hexdigest()
+
+
+def _history_origin(impulses: list[TrainingImpulse]) -> float:
+    return float(min(imp.timestamp_hours for imp in impulses))
+
+
+def build_banister_checkpoint(
+    times: np.ndarray,
+    magnitudes: np.ndarray,
+    taus: list[float],
+    origin: float,
+) -> BanisterStateCheckpoint:
+    """Replay a full (zero-based, sorted) history into a state checkpoint."""
+    taus_arr = np.asarray(taus, dtype=float)
+    ref = float(times[-1])
+    mass = _settled_mass(times, magnitudes, taus_arr)
+    amplitudes = (mass * np.exp(-(ref - times)[:, None] / taus_arr)).sum(axis=0)
+    tail = times > ref - SETTLE_SIGMAS * PULSE_SIGMA
+
+    return BanisterStateCheckpoint(
+        origin_hours=origin,
+        impulse_count=len(times),
+        fingerprint=_history_fingerprint(origin, times, magnitudes),
+        taus=taus_arr.tolist(),
+        ref_hours=ref,
+        amplitudes=amplitudes.tolist(),
+        tail_times=times[tail].tolist(),
+        tail_magnitudes=magnitudes[tail].tolist(),
+    )
+
+
+def advance_banister_checkpoint(
+    checkpoint: BanisterStateCheckpoint,
+    new_times: np.ndarray,
+    new_magnitudes: np.ndarray,
+    fingerprint: str,
+) -> BanisterStateCheckpoint:
+    """Advance a checkpoint by sessions logged after its reference time.
+
+    Cost is O(new impulses): the stored amplitudes decay to the newest
+    impulse and the new settled masses are added on top.
+    """
+    taus = np.asarray(checkpoint.taus, dtype=float)
+    ref = float(new_times[-1])
+    carried = np.asarray(checkpoint.amplitudes) * np.exp(-(ref - checkpoint.ref_hours) / taus)
+    mass = _settled_mass(new_times, new_magnitudes, taus)
+    amplitudes = carried + (mass * np.exp(-(ref - new_times)[:, None] / taus)).sum(axis=0)
+
+    tail_times = np.concatenate([np.asarray(checkpoint.tail_times, dtype=float), new_times])
+    tail_magnitudes = np.vstack([
+        np.asarray(checkpoint.tail_magnitudes, dtype=float).reshape(-1, len(taus)),
+        new_magnitudes,
+    ])
+    keep = tail_times > ref - SETTLE_SIGMAS * PULSE_SIGMA
+
+    return BanisterStateCheckpoint(
+        origin_hours=checkpoint.origin_hours,
+        impulse_count=checkpoint.impulse_count + len(new_times),
+        fingerprint=fingerprint,
+        taus=checkpoint.taus,
+        ref_hours=ref,
+        amplitudes=amplitudes.tolist(),
+        tail_times=tail_times[keep].tolist(),
+        tail_magnitudes=tail_magnitudes[keep].tolist(),
+    )
+
+
+def resume_banister_checkpoint(
+    checkpoint: BanisterStateCheckpoint | None,
+    times: np.ndarray,
+    magnitudes: np.ndarray,
+    taus: list[float],
+    origin: float,
+    rebuild: bool = False,
+) -> tuple[BanisterStateCheckpoint, str]:
+    """Bring a stored checkpoint in line with the submitted history.
+
+    Returns the checkpoint and how it was obtained:
+        "reused"   – history unchanged since the last call
+        "advanced" – only new sessions were appended
+        "rebuilt"  – no usable checkpoint, different τ, edited older
+                     history, or an explicit rebuild request
+    """
+    count = checkpoint.impulse_count if checkpoint else 0
+    usable = (
+        checkpoint is not None
+        and not rebuild
+        and checkpoint.origin_hours == origin
+        and len(checkpoint.taus) == len(taus)
+        and np.allclose(checkpoint.taus, taus)
+        and 0 < count <= len(times)
+        and _history_fingerprint(origin, times[:count], magnitudes[:count]) == checkpoint.fingerprint
+    )
+
+    if not usable:
+        return build_banister_checkpoint(times, magnitudes, taus, origin), "rebuilt"
+    if count == len(times):
+        return checkpoint, "reused"
+
+    fingerprint = _history_fingerprint(origin, times, magnitudes)
+    return advance_banister_checkpoint(checkpoint, times[count:], magnitudes[count:], fingerprint), "advanced"
+
+
+def _checkpoint_states(
+    checkpoint: BanisterStateCheckpoint,
+    t_eval: np.ndarray,
+    sigma: float = PULSE_SIGMA,
+) -> np.ndarray:
+    """(T, S) states at grid points at or after the checkpoint reference.
+
+    Settled impulses are a single decaying exponential per state. Pulses in
+    the tail are still rising, so each one subtracts the part of its mass
+    not yet delivered: m·e^(−u/τ + σ²/2τ²)·Φ(σ/τ − u/σ).
+    """
+    taus = np.asarray(checkpoint.taus, dtype=float)
+    states = np.asarray(checkpoint.amplitudes) * np.exp(-(t_eval - checkpoint.ref_hours)[:, None] / taus)
+    if not checkpoint.tail_times:
+        return states
+
+    shift = sigma / taus
+    tail_times = np.asarray(checkpoint.tail_times, dtype=float)
+    tail_magnitudes = np.asarray(checkpoint.tail_magnitudes, dtype=float)
+    u = (t_eval[:, None] - tail_times[None, :])[:, :, None]
+    pending = np.where(
+        u < SETTLE_SIGMAS * sigma,
+        np.exp(-u / taus + 0.5 * shift * shift) * ndtr(shift - u / sigma),
+        0.0,
+    )
+    return states - np.einsum("tks,ks->ts", pending, tail_magnitudes)
+
+
+def solve_banister_incremental(
+    impulses: list[TrainingImpulse],
+    params: BanisterParams,
+    t_end: float,
+    checkpoint: BanisterStateCheckpoint | None,
+    dt: float = 1.0,
+    rebuild: bool = False,
+    output: TimelineOutput | None = None,
+) -> tuple[BanisterResponse, BanisterStateCheckpoint | None]:
+    """solve_banister resumed from a stored checkpoint instead of a full replay.
+
+    Produces the same response as solver="recursive" plus the checkpoint to
+    persist for the next call.
+    """
+    if not impulses:
+        return solve_banister(impulses, params, t_end, dt=dt, solver="recursive", output=output), None
+
+    times, magnitudes = _impulse_arrays(impulses)
+    checkpoint, status = resume_banister_checkpoint(
+        checkpoint,
+        times,
+        np.column_stack([magnitudes, magnitudes]),
+        [params.tau1, params.tau2],
+        _history_origin(impulses),
+        rebuild=rebuild,
+    )
+
+    t_eval, current_index = _forecast_grid(times, t_end, dt)
+    t_future = t_eval[current_index:]
+    states = _checkpoint_states(checkpoint, t_future)
+    response = _format_banister_response({
+        "timeline": t_future,
+        "fitness": states[:, 0],
+        "fatigue": states[:, 1],
+        "performance": params.p0 + params.k1 * states[:, 0] - params.k2 * states[:, 1],
+        "current_index": 0,
+    }, output)
+    response.checkpoint_status = status
+    return response, checkpoint
+
+
+def solve_auge_banister_incremental(
+    impulses: list[TrainingImpulse],
+    forecast_hours: float,
+    checkpoints: dict[str, BanisterStateCheckpoint | None],
+    rebuild: bool = False,
+    output: TimelineOutput | None = None,
+) -> tuple[dict, dict[str, BanisterStateCheckpoint]]:
+    """solve_auge_banister resumed from one stored checkpoint per system."""
+    if not impulses:
+        return solve_auge_banister(impulses, forecast_hours, output), {}
+
+    times, matrix = _auge_impulse_matrix(impulses)
+    origin = _history_origin(impulses)
+    t_eval, current_index = _forecast_grid(times, forecast_hours, AUGE_DT_HOURS)
+    t_future = t_eval[current_index:]
+
+    fitness = np.empty((len(t_future), len(AUGE_SYSTEMS)))
+    fatigue = np.empty_like(fitness)
+    updated: dict[str, BanisterStateCheckpoint] = {}
+    statuses: dict[str, str] = {}
+
+    for col, (system_name, system_params) in enumerate(AUGE_SYSTEMS.items()):
+        updated[system_name], statuses[system_name] = resume_banister_checkpoint(
+            checkpoints.get(system_name),
+            times,
+            matrix[:, [col, col]],
+            [system_params.tau1, system_params.tau2],
+            origin,
+            rebuild=rebuild,
+        )
+        states = _checkpoint_states(updated[system_name], t_future)
+        fitness[:, col], fatigue[:, col] = states[:, 0], states[:, 1]
+
+    result = _format_auge_response(t_future, fitness, fatigue, output)
+    result["checkpoint_status"] = statuses
+    return result, updated
@@ -0,0 +1,43 @@
+"""Offline sparse-vs-exact GP benchmark for tuning KPKN_GP_SPARSE_THRESHOLD.
+
+Exact GP fits take minutes at the sizes where the sparse backend matters,
+so the comparison runs outside the API:
+
+    python -m engines.gp_benchmark training.json [64,128,256] [holdout_fraction]
+
+training.json holds a list of FatigueDataPoint objects, or an object with a
+"training_data" list (e.g. a saved /adaptive/fatigue/predict request body).
+The report from compare_gp_backends is printed as JSON.
+"""
+from __future__ import annotations
+
+import json
+import sys
+
+from models.adaptive import FatigueDataPoint
+from engines.adaptive_engine import GP_SPARSE_INDUCING, compare_gp_backends
+
+DEFAULT_PREDICTION_HOURS = [0, 6, 12, 18, 24, 36, 48, 60, 72, 96, 120]
+
+
+def load_training_data(path: str) -> list[FatigueDataPoint]:
+    with open(path, encoding="utf-8") as fh:
+        doc = json.load(fh)
+    rows = doc["training_data"] if isinstance(doc, dict) else doc
+    return [FatigueDataPoint(**row) for row in rows]
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        sys.exit("usage: python -m engines.gp_benchmark training.json [m1,m2,...] [holdout_fraction]")
+    inducing = (
+        [int(m) for m in sys.argv[2].split(",")] if len(sys.argv) > 2 else [64, 128, GP_SPARSE_INDUCING]
+    )
+    holdout = float(sys.argv[3]) if len(sys.argv) > 3 else 0.2
+    report = compare_gp_backends(
+        load_training_data(sys.argv[1]),
+        DEFAULT_PREDICTION_HOURS,
+        inducing_points=inducing,
+        holdout_fraction=holdout,
+    )
+    print(json.dumps(report, indent=2))
@@ -0,0 +1,232 @@
+"""Precomputed prior-GP fatigue surface for cold-start predictions.
+
+Users with fewer than GP_MIN_OBSERVATIONS observations are answered by
+the population prior GP, which is the same model for everyone. Instead of
+evaluating it per request, its posterior mean and σ are tabulated once and
+interpolated.
+
+The prior's Matérn kernel is isotropic and its synthetic training points
+only vary in hours and sleep; every other feature sits at a fixed anchor.
+So the distance from any query to any training point depends only on
+
+    (hours, sleep, D),   D = ‖other features − anchor‖
+
+and the GP posterior is an exact function of those three numbers. The
+surface is a regular (hours × sleep × D) grid. Stress, age, batteries and
+the rest all enter through D. Queries outside the grid fall back to the
+exact GP.
+
+Build the artifact ahead of deployment with:
+
+    python -m engines.gp_prior [output.npz]
+
+Otherwise it is built on first use and written to KPKN_GP_PRIOR_ARTIFACT
+(default backend/.state/models/gp_prior_v{GP_MODEL_VERSION}.npz).
+"""
+from __future__ import annotations
+
+import hashlib
+import os
+import sys
+from functools import lru_cache
+
+import numpy as np
+from sklearn.preprocessing import StandardScaler
+
+from engines.adaptive_engine import (
+    GP_MODEL_VERSION,
+    _build_prior_gp,
+    _prior_training_set,
+    _gp_query_matrix,
+    _scenario_query_matrix,
+    _fatigue_prediction_from_moments,
+    _scenario_grid_from_moments,
+    predict_fatigue_curve,
+    predict_fatigue_scenarios,
+)
+from models.adaptive import GPFatiguePrediction, GPScenarioGridResponse
+from storage.model_store import resolve_model_dir
+
+HOURS_COL = 0
+SLEEP_COL = 2
+
+PRIOR_HOURS_GRID = np.arange(0.0, 241.0, 1.0)
+PRIOR_SLEEP_GRID = np.arange(3.0, 11.01, 0.25)
+# Offsets span 0..6 length scales; past that Matérn(5/2) correlation is
+# below 1e-4 and the posterior is the far-field constant.
+PRIOR_OFFSET_LENGTH_SCALES = 6.0
+PRIOR_OFFSET_POINTS = 49
+
+
+class PriorSurface:
+    """Tabulated prior posterior (μ, σ) over (hours, sleep, offset).
+
+    All three axes are uniform, so cell lookup is arithmetic and the
+    interpolation is a trilinear blend of the 8 cell corners, gathered from
+    the flattened grid in one indexing operation.
+    """
+
+    __slots__ = ("anchor", "other_cols", "_flat", "_origin", "_step", "_cells",
+                 "_strides", "_corner_offsets", "_corner_bits")
+
+    def __init__(self, hours: np.ndarray, sleep: np.ndarray, offsets: np.ndarray,
+                 moments: np.ndarray, anchor: np.ndarray):
+        self.anchor = anchor
+        self.other_cols = np.array([c for c in range(len(anchor)) if c not in (HOURS_COL, SLEEP_COL)])
+        axes = (hours, sleep, offsets)
+        self._origin = np.array([a[0] for a in axes])
+        self._step = np.array([a[1] - a[0] for a in axes])
+        self._cells = np.array([len(a) - 1 for a in axes])
+        self._flat = np.ascontiguousarray(moments).reshape(-1, moments.shape[-1])
+        self._strides = np.array([len(sleep) * len(offsets), len(offsets), 1])
+        self._corner_bits = np.array([[(c >> 2) & 1, (c >> 1) & 1, c & 1] for c in range(8)], dtype=bool)
+        self._corner_offsets = self._corner_bits @ self._strides
+
+    def moments(self, X: np.ndarray) -> np.ndarray | None:
+        """(n, 2) array of μ, σ for raw query rows, or None if off-grid."""
+        offset = np.linalg.norm(X[:, self.other_cols] - self.anchor[self.other_cols], axis=1)
+        pos = (np.column_stack([X[:, HOURS_COL], X[:, SLEEP_COL], offset]) - self._origin) / self._step
+        if pos[:, :2].min() < 0 or np.any(pos[:, :2].max(axis=0) > self._cells[:2]):
+            return None
+        # Past the last offset the posterior is already the far-field constant.
+        pos[:, 2] = np.minimum(pos[:, 2], self._cells[2])
+
+        idx = np.minimum(pos.astype(int), self._cells - 1)
+        frac = (pos - idx)[:, None, :]
+        weights = np.where(self._corner_bits, frac, 1.0 - frac).prod(axis=2)
+        corners = self._flat[(idx @ self._strides)[:, None] + self._corner_offsets]
+        return np.einsum("nc,ncm->nm", weights, corners)
+
+
+def _prior_digest() -> str:
+    """Identifies the synthetic prior data the surface was built from."""
+    X, y = _prior_training_set()
+    digest = hashlib.sha1(f"gp-prior-v{GP_MODEL_VERSION}".encode())
+    digest.update(np.ascontiguousarray(X).tobytes())
+    digest.update(np.ascontiguousarray(y).tobytes())
+    return digest.hexdigest()
+
+
+def _prior_anchor(X: np.ndarray) -> np.ndarray:
+    """The shared value of every non-(hours, sleep) feature in the prior data."""
+    anchor = X[0].copy()
+    others = [c for c in range(X.shape[1]) if c not in (HOURS_COL, SLEEP_COL)]
+    if not np.all(X[:, others] == anchor[others]):
+        raise ValueError("Prior training data varies outside hours/sleep; surface reduction does not apply")
+    return anchor
+
+
+def build_prior_surface() -> dict:
+    """Evaluate the prior GP on the full (hours × sleep × offset) grid."""
+    gp = _build_prior_gp()
+    X_train, _ = _prior_training_set()
+    anchor = _prior_anchor(X_train)
+
+    length_scale = np.asarray(gp.kernel_.k1.k2.length_scale)
+    if length_scale.ndim != 0:
+        raise ValueError("Prior GP kernel is anisotropic; surface reduction does not apply")
+
+    offsets = np.linspace(0.0, PRIOR_OFFSET_LENGTH_SCALES * float(length_scale), PRIOR_OFFSET_POINTS)
+    hh, ss, dd = np.meshgrid(PRIOR_HOURS_GRID, PRIOR_SLEEP_GRID, offsets, indexing="ij")
+
+    # Any direction orthogonal to hours/sleep is equivalent under an isotropic
+    # kernel, so the offset is applied to a single column.
+    offset_col = next(c for c in range(len(anchor)) if c not in (HOURS_COL, SLEEP_COL))
+    X = np.tile(anchor, (hh.size, 1))
+    X[:, HOURS_COL] = hh.ravel()
+    X[:, SLEEP_COL] = ss.ravel()
+    X[:, offset_col] += dd.ravel()
+
+    mean, std = gp.predict(X, return_std=True)
+    moments = np.stack([mean, std], axis=-1).reshape(hh.shape + (2,))
+
+    return {
+        "digest": np.array(_prior_digest()),
+        "hours": PRIOR_HOURS_GRID,
+        "sleep": PRIOR_SLEEP_GRID,
+        "offsets": offsets,
+        "anchor": anchor,
+        "moments": moments.astype(np.float32),
+    }
+
+
+def resolve_prior_artifact() -> str:
+    return os.getenv("KPKN_GP_PRIOR_ARTIFACT") or os.path.join(
+        resolve_model_dir(), f"gp_prior_v{GP_MODEL_VERSION}.npz"
+    )
+
+
+def save_prior_surface(surface: dict, path: str) -> None:
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = f"{path}.tmp.npz"
+    np.savez_compressed(tmp_path, **surface)
+    os.replace(tmp_path, path)
+
+
+def _read_prior_artifact(path: str) -> dict | None:
+    try:
+        with np.load(path) as data:
+            surface = {key: data[key] for key in data.files}
+    except (OSError, ValueError):
+        return None
+    if str(surface.get("digest")) != _prior_digest():
+        return None
+    return surface
+
+
+@lru_cache(maxsize=1)
+def load_prior_surface() -> PriorSurface:
+    """Load the shipped artifact, or build and persist it on first use."""
+    path = resolve_prior_artifact()
+    surface = _read_prior_artifact(path)
+    if surface is None:
+        surface = build_prior_surface()
+        try:
+            save_prior_surface(surface, path)
+        except OSError:
+            pass
+
+    return PriorSurface(
+        surface["hours"],
+        surface["sleep"],
+        surface["offsets"],
+        surface["moments"].astype(float),
+        surface["anchor"],
+    )
+
+
+def predict_prior_fatigue_curve(
+    prediction_hours: list[float],
+    session_stress: float = 50.0,
+    context: dict | None = None,
+) -> GPFatiguePrediction:
+    """Cold-start fatigue curve, equivalent to the prior GP's prediction.
+
+    Interpolates the precomputed surface; queries outside its hours/sleep
+    range are answered by the exact prior GP.
+    """
+    X = _gp_query_matrix(prediction_hours, session_stress, context)
+    moments = load_prior_surface().moments(X) if len(X) else None
+    if moments is None:
+        return predict_fatigue_curve(
+            _build_prior_gp(), StandardScaler(), prediction_hours, session_stress, context,
+        )
+    return _fatigue_prediction_from_moments(prediction_hours, moments[:, 0], moments[:, 1])
+
+
+def predict_prior_fatigue_scenarios(
+    prediction_hours: list[float],
+    scenarios: list[tuple[float, dict]],
+) -> GPScenarioGridResponse:
+    """Cold-start what-if grid, interpolated for all scenarios at once."""
+    X = _scenario_query_matrix(prediction_hours, scenarios)
+    moments = load_prior_surface().moments(X) if len(X) else None
+    if moments is None:
+        return predict_fatigue_scenarios(_build_prior_gp(), StandardScaler(), prediction_hours, scenarios)
+    return _scenario_grid_from_moments(prediction_hours, scenarios, moments[:, 0], moments[:, 1])
+
+
+if __name__ == "__main__":
+    target = sys.argv[1] if len(sys.argv) > 1 else resolve_prior_artifact()
+    save_prior_surface(build_prior_surface(), target)
+    print(f"Prior GP surface written to {target}")
@@ -0,0 +1,152 @@
+"""Muscle-name taxonomy: group membership and volume-group normalization.
+
+Catalog muscle names ("Vasto lateral", "Bíceps femoral"), discomfort notes
+and feedback keys are matched to groups by keyword rules. The rules are
+pure functions of the strings, so every answer is memoized:
+
+    is_muscle_in_group(specific, target)   pair predicate (recovery groups)
+    normalize_muscle_group(specific)       canonical volume group
+
+MuscleTaxonomy interns an ordered list of target groups to bit positions.
+A name's membership is an int bitmask over them, memoized per name, and an
+exercise resolves once to the groups it hits, so the hot loops test bits
+and read cached tuples instead of scanning keyword lists.
+"""
+from __future__ import annotations
+from functools import lru_cache
+from typing import Iterable
+from models.common import ExerciseMuscleInfo
+
+MUSCLE_CATEGORY_MAP: dict[str, list[str]] = {
+    "pectorales": ["pectoral", "pecho"],
+    "dorsales": ["dorsal", "redondo mayor", "espalda alta", "lats"],
+    "deltoides": ["deltoides", "hombro", "delts"],
+    "bíceps": ["bíceps", "biceps", "braquial", "braquiorradial", "antebrazo"],
+    "tríceps": ["tríceps", "triceps"],
+    "cuádriceps": ["cuádriceps", "cuadriceps", "recto femoral", "vasto", "quads"],
+    "isquiosurales": ["isquiosurales", "isquiotibiales", "bíceps femoral", "semitendinoso", "semimembranoso", "femoral", "hamstrings"],
+    "glúteos": ["glúteo", "gluteo", "glutes"],
+    "pantorrillas": ["pantorrilla", "gemelo", "gastrocnemio", "sóleo", "soleo", "calves"],
+    "abdomen": ["abdomen", "abdominal", "oblicuo", "recto abdominal", "core", "transverso", "abs"],
+    "espalda baja": ["erector", "espinal", "lumbar", "espalda baja", "cuadrado lumbar", "lower back"],
+    "cuello": ["cuello", "cervical", "neck"],
+}
+
+# Ordered (group, any of, and any of, none of) keyword rules; first match wins.
+NORMALIZATION_RULES: tuple[tuple[str, tuple[str, ...], tuple[str, ...], tuple[str, ...]], ...] = (
+    # Hombros
+    ("Deltoides Posterior", ("posterior",), ("deltoides", "hombro"), ()),
+    ("Deltoides Lateral", ("lateral", "medio"), ("deltoides", "hombro"), ()),
+    ("Deltoides Anterior", ("anterior", "frontal"), ("deltoides", "hombro"), ()),
+    ("Deltoides Anterior", ("deltoides", "hombro"), (), ()),
+    # Espalda
+    ("Trapecio", ("trapecio", "romboides", "espinal", "alta"), (), ()),
+    ("Dorsales", ("dorsal", "lat", "redondo", "ancho"), (), ()),
+    ("Espalda Baja", ("erector", "lumbar", "baja"), (), ()),
+    ("Dorsales", ("espalda",), (), ()),
+    # Brazos
+    ("Tríceps", ("tríceps", "triceps"), (), ()),
+    ("Bíceps", ("bíceps", "biceps", "braquial"), (), ("femoral",)),
+    ("Antebrazo", ("antebrazo",), (), ()),
+    # Pierna
+    ("Isquiosurales", ("femoral", "semitendinoso", "semimembranoso", "isquio"), (), ()),
+    ("Cuádriceps", ("cuádriceps", "cuadriceps", "recto femoral", "vasto"), (), ()),
+    ("Glúteos", ("glúteo", "gluteo"), (), ()),
+    ("Gemelos", ("gemelo", "sóleo", "soleo", "pantorrilla"), (), ()),
+    # Core / Otros
+    ("Pectoral", ("pectoral", "pecho"), (), ()),
+    ("Abdominales", ("abdominal", "oblicuo", "core"), (), ()),
+)
+
+NAME_CACHE_SIZE = 65536
+
+
+@lru_cache(maxsize=NAME_CACHE_SIZE)
+def is_muscle_in_group(specific: str, target: str) -> bool:
+    s, t = specific.lower(), target.lower()
+    if s == t:
+        return True
+    kw = MUSCLE_CATEGORY_MAP.get(t)
+    if kw:
+        return any(k in s for k in kw)
+    return s in t or t in s
+
+
+@lru_cache(maxsize=NAME_CACHE_SIZE)
+def normalize_muscle_group(specific_muscle: str) -> str:
+    low = specific_muscle.lower().strip()
+    for group, any_of, and_any_of, none_of in NORMALIZATION_RULES:
+        if (
+            any(k in low for k in any_of)
+            and (not and_any_of or any(k in low for k in and_any_of))
+            and not any(k in low for k in none_of)
+        ):
+            return group
+    return specific_muscle[0].upper() + specific_muscle[1:] if specific_muscle else specific_muscle
+
+
+class MuscleTaxonomy:
+    """Target groups interned to bit positions; memoized name → bitmask."""
+
+    __slots__ = ("groups", "group_ids", "_masks", "_exercise_targets")
+
+    def __init__(self, groups: Iterable[str]):
+        self.groups: tuple[str, ...] = tuple(dict.fromkeys(groups))
+        self.group_ids: dict[str, int] = {g: i for i, g in enumerate(self.groups)}
+        self._masks: dict[str, int] = {}
+        self._exercise_targets: dict[tuple[str, ...], tuple[tuple[int, int], ...]] = {}
+
+    def mask(self, name: str) -> int:
+        """Bit g is set when `name` belongs to groups[g]."""
+        m = self._masks.get(name)
+        if m is None:
+            m = 0
+            for g, target in enumerate(self.groups):
+                if is_muscle_in_group(name, target):
+                    m |= 1 << g
+            if len(self._masks) >= NAME_CACHE_SIZE:
+                self._masks.clear()
+            self._masks[name] = m
+        return m
+
+    def names_mask(self, names: Iterable[str]) -> int:
+        m = 0
+        for name in names:
+            m |= self.mask(name)
+        return m
+
+    def first_matches(self, names: Iterable[str]) -> list[int | None]:
+        """Per group, the position of the first name belonging to it."""
+        first: list[int | None] = [None] * len(self.groups)
+        pending = (1 << len(self.groups)) - 1
+        for pos, name in enumerate(names):
+            hit = self.mask(name) & pending
+            pending &= ~hit
+            while hit:
+                low = hit & -hit
+                first[low.bit_length() - 1] = pos
+                hit ^= low
+            if not pending:
+                break
+        return first
+
+    def exercise_targets(self, info: ExerciseMuscleInfo) -> tuple[tuple[int, int], ...]:
+        """(group, involvedMuscles position) for every group the exercise hits.
+
+        Keyed by the exercise's muscle names, not its id: custom exercises
+        from different catalogs can share ids.
+        """
+        key = tuple(m.muscle for m in info.involvedMuscles)
+        targets = self._exercise_targets.get(key)
+        if targets is None:
+            targets = tuple((g, pos) for g, pos in enumerate(self.first_matches(key)) if pos is not None)
+            if len(self._exercise_targets) >= NAME_CACHE_SIZE:
+                self._exercise_targets.clear()
+            self._exercise_targets[key] = targets
+        return targets
+
+
+@lru_cache(maxsize=64)
+def muscle_taxonomy(groups: tuple[str, ...]) -> MuscleTaxonomy:
+    """Shared taxonomy per group list, so its memo survives across requests."""
+    return MuscleTaxonomy(groups)
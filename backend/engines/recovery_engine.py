@@ -1,12 +1,18 @@
 """Recovery service – faithful port of services/recoveryService.ts"""
 from __future__ import annotations
+import heapq
 import math
+from bisect import bisect_right
 from datetime import datetime, timezone
+import numpy as np
 from models.common import (
-    WorkoutLog, ExerciseMuscleInfo, MuscleHierarchy, SleepLog,
+    WorkoutLog, ExerciseMuscleInfo, InvolvedMuscle, MuscleHierarchy, SleepLog,
     PostSessionFeedback, DailyWellbeingLog, Settings, WaterLog, NutritionLog,
+    BatterySessionDrain, GlobalBatteryState,
 )
+from engines.athlete_context import AthleteContext, ensure_context, _parse_date_ms
 from engines.exercise_index import ExerciseIndex
+from engines.muscle_taxonomy import is_muscle_in_group, muscle_taxonomy
 from engines.fatigue_engine import (
     calculate_set_stress, get_dynamic_auge_metrics,
     calculate_personalized_battery_tanks, calculate_set_battery_drain,
@@ -36,47 +42,17 @@ ATHLETE_CAPACITY_FLOORS: dict[str, int] = {
     "weightlifter": 1000, "parapowerlifter": 1100,
 }
 
-MUSCLE_CATEGORY_MAP: dict[str, list[str]] = {
-    "pectorales": ["pectoral", "pecho"],
-    "dorsales": ["dorsal", "redondo mayor", "espalda alta", "lats"],
-    "deltoides": ["deltoides", "hombro", "delts"],
-    "bíceps": ["bíceps", "biceps", "braquial", "braquiorradial", "antebrazo"],
-    "tríceps": ["tríceps", "triceps"],
-    "cuádriceps": ["cuádriceps", "cuadriceps", "recto femoral", "vasto", "quads"],
-    "isquiosurales": ["isquiosurales", "isquiotibiales", "bíceps femoral", "semitendinoso", "semimembranoso", "femoral", "hamstrings"],
-    "glúteos": ["glúteo", "gluteo", "glutes"],
-    "pantorrillas": ["pantorrilla", "gemelo", "gastrocnemio", "sóleo", "soleo", "calves"],
-    "abdomen": ["abdomen", "abdominal", "oblicuo", "recto abdominal", "core", "transverso", "abs"],
-    "espalda baja": ["erector", "espinal", "lumbar", "espalda baja", "cuadrado lumbar", "lower back"],
-    "cuello": ["cuello", "cervical", "neck"],
-}
+# Most distinct muscle names one batch/series/forecast call evaluates.
+MAX_BATTERY_MUSCLES = 64
 
 _clamp = lambda v, lo, hi: min(hi, max(lo, v))
 _safe_exp = lambda v: 0 if not math.isfinite(r := math.exp(v)) else r
 
 
-def _is_muscle_in_group(specific: str, target: str) -> bool:
-    s, t = specific.lower(), target.lower()
-    if s == t:
-        return True
-    kw = MUSCLE_CATEGORY_MAP.get(t)
-    if kw:
-        return any(k in s for k in kw)
-    return s in t or t in s
-
-
 def _now_ms() -> float:
     return datetime.now(timezone.utc).timestamp() * 1000
 
 
-def _parse_date_ms(date_str: str) -> float:
-    try:
-        dt = datetime.fromisoformat(date_str.replace("Z", "+00:00"))
-        return dt.timestamp() * 1000
-    except Exception:
-        return 0
-
-
 # ── Work capacity ────────────────────────────────────────
 
 def _calculate_user_work_capacity(
@@ -85,10 +61,10 @@ def _calculate_user_work_capacity(
     exercise_list: list[ExerciseMuscleInfo],
     settings: Settings,
     idx: ExerciseIndex | None = None,
+    context: AthleteContext | None = None,
 ) -> float:
     now = _now_ms()
-    four_weeks = 28 * 24 * 3600 * 1000
-    recent = [l for l in history if _parse_date_ms(l.date) > now - four_weeks]
+    recent, _ = ensure_context(context, history).history_since(now - CAPACITY_WINDOW_MS)
     base_floor = ATHLETE_CAPACITY_FLOORS.get(settings.athleteType.value, 500)
 
     if not recent:
@@ -102,7 +78,7 @@ def _calculate_user_work_capacity(
             info = index.find(ex.exerciseDbId, ex.exerciseName)
             if not info:
                 continue
-            involvement = next((m for m in info.involvedMuscles if _is_muscle_in_group(m.muscle, muscle)), None)
+            involvement = next((m for m in info.involvedMuscles if is_muscle_in_group(m.muscle, muscle)), None)
             if involvement:
                 stress = sum(calculate_set_stress(s, info, 90) for s in ex.sets)
                 total_stress += stress * (involvement.activation or 1.0)
@@ -112,45 +88,37 @@ def _calculate_user_work_capacity(
     return _clamp(max(calculated, base_floor), 500, 3500)
 
 
-# ── Core: muscle battery ─────────────────────────────────
+# ── Muscle battery building blocks ───────────────────────
+
+ROLE_STRESS_MULT: dict[str, float] = {"primary": 1.0, "secondary": 0.5, "stabilizer": 0.15}
+
+CAPACITY_WINDOW_MS = 28 * 24 * 3600 * 1000
+FATIGUE_WINDOW_MS = 10 * 24 * 3600 * 1000
+DISCOMFORT_WINDOW_MS = 48 * 3600000
+FEEDBACK_WINDOW_MS = 72 * 3600000
 
-def calculate_muscle_battery(
-    muscle_name: str,
-    history: list[WorkoutLog],
-    exercise_list: list[ExerciseMuscleInfo],
-    sleep_logs: list[SleepLog],
-    settings: Settings,
-    muscle_hierarchy: MuscleHierarchy,
-    post_session_feedback: list[PostSessionFeedback] | None = None,
-    water_logs: list[WaterLog] | None = None,
-    daily_wellbeing: list[DailyWellbeingLog] | None = None,
-    nutrition_logs: list[NutritionLog] | None = None,
-) -> dict:
-    post_session_feedback = post_session_feedback or []
-    daily_wellbeing = daily_wellbeing or []
-    nutrition_logs = nutrition_logs or []
-    now = _now_ms()
-    idx = ExerciseIndex(exercise_list)
 
-    capacity = _calculate_user_work_capacity(history, muscle_name, exercise_list, settings, idx)
+def _base_recovery_hours(muscles: list[str]) -> list[int]:
+    """Recovery hours of the first profile entry belonging to each muscle (medium if none)."""
+    profile_keys = list(MUSCLE_PROFILE_MAP)
+    first = muscle_taxonomy(tuple(muscles)).first_matches(profile_keys)
+    return [
+        RECOVERY_PROFILES[MUSCLE_PROFILE_MAP[profile_keys[pos]] if pos is not None else "medium"]
+        for pos in first
+    ]
 
-    # Recovery profile
-    profile_key = "medium"
-    for key, val in MUSCLE_PROFILE_MAP.items():
-        if _is_muscle_in_group(key, muscle_name):
-            profile_key = val
-            break
-    base_recovery = RECOVERY_PROFILES[profile_key]
 
-    # Lifestyle multiplier
+def _lifestyle_recovery_mult(
+    settings: Settings,
+    recent_nut: list[NutritionLog],
+    wb: DailyWellbeingLog | None,
+    w_sleep: float,
+) -> float:
+    """Recovery-time multiplier from nutrition, stress, sleep and biology."""
     recovery_mult = 1.0
-    today_str = datetime.now(timezone.utc).strftime("%Y-%m-%d")
-    recent_wb = next((l for l in daily_wellbeing if l.date == today_str), daily_wellbeing[-1] if daily_wellbeing else None)
 
     # Nutrition
     if getattr(settings.algorithmSettings, "augeEnableNutritionTracking", True):
-        forty_eight = now - 48 * 3600000
-        recent_nut = [n for n in nutrition_logs if _parse_date_ms(n.date) > forty_eight]
         status = settings.calorieGoalObjective
         if recent_nut:
             avg_cal = sum(n.calories or 0 for n in recent_nut) / 2
@@ -167,19 +135,11 @@ def calculate_muscle_battery(
             recovery_mult *= 0.85
 
     # Stress
-    if recent_wb and recent_wb.stressLevel >= 4:
+    if wb and wb.stressLevel >= 4:
         recovery_mult *= 1.4
 
     # Sleep
-    w_sleep = 7.5
     if getattr(settings.algorithmSettings, "augeEnableSleepTracking", True):
-        sorted_sleep = sorted(sleep_logs, key=lambda s: _parse_date_ms(s.endTime), reverse=True)[:3]
-        if sorted_sleep:
-            w_sleep = (
-                (sorted_sleep[0].duration if len(sorted_sleep) > 0 else 7) * 0.5
-                + (sorted_sleep[1].duration if len(sorted_sleep) > 1 else 7) * 0.3
-                + (sorted_sleep[2].duration if len(sorted_sleep) > 2 else 7) * 0.2
-            )
         if w_sleep < 6:
             recovery_mult *= 1.5
         elif w_sleep < 7:
@@ -197,50 +157,65 @@ def calculate_muscle_battery(
     if gender in ("female", "transfemale"):
         recovery_mult *= 0.85
 
-    real_recovery = base_recovery * max(0.5, recovery_mult)
-
-    # Accumulated fatigue (last 10 days)
-    acc_fatigue = 0.0
-    last_session_date = 0.0
-    effective_sets = 0
-    ten_days = 10 * 24 * 3600 * 1000
-    relevant = [l for l in history if now - _parse_date_ms(l.date) < ten_days]
-
-    for log in relevant:
-        log_time = _parse_date_ms(log.date)
-        hours_since = max(0, (now - log_time) / 3600000)
-        session_stress = 0.0
-
-        for ex in log.completedExercises:
-            info = idx.find(ex.exerciseDbId, ex.exerciseName)
-            if not info:
-                continue
-            inv = next((m for m in info.involvedMuscles if _is_muscle_in_group(m.muscle, muscle_name)), None)
-            if not inv:
-                continue
-
-            raw = sum(calculate_set_stress(s, info, 90) for s in ex.sets)
-            role_mult = {"primary": 1.0, "secondary": 0.5, "stabilizer": 0.15}.get(inv.role.value, 0.1)
+    return recovery_mult
+
+
+def _target_resolver(muscles: list[str]):
+    """Exercise → [(muscle slot, first involvement in it)], resolved once per exercise.
+
+    Memoized by object identity, not info.id: catalog ids can collide. The
+    exercise list outlives the resolver, so identities are not reused.
+    """
+    taxonomy = muscle_taxonomy(tuple(muscles))
+    targets_by_exercise: dict[int, list[tuple[int, InvolvedMuscle]]] = {}
+
+    def _targets(info: ExerciseMuscleInfo) -> list[tuple[int, InvolvedMuscle]]:
+        targets = targets_by_exercise.get(id(info))
+        if targets is None:
+            targets = [(i, info.involvedMuscles[pos]) for i, pos in taxonomy.exercise_targets(info)]
+            targets_by_exercise[id(info)] = targets
+        return targets
+
+    return _targets
+
+
+def _log_muscle_loads(
+    log: WorkoutLog,
+    idx: ExerciseIndex,
+    targets,
+    n_muscles: int,
+) -> tuple[list[float], list[float], list[int]]:
+    """Per-muscle (capacity stress, fatigue stress, effective sets) of one session."""
+    capacity = [0.0] * n_muscles
+    fatigue = [0.0] * n_muscles
+    sets = [0] * n_muscles
+    for ex in log.completedExercises:
+        info = idx.find(ex.exerciseDbId, ex.exerciseName)
+        if not info:
+            continue
+        hits = targets(info)
+        if not hits:
+            continue
+
+        raw = sum(calculate_set_stress(s, info, 90) for s in ex.sets)
+        for i, inv in hits:
             act = inv.activation or 1.0
-            session_stress += raw * role_mult * act
+            capacity[i] += raw * act
+            fatigue[i] += raw * ROLE_STRESS_MULT.get(inv.role.value, 0.1) * act
+            if inv.role.value in ("primary", "secondary") and (inv.role.value == "primary" or act > 0.6):
+                sets[i] += len(ex.sets)
+    return capacity, fatigue, sets
 
-            if hours_since <= 168 and inv.role.value in ("primary", "secondary") and (inv.role.value == "primary" or act > 0.6):
-                effective_sets += len(ex.sets)
 
-        if session_stress > 0:
-            k = 2.9957 / max(1, real_recovery)
-            remaining = session_stress * _safe_exp(-k * hours_since)
-            acc_fatigue += remaining
-            if log_time > last_session_date:
-                last_session_date = log_time
+def _log_discomforts(log: WorkoutLog, muscles: list[str]) -> list[bool]:
+    mask = muscle_taxonomy(tuple(muscles)).names_mask(log.discomforts or [])
+    return [bool(mask >> i & 1) for i in range(len(muscles))]
 
-    battery = _clamp(100 - (acc_fatigue / capacity * 100), 0, 100)
 
-    # Background load
+def _background_cap(settings: Settings, wb: DailyWellbeingLog | None) -> float:
     bg_cap = 100.0
-    ctx = next((l for l in daily_wellbeing if l.date == today_str), daily_wellbeing[-1] if daily_wellbeing else None)
-    work_int = (ctx.workIntensity if ctx else None) or (settings.userVitals.workIntensity if settings.userVitals else None) or "light"
-    stress_lvl = (ctx.stressLevel if ctx else 3)
+    work_int = (wb.workIntensity if wb else None) or (settings.userVitals.workIntensity if settings.userVitals else None) or "light"
+    stress_lvl = (wb.stressLevel if wb else 3)
 
     if work_int == "high":
         bg_cap -= 10
@@ -248,11 +223,26 @@ def calculate_muscle_battery(
         bg_cap -= 5
     if stress_lvl >= 4:
         bg_cap -= 10
-    battery = min(battery, bg_cap)
+    return bg_cap
 
-    # DOMS override
-    if recent_wb and recent_wb.doms > 1:
-        d = recent_wb.doms
+
+def _feedback_doms(feedback: PostSessionFeedback, muscles: list[str]) -> list[float | None]:
+    """Per muscle, the DOMS of the first feedback key belonging to it."""
+    entries = list(feedback.feedback.values())
+    first = muscle_taxonomy(tuple(muscles)).first_matches(feedback.feedback)
+    return [entries[pos].doms if pos is not None else None for pos in first]
+
+
+def _cap_battery(
+    battery: float,
+    wb: DailyWellbeingLog | None,
+    discomfort: bool,
+    fb_doms: float | None,
+    hours_fb: float,
+) -> float:
+    """DOMS, discomfort and post-session feedback ceilings, then clamp."""
+    if wb and wb.doms > 1:
+        d = wb.doms
         if d == 5:
             battery = min(battery, 15)
         elif d == 4:
@@ -260,49 +250,152 @@ def calculate_muscle_battery(
         elif d == 3:
             battery = min(battery, 70)
 
-    # Discomfort from logs
-    for log in history:
-        if now - _parse_date_ms(log.date) < 48 * 3600000 and log.discomforts:
-            if any(_is_muscle_in_group(d, muscle_name) for d in log.discomforts):
-                battery = min(battery, 50)
+    if discomfort:
+        battery = min(battery, 50)
+
+    if fb_doms == 5:
+        battery = min(battery, 10 + hours_fb * 1.5)
+    elif fb_doms == 4:
+        battery = min(battery, 40 + hours_fb * 2.0)
+    elif fb_doms == 3:
+        battery = min(battery, 70 + hours_fb * 2.5)
+
+    return _clamp(battery, 0, 100)
+
+
+# ── Core: muscle battery ─────────────────────────────────
+
+
+def calculate_muscle_battery(
+    muscle_name: str,
+    history: list[WorkoutLog],
+    exercise_list: list[ExerciseMuscleInfo],
+    sleep_logs: list[SleepLog],
+    settings: Settings,
+    muscle_hierarchy: MuscleHierarchy,
+    post_session_feedback: list[PostSessionFeedback] | None = None,
+    water_logs: list[WaterLog] | None = None,
+    daily_wellbeing: list[DailyWellbeingLog] | None = None,
+    nutrition_logs: list[NutritionLog] | None = None,
+    context: AthleteContext | None = None,
+) -> dict:
+    return calculate_muscle_batteries(
+        [muscle_name], history, exercise_list, sleep_logs, settings, muscle_hierarchy,
+        post_session_feedback, water_logs, daily_wellbeing, nutrition_logs, context,
+    )[muscle_name]
+
+
+def calculate_muscle_batteries(
+    muscle_names: list[str],
+    history: list[WorkoutLog],
+    exercise_list: list[ExerciseMuscleInfo],
+    sleep_logs: list[SleepLog],
+    settings: Settings,
+    muscle_hierarchy: MuscleHierarchy,
+    post_session_feedback: list[PostSessionFeedback] | None = None,
+    water_logs: list[WaterLog] | None = None,
+    daily_wellbeing: list[DailyWellbeingLog] | None = None,
+    nutrition_logs: list[NutritionLog] | None = None,
+    context: AthleteContext | None = None,
+) -> dict[str, dict]:
+    """Battery of every requested muscle from one walk over the history.
+
+    Lifestyle multipliers, background load and DOMS are muscle-independent
+    and computed once. Each exercise is resolved to the muscles it hits
+    (first matching involved muscle per target, as before) once, and its
+    set stress is computed once and shared by every muscle it reaches.
+    With a context the raw log lists are ignored.
+    """
+    ctx = ensure_context(context, history, sleep_logs, daily_wellbeing, nutrition_logs, post_session_feedback)
+    now = _now_ms()
+    idx = ExerciseIndex(exercise_list)
+    muscles = list(dict.fromkeys(muscle_names))
+    n_muscles = len(muscles)
+    if n_muscles > MAX_BATTERY_MUSCLES:
+        raise ValueError(f"{n_muscles} muscles requested; the limit is {MAX_BATTERY_MUSCLES}")
+
+    base_recovery = _base_recovery_hours(muscles)
+    recent_wb = ctx.today_wellbeing()
+    recovery_mult = _lifestyle_recovery_mult(
+        settings, ctx.nutrition_since(now - 48 * 3600000), recent_wb, ctx.weighted_sleep(fill=7),
+    )
+    real_recovery = [base * max(0.5, recovery_mult) for base in base_recovery]
+    decay_k = [2.9957 / max(1, r) for r in real_recovery]
+    taxonomy = muscle_taxonomy(tuple(muscles))
+    targets = _target_resolver(muscles)
+
+    # Single pass over the 4-week capacity window, which contains the
+    # 10-day fatigue and 48h discomfort windows.
+    capacity_stress = [0.0] * n_muscles
+    acc_fatigue = [0.0] * n_muscles
+    last_session_date = [0.0] * n_muscles
+    effective_sets = [0] * n_muscles
+    discomfort_mask = 0
+    window_logs, window_ms = ctx.history_since(now - CAPACITY_WINDOW_MS)
+
+    for log, log_time in zip(window_logs, window_ms):
+        in_fatigue = now - log_time < FATIGUE_WINDOW_MS
+        hours_since = max(0, (now - log_time) / 3600000)
+        capacity, session_stress, sets = _log_muscle_loads(log, idx, targets, n_muscles)
+        for i in range(n_muscles):
+            capacity_stress[i] += capacity[i]
+            if in_fatigue:
+                if hours_since <= 168:
+                    effective_sets[i] += sets[i]
+                if session_stress[i] > 0:
+                    acc_fatigue[i] += session_stress[i] * _safe_exp(-decay_k[i] * hours_since)
+                    if log_time > last_session_date[i]:
+                        last_session_date[i] = log_time
+
+        # Discomfort from logs
+        if now - log_time < DISCOMFORT_WINDOW_MS and log.discomforts:
+            discomfort_mask |= taxonomy.names_mask(log.discomforts)
+
+    bg_cap = _background_cap(settings, recent_wb)
 
     # Post-session feedback
-    if post_session_feedback:
-        recent_fb = sorted(
-            [f for f in post_session_feedback if now - _parse_date_ms(f.date) < 72 * 3600000],
-            key=lambda f: f.date, reverse=True,
+    recent_fb = recent_fb_time = None
+    recent = sorted(
+        [(f, ms) for f, ms in zip(ctx.post_session_feedback, ctx.feedback_ms) if now - ms < FEEDBACK_WINDOW_MS],
+        key=lambda e: e[0].date, reverse=True,
+    )
+    if recent:
+        recent_fb, recent_fb_time = recent[0]
+    fb_doms = _feedback_doms(recent_fb, muscles) if recent_fb is not None else [None] * n_muscles
+
+    base_floor = ATHLETE_CAPACITY_FLOORS.get(settings.athleteType.value, 500)
+    results: dict[str, dict] = {}
+
+    for i, muscle_name in enumerate(muscles):
+        if window_logs:
+            capacity = _clamp(max(capacity_stress[i] / 4 * 1.8, base_floor), 500, 3500)
+        else:
+            capacity = float(base_floor)
+
+        battery = _clamp(100 - (acc_fatigue[i] / capacity * 100), 0, 100)
+        battery = _cap_battery(
+            min(battery, bg_cap), recent_wb, bool(discomfort_mask >> i & 1),
+            fb_doms[i], (now - recent_fb_time) / 3600000 if fb_doms[i] is not None else 0,
         )
-        if recent_fb:
-            fb = recent_fb[0]
-            entry = next(((k, v) for k, v in fb.feedback.items() if _is_muscle_in_group(k, muscle_name)), None)
-            if entry:
-                _, data = entry
-                hours_fb = (now - _parse_date_ms(fb.date)) / 3600000
-                if data.doms == 5:
-                    battery = min(battery, 10 + hours_fb * 1.5)
-                elif data.doms == 4:
-                    battery = min(battery, 40 + hours_fb * 2.0)
-                elif data.doms == 3:
-                    battery = min(battery, 70 + hours_fb * 2.5)
-
-    battery = _clamp(battery, 0, 100)
-    status = "exhausted" if battery < 40 else "recovering" if battery < 85 else "optimal"
-
-    hours_to_recovery = 0.0
-    target_pct = min(90, bg_cap)
-    if battery < target_pct and acc_fatigue > 0:
-        k = 2.9957 / real_recovery
-        target_fatigue = (100 - target_pct) * capacity / 100
-        if acc_fatigue > target_fatigue:
-            hours_to_recovery = -math.log(target_fatigue / acc_fatigue) / k
+        status = "exhausted" if battery < 40 else "recovering" if battery < 85 else "optimal"
 
-    return {
-        "recoveryScore": round(battery),
-        "effectiveSets": effective_sets,
-        "hoursSinceLastSession": round((now - last_session_date) / 3600000) if last_session_date > 0 else -1,
-        "estimatedHoursToRecovery": round(max(0, hours_to_recovery)),
-        "status": status,
-    }
+        hours_to_recovery = 0.0
+        target_pct = min(90, bg_cap)
+        if battery < target_pct and acc_fatigue[i] > 0:
+            k = 2.9957 / real_recovery[i]
+            target_fatigue = (100 - target_pct) * capacity / 100
+            if acc_fatigue[i] > target_fatigue:
+                hours_to_recovery = -math.log(target_fatigue / acc_fatigue[i]) / k
+
+        results[muscle_name] = {
+            "recoveryScore": round(battery),
+            "effectiveSets": effective_sets[i],
+            "hoursSinceLastSession": round((now - last_session_date[i]) / 3600000) if last_session_date[i] > 0 else -1,
+            "estimatedHoursToRecovery": round(max(0, hours_to_recovery)),
+            "status": status,
+        }
+
+    return results
 
 
 # ── Core: systemic fatigue ────────────────────────────────
@@ -313,15 +406,16 @@ def calculate_systemic_fatigue(
     daily_wellbeing: list[DailyWellbeingLog],
     exercise_list: list[ExerciseMuscleInfo],
     settings: Settings | None = None,
+    context: AthleteContext | None = None,
 ) -> dict:
+    ctx = ensure_context(context, history, sleep_logs, daily_wellbeing)
     now = _now_ms()
     idx = ExerciseIndex(exercise_list)
     seven_days = 7 * 24 * 3600 * 1000
-    recent = [l for l in history if now - _parse_date_ms(l.date) < seven_days]
     cns_load = 0.0
 
-    for log in recent:
-        days_ago = (now - _parse_date_ms(log.date)) / (24 * 3600 * 1000)
+    for log, log_time in zip(*ctx.history_since(now - seven_days)):
+        days_ago = (now - log_time) / (24 * 3600 * 1000)
         recency = max(0.1, math.exp(-0.4 * days_ago))
         session_cns = 0.0
 
@@ -348,14 +442,7 @@ def calculate_systemic_fatigue(
 
     sleep_penalty = 0.0
     if not settings or getattr(settings.algorithmSettings, "augeEnableSleepTracking", True):
-        sorted_s = sorted(sleep_logs, key=lambda s: _parse_date_ms(s.endTime), reverse=True)[:3]
-        w = 7.5
-        if sorted_s:
-            w = (
-                (sorted_s[0].duration if len(sorted_s) > 0 else 7.5) * 0.5
-                + (sorted_s[1].duration if len(sorted_s) > 1 else 7.5) * 0.3
-                + (sorted_s[2].duration if len(sorted_s) > 2 else 7.5) * 0.2
-            )
+        w = ctx.weighted_sleep()
         if w < 4.5:
             sleep_penalty = 40
         elif w < 5.5:
@@ -367,8 +454,7 @@ def calculate_systemic_fatigue(
         elif w > 7.5:
             sleep_penalty = -5
 
-    today_str = datetime.now(timezone.utc).strftime("%Y-%m-%d")
-    wb = next((l for l in daily_wellbeing if l.date == today_str), daily_wellbeing[-1] if daily_wellbeing else None)
+    wb = ctx.today_wellbeing()
     life_penalty = 0.0
     if wb:
         if wb.stressLevel >= 4:
@@ -395,15 +481,14 @@ def calculate_daily_readiness(
     daily_wellbeing: list[DailyWellbeingLog],
     settings: Settings,
     cns_battery: float,
+    context: AthleteContext | None = None,
 ) -> dict:
+    ctx = ensure_context(context, sleep_logs=sleep_logs, daily_wellbeing=daily_wellbeing)
     mult = 1.0
     diag: list[str] = []
 
-    today_str = datetime.now(timezone.utc).strftime("%Y-%m-%d")
-    wb = next((l for l in daily_wellbeing if l.date == today_str), daily_wellbeing[-1] if daily_wellbeing else None)
-
-    sorted_s = sorted(sleep_logs, key=lambda s: _parse_date_ms(s.endTime), reverse=True)
-    sleep_h = sorted_s[0].duration if sorted_s else 7.5
+    wb = ctx.today_wellbeing()
+    sleep_h = ctx.last_sleep_hours()
     if sleep_h < 6:
         mult *= 1.5
         diag.append("Falta de sueño detectada (<6h). Tu recarga está severamente frenada hoy.")
@@ -440,23 +525,16 @@ def calculate_daily_readiness(
 
 # ── Global batteries ─────────────────────────────────────
 
-def calculate_global_batteries(
-    history: list[WorkoutLog],
-    sleep_logs: list[SleepLog],
-    daily_wellbeing: list[DailyWellbeingLog],
-    nutrition_logs: list[NutritionLog],
-    settings: Settings,
-    exercise_list: list[ExerciseMuscleInfo],
-) -> dict:
-    now = _now_ms()
-    tanks = calculate_personalized_battery_tanks(settings)
+CNS_HALF_LIFE, MUSCULAR_HALF_LIFE, SPINAL_HALF_LIFE = 28.0, 40.0, 72.0
+GLOBAL_WINDOW_MS = 7 * 24 * 3600 * 1000
+
 
-    cns_hl, musc_hl, spinal_hl = 28.0, 40.0, 72.0
-    audit: dict[str, list] = {"cns": [], "muscular": [], "spinal": []}
+# Muscular half-life multiplier per nutrition status.
+MUSCULAR_HALF_LIFE_FACTORS: dict[str, float] = {"deficit": 1.3, "maintenance": 1.0, "surplus": 0.8}
 
-    # Nutrition modulator
-    forty_eight = now - 48 * 3600000
-    recent_nut = [n for n in nutrition_logs if _parse_date_ms(n.date) > forty_eight]
+
+def _global_nutrition_status(settings: Settings, recent_nut: list[NutritionLog]) -> str:
+    """deficit / maintenance / surplus from the last 48h of intake vs. the goal."""
     nut_status = settings.calorieGoalObjective or "maintenance"
     if recent_nut:
         avg = sum(n.calories or 0 for n in recent_nut) / len(recent_nut)
@@ -465,55 +543,46 @@ def calculate_global_batteries(
                 nut_status = "deficit"
             elif avg > settings.dailyCalorieGoal * 1.1:
                 nut_status = "surplus"
-    if nut_status == "deficit":
-        musc_hl *= 1.3
-    elif nut_status == "surplus":
-        musc_hl *= 0.8
+    return nut_status if nut_status in MUSCULAR_HALF_LIFE_FACTORS else "maintenance"
+
+
+def _global_modulators(
+    settings: Settings,
+    recent_nut: list[NutritionLog],
+    wb: DailyWellbeingLog | None,
+    w_sleep: float,
+) -> tuple[float, float]:
+    """(muscular half-life, CNS penalty) from nutrition, stress and sleep."""
+    nut_status = _global_nutrition_status(settings, recent_nut)
+    musc_hl = MUSCULAR_HALF_LIFE * MUSCULAR_HALF_LIFE_FACTORS[nut_status]
 
-    # Sleep/stress modulator
     cns_penalty = 0.0
-    today_str = datetime.now(timezone.utc).strftime("%Y-%m-%d")
-    wb = next((l for l in daily_wellbeing if l.date == today_str), daily_wellbeing[-1] if daily_wellbeing else None)
     if wb and wb.stressLevel >= 4:
         cns_penalty += 12
 
     if getattr(settings.algorithmSettings, "augeEnableSleepTracking", True):
-        sorted_s = sorted(sleep_logs, key=lambda s: _parse_date_ms(s.endTime), reverse=True)[:3]
-        w = 7.5
-        if sorted_s:
-            w = (
-                (sorted_s[0].duration if len(sorted_s) > 0 else 7.5) * 0.5
-                + (sorted_s[1].duration if len(sorted_s) > 1 else 7.5) * 0.3
-                + (sorted_s[2].duration if len(sorted_s) > 2 else 7.5) * 0.2
-            )
-        if w < 6:
+        if w_sleep < 6:
             cns_penalty += 18
-        elif w >= 8.5:
+        elif w_sleep >= 8.5:
             cns_penalty -= 10
+    return musc_hl, cns_penalty
 
-    # Training accumulation
-    idx = ExerciseIndex(exercise_list)
-    cns_f, musc_f, spinal_f = 0.0, 0.0, 0.0
-    seven_days = 7 * 24 * 3600 * 1000
-    recent_logs = [l for l in history if _parse_date_ms(l.date) > now - seven_days]
 
-    for log in recent_logs:
-        lc, lm, ls = 0.0, 0.0, 0.0
-        hours_ago = (now - _parse_date_ms(log.date)) / 3600000
-        for ex in log.completedExercises:
-            info = idx.find(ex.exerciseDbId, ex.exerciseName)
-            for i, s in enumerate(ex.sets):
-                drain = calculate_set_battery_drain(s, info, tanks, i, 90)
-                lc += drain["cnsDrainPct"]
-                lm += drain["muscularDrainPct"]
-                ls += drain["spinalDrainPct"]
-
-        ln2 = math.log(2)
-        cns_f += lc * math.exp(-(ln2 / cns_hl) * hours_ago)
-        musc_f += lm * math.exp(-(ln2 / musc_hl) * hours_ago)
-        spinal_f += ls * math.exp(-(ln2 / spinal_hl) * hours_ago)
+def _log_battery_drain(log: WorkoutLog, idx: ExerciseIndex, tanks: dict) -> tuple[float, float, float]:
+    """(CNS, muscular, spinal) drain % of one session."""
+    lc, lm, ls = 0.0, 0.0, 0.0
+    for ex in log.completedExercises:
+        info = idx.find(ex.exerciseDbId, ex.exerciseName)
+        for i, s in enumerate(ex.sets):
+            drain = calculate_set_battery_drain(s, info, tanks, i, 90)
+            lc += drain["cnsDrainPct"]
+            lm += drain["muscularDrainPct"]
+            ls += drain["spinalDrainPct"]
+    return lc, lm, ls
+
 
-    # Calibration
+def _calibration_deltas(settings: Settings, now: float) -> tuple[float, float, float]:
+    """Manual calibration offsets, fading out linearly over 72h."""
     calib = settings.batteryCalibration
     cd = md = sd = 0.0
     if calib and calib.lastCalibrated:
@@ -522,6 +591,19 @@ def calculate_global_batteries(
         cd = (calib.cnsDelta or 0) * decay
         md = (calib.muscularDelta or 0) * decay
         sd = (calib.spinalDelta or 0) * decay
+    return cd, md, sd
+
+
+def _global_battery_report(
+    cns_f: float,
+    musc_f: float,
+    spinal_f: float,
+    cns_penalty: float,
+    settings: Settings,
+    now: float,
+) -> dict:
+    """Batteries and verdict from the decayed training fatigue at `now`."""
+    cd, md, sd = _calibration_deltas(settings, now)
 
     final_cns = _clamp(100 - cns_f - cns_penalty + cd, 0, 100)
     final_musc = _clamp(100 - musc_f + md, 0, 100)
@@ -541,11 +623,508 @@ def calculate_global_batteries(
         "cns": round(final_cns),
         "muscular": round(final_musc),
         "spinal": round(final_spinal),
-        "auditLogs": audit,
+        "auditLogs": {"cns": [], "muscular": [], "spinal": []},
         "verdict": verdict,
     }
 
 
+def calculate_global_batteries(
+    history: list[WorkoutLog],
+    sleep_logs: list[SleepLog],
+    daily_wellbeing: list[DailyWellbeingLog],
+    nutrition_logs: list[NutritionLog],
+    settings: Settings,
+    exercise_list: list[ExerciseMuscleInfo],
+    context: AthleteContext | None = None,
+) -> dict:
+    ctx = ensure_context(context, history, sleep_logs, daily_wellbeing, nutrition_logs)
+    now = _now_ms()
+    tanks = calculate_personalized_battery_tanks(settings)
+
+    musc_hl, cns_penalty = _global_modulators(
+        settings, ctx.nutrition_since(now - 48 * 3600000), ctx.today_wellbeing(), ctx.weighted_sleep(),
+    )
+
+    # Training accumulation
+    idx = ExerciseIndex(exercise_list)
+    cns_f, musc_f, spinal_f = 0.0, 0.0, 0.0
+    ln2 = math.log(2)
+
+    for log, log_time in zip(*ctx.history_since(now - GLOBAL_WINDOW_MS)):
+        lc, lm, ls = _log_battery_drain(log, idx, tanks)
+        hours_ago = (now - log_time) / 3600000
+        cns_f += lc * math.exp(-(ln2 / CNS_HALF_LIFE) * hours_ago)
+        musc_f += lm * math.exp(-(ln2 / musc_hl) * hours_ago)
+        spinal_f += ls * math.exp(-(ln2 / SPINAL_HALF_LIFE) * hours_ago)
+
+    return _global_battery_report(cns_f, musc_f, spinal_f, cns_penalty, settings, now)
+
+
+# ── Incremental global batteries ─────────────────────────
+#
+# Decay is multiplicative, so the training fatigue behind the global
+# batteries is carried in a GlobalBatteryState: decayed to "now" on read and
+# topped up with each newly logged session, instead of re-costing every set
+# of the last 7 days on every dashboard load.
+
+def _decay_factors(hours: float) -> tuple[float, dict[str, float], float]:
+    """(CNS, muscular per nutrition status, spinal) e^(−ln2·hours/half-life)."""
+    ln2 = math.log(2)
+    return (
+        math.exp(-(ln2 / CNS_HALF_LIFE) * hours),
+        {
+            status: math.exp(-(ln2 / (MUSCULAR_HALF_LIFE * factor)) * hours)
+            for status, factor in MUSCULAR_HALF_LIFE_FACTORS.items()
+        },
+        math.exp(-(ln2 / SPINAL_HALF_LIFE) * hours),
+    )
+
+
+def _shift_session(state: GlobalBatteryState, session: BatterySessionDrain, sign: float) -> None:
+    """Add (sign=1) or subtract (sign=−1) a session's drain decayed to state.referenceTime."""
+    dc, dm, ds = _decay_factors((state.referenceTime - session.time) / 3600000)
+    state.cns += sign * session.cns * dc
+    for status, factor in dm.items():
+        state.muscular[status] = state.muscular.get(status, 0.0) + sign * session.muscular * factor
+    state.spinal += sign * session.spinal * ds
+
+
+def _clear_if_empty(state: GlobalBatteryState) -> None:
+    # Drop the rounding residue once no session is left in the window.
+    if not state.sessions:
+        state.cns = state.spinal = 0.0
+        state.muscular = dict.fromkeys(MUSCULAR_HALF_LIFE_FACTORS, 0.0)
+
+
+def battery_state_is_current(state: GlobalBatteryState, settings: Settings) -> bool:
+    """Whether the state was costed with the tanks these settings give."""
+    return state.tanks == calculate_personalized_battery_tanks(settings)
+
+
+def advance_battery_state(state: GlobalBatteryState, now: float) -> GlobalBatteryState:
+    """The state decayed to `now`, minus the sessions that left the 7-day window."""
+    dc, dm, ds = _decay_factors((now - state.referenceTime) / 3600000)
+    advanced = GlobalBatteryState(
+        referenceTime=now,
+        cns=state.cns * dc,
+        muscular={status: state.muscular.get(status, 0.0) * factor for status, factor in dm.items()},
+        spinal=state.spinal * ds,
+        tanks=state.tanks,
+    )
+    cutoff = now - GLOBAL_WINDOW_MS
+    expired = 0
+    while expired < len(state.sessions) and state.sessions[expired].time <= cutoff:
+        _shift_session(advanced, state.sessions[expired], -1)
+        expired += 1
+    advanced.sessions = state.sessions[expired:]
+    _clear_if_empty(advanced)
+    return advanced
+
+
+def update_battery_state(
+    state: GlobalBatteryState,
+    logs: list[WorkoutLog],
+    exercise_list: list[ExerciseMuscleInfo],
+    settings: Settings,
+    removed_log_ids: list[str] | None = None,
+    now: float | None = None,
+) -> GlobalBatteryState:
+    """Fold newly logged sessions into the state in O(their sets).
+
+    A log whose id is already in the window replaces that session's drain,
+    and removed_log_ids are subtracted, so edits and deletes inside the
+    window need no history. Logs older than the window are ignored.
+    """
+    now = _now_ms() if now is None else now
+    tanks = calculate_personalized_battery_tanks(settings)
+    if state.sessions and state.tanks != tanks:
+        raise ValueError("Battery state was costed with other tanks; rebuild it from history")
+
+    state = advance_battery_state(state, now)
+    state.tanks = tanks
+    replaced = set(removed_log_ids or []) | {log.id for log in logs}
+    kept = []
+    for session in state.sessions:
+        if session.logId in replaced:
+            _shift_session(state, session, -1)
+        else:
+            kept.append(session)
+
+    idx = ExerciseIndex(exercise_list)
+    cutoff = now - GLOBAL_WINDOW_MS
+    for log in logs:
+        log_time = _parse_date_ms(log.date)
+        if log_time <= cutoff:
+            continue
+        lc, lm, ls = _log_battery_drain(log, idx, tanks)
+        session = BatterySessionDrain(logId=log.id, time=log_time, cns=lc, muscular=lm, spinal=ls)
+        _shift_session(state, session, 1)
+        kept.append(session)
+    kept.sort(key=lambda s: s.time)
+    state.sessions = kept
+    _clear_if_empty(state)
+    return state
+
+
+def build_battery_state(
+    history: list[WorkoutLog],
+    exercise_list: list[ExerciseMuscleInfo],
+    settings: Settings,
+    context: AthleteContext | None = None,
+    now: float | None = None,
+) -> GlobalBatteryState:
+    """Recompute the state from scratch, for new users and edited history."""
+    ctx = ensure_context(context, history)
+    now = _now_ms() if now is None else now
+    logs, _ = ctx.history_since(now - GLOBAL_WINDOW_MS)
+    return update_battery_state(GlobalBatteryState(referenceTime=now), logs, exercise_list, settings, now=now)
+
+
+def global_batteries_from_state(
+    state: GlobalBatteryState,
+    sleep_logs: list[SleepLog],
+    daily_wellbeing: list[DailyWellbeingLog],
+    nutrition_logs: list[NutritionLog],
+    settings: Settings,
+    context: AthleteContext | None = None,
+) -> dict:
+    """calculate_global_batteries read off a stored GlobalBatteryState.
+
+    Only sessions that aged out since the state's referenceTime are touched,
+    so the cost does not grow with history; sleep, stress and nutrition
+    modulators are applied at read time as before.
+    """
+    ctx = ensure_context(context, None, sleep_logs, daily_wellbeing, nutrition_logs)
+    now = _now_ms()
+    state = advance_battery_state(state, now)
+    recent_nut = ctx.nutrition_since(now - 48 * 3600000)
+    _, cns_penalty = _global_modulators(settings, recent_nut, ctx.today_wellbeing(), ctx.weighted_sleep())
+    musc_f = state.muscular.get(_global_nutrition_status(settings, recent_nut), 0.0)
+    return _global_battery_report(state.cns, musc_f, state.spinal, cns_penalty, settings, now)
+
+
+# ── Battery history ──────────────────────────────────────
+
+MAX_SERIES_POINTS = 5000
+
+
+class _DecayingWindowSum:
+    """Σ loadᵢ·e^(−k·(t − tᵢ)/h) over sessions with t − window < tᵢ ≤ t.
+
+    Queried at increasing t, each sum is carried forward from the previous
+    query: decayed by e^(−k·Δt), plus sessions that entered the window,
+    minus those that left it. Lifestyle modulators change k over time, so
+    one running sum is kept per distinct rate vector.
+    """
+
+    __slots__ = ("times", "loads", "window_ms", "_sums")
+
+    def __init__(self, times: np.ndarray, loads: np.ndarray, window_ms: float):
+        self.times = times
+        self.loads = loads
+        self.window_ms = window_ms
+        self._sums: dict[bytes, tuple[float, int, int, np.ndarray]] = {}
+
+    def _direct(self, t: float, k: np.ndarray, lo: int, hi: int) -> np.ndarray:
+        hours = (t - self.times[lo:hi]) / 3600000
+        return (self.loads[lo:hi] * np.exp(-np.outer(hours, k))).sum(axis=0)
+
+    def at(self, t: float, k: np.ndarray) -> np.ndarray:
+        lo = int(np.searchsorted(self.times, t - self.window_ms, side="right"))
+        hi = int(np.searchsorted(self.times, t, side="right"))
+        key = k.tobytes()
+        state = self._sums.get(key)
+        if lo == hi:
+            total = np.zeros(len(k))
+        elif state is None or not state[0] <= t < state[0] + self.window_ms:
+            total = self._direct(t, k, lo, hi)
+        else:
+            t0, lo0, hi0, carried = state
+            total = (
+                carried * np.exp(-k * (t - t0) / 3600000)
+                + self._direct(t, k, hi0, hi)
+                - self._direct(t, k, lo0, lo)
+            )
+        self._sums[key] = (t, lo, hi, total)
+        return total
+
+
+def calculate_battery_series(
+    start: str,
+    end: str,
+    step_hours: float,
+    muscle_names: list[str],
+    history: list[WorkoutLog],
+    exercise_list: list[ExerciseMuscleInfo],
+    sleep_logs: list[SleepLog],
+    settings: Settings,
+    post_session_feedback: list[PostSessionFeedback] | None = None,
+    daily_wellbeing: list[DailyWellbeingLog] | None = None,
+    nutrition_logs: list[NutritionLog] | None = None,
+    context: AthleteContext | None = None,
+) -> dict:
+    """Muscle, CNS, muscular and spinal batteries every step_hours from start to end.
+
+    Each point is what the live batteries read at that instant, seeing only
+    the logs (sessions, sleep, nutrition, wellbeing, feedback, calibration)
+    up to it. Sessions are costed once; work capacity and discomfort are
+    prefix-sum windows, decayed fatigue is carried between points and the
+    feedback window is a heap fed from the time-sorted feedback, so the
+    series costs one pass over history and feedback plus
+    O(muscles + log feedback) per point.
+    """
+    t_start, t_end = _parse_date_ms(start), _parse_date_ms(end)
+    if not t_start or not t_end:
+        raise ValueError("start and end must be ISO-8601 dates")
+    if step_hours <= 0 or t_end < t_start:
+        raise ValueError("Need start <= end and a positive step")
+    step = step_hours * 3600000
+    n_points = int((t_end - t_start) // step) + 1
+    if n_points > MAX_SERIES_POINTS:
+        raise ValueError(f"Series would have {n_points} points; the limit is {MAX_SERIES_POINTS}")
+
+    ctx = ensure_context(context, history, sleep_logs, daily_wellbeing, nutrition_logs, post_session_feedback)
+    idx = ExerciseIndex(exercise_list)
+    tanks = calculate_personalized_battery_tanks(settings)
+    muscles = list(dict.fromkeys(muscle_names))
+    n_muscles = len(muscles)
+    if n_muscles > MAX_BATTERY_MUSCLES:
+        raise ValueError(f"{n_muscles} muscles requested; the limit is {MAX_BATTERY_MUSCLES}")
+    targets = _target_resolver(muscles)
+
+    # Cost every session that any point's windows can reach, once.
+    logs, times = ctx.history_since(t_start - CAPACITY_WINDOW_MS, t_start + (n_points - 1) * step)
+    log_ms = np.asarray(times, dtype=float)
+    n_logs = len(log_ms)
+    capacity = np.zeros((n_logs, n_muscles))
+    fatigue = np.zeros((n_logs, n_muscles))
+    discomfort = np.zeros((n_logs, n_muscles), dtype=int)
+    drains = np.zeros((n_logs, 3))
+    for j, log in enumerate(logs):
+        capacity[j], fatigue[j], _ = _log_muscle_loads(log, idx, targets, n_muscles)
+        drains[j] = _log_battery_drain(log, idx, tanks)
+        if log.discomforts:
+            discomfort[j] = _log_discomforts(log, muscles)
+
+    capacity_cum = np.vstack([np.zeros(n_muscles), np.cumsum(capacity, axis=0)])
+    discomfort_cum = np.vstack([np.zeros(n_muscles, dtype=int), np.cumsum(discomfort, axis=0)])
+    muscle_fatigue = _DecayingWindowSum(log_ms, fatigue, FATIGUE_WINDOW_MS)
+    global_fatigue = _DecayingWindowSum(log_ms, drains, GLOBAL_WINDOW_MS)
+
+    base_recovery = np.asarray(_base_recovery_hours(muscles), dtype=float)
+    base_floor = ATHLETE_CAPACITY_FLOORS.get(settings.athleteType.value, 500)
+    ln2 = math.log(2)
+    calib = settings.batteryCalibration
+    calibrated_ms = _parse_date_ms(calib.lastCalibrated) if calib and calib.lastCalibrated else math.inf
+    feedback_doms: dict[int, list[float | None]] = {}
+    # Feedback enters the heap at its own time and is dropped once 72h old;
+    # the top is the newest active entry by date (first listed on ties).
+    feedback_ms = ctx.feedback_ms
+    feedback_order = sorted(range(len(feedback_ms)), key=feedback_ms.__getitem__)
+    feedback_rank = [0] * len(feedback_ms)
+    for r, j in enumerate(sorted(
+        range(len(feedback_ms)), key=lambda j: ctx.post_session_feedback[j].date, reverse=True,
+    )):
+        feedback_rank[j] = r
+    feedback_next = bisect_right([feedback_ms[j] for j in feedback_order], t_start - FEEDBACK_WINDOW_MS)
+    active_feedback: list[tuple[int, int]] = []
+
+    timestamps: list[str] = []
+    cns_series: list[int] = []
+    muscular_series: list[int] = []
+    spinal_series: list[int] = []
+    muscle_series: list[list[int]] = [[] for _ in muscles]
+
+    for p in range(n_points):
+        t = t_start + p * step
+        moment = datetime.fromtimestamp(t / 1000, timezone.utc)
+        timestamps.append(moment.isoformat())
+        wb = ctx.wellbeing_as_of(moment.strftime("%Y-%m-%d"))
+        recent_nut = ctx.nutrition_since(t - 48 * 3600000, until_ms=t)
+        hi = int(np.searchsorted(log_ms, t, side="right"))
+
+        # Muscles
+        mult = _lifestyle_recovery_mult(settings, recent_nut, wb, ctx.weighted_sleep(fill=7, as_of=t))
+        acc_fatigue = muscle_fatigue.at(t, 2.9957 / np.maximum(1, base_recovery * max(0.5, mult)))
+        lo = int(np.searchsorted(log_ms, t - CAPACITY_WINDOW_MS, side="right"))
+        if hi > lo:
+            capacity_t = np.clip(np.maximum((capacity_cum[hi] - capacity_cum[lo]) / 4 * 1.8, base_floor), 500, 3500)
+        else:
+            capacity_t = np.full(n_muscles, float(base_floor))
+        battery = np.clip(100 - acc_fatigue / capacity_t * 100, 0, 100)
+        lo = int(np.searchsorted(log_ms, t - DISCOMFORT_WINDOW_MS, side="right"))
+        sore = (discomfort_cum[hi] - discomfort_cum[lo]) > 0
+        bg_cap = _background_cap(settings, wb)
+
+        while feedback_next < len(feedback_order) and feedback_ms[feedback_order[feedback_next]] <= t:
+            j = feedback_order[feedback_next]
+            heapq.heappush(active_feedback, (feedback_rank[j], j))
+            feedback_next += 1
+        while active_feedback and t - feedback_ms[active_feedback[0][1]] >= FEEDBACK_WINDOW_MS:
+            heapq.heappop(active_feedback)
+        fb = active_feedback[0][1] if active_feedback else None
+        if fb is None:
+            fb_doms, hours_fb = [None] * n_muscles, 0
+        else:
+            if fb not in feedback_doms:
+                feedback_doms[fb] = _feedback_doms(ctx.post_session_feedback[fb], muscles)
+            fb_doms, hours_fb = feedback_doms[fb], (t - feedback_ms[fb]) / 3600000
+
+        for i in range(n_muscles):
+            muscle_series[i].append(round(_cap_battery(
+                min(float(battery[i]), bg_cap), wb, bool(sore[i]),
+                fb_doms[i], hours_fb if fb_doms[i] is not None else 0,
+            )))
+
+        # Global
+        musc_hl, cns_penalty = _global_modulators(settings, recent_nut, wb, ctx.weighted_sleep(as_of=t))
+        cns_f, musc_f, spinal_f = global_fatigue.at(t, ln2 / np.array([CNS_HALF_LIFE, musc_hl, SPINAL_HALF_LIFE]))
+        cd, md, sd = _calibration_deltas(settings, t) if t >= calibrated_ms else (0.0, 0.0, 0.0)
+        cns_series.append(round(_clamp(100 - float(cns_f) - cns_penalty + cd, 0, 100)))
+        muscular_series.append(round(_clamp(100 - float(musc_f) + md, 0, 100)))
+        spinal_series.append(round(_clamp(100 - float(spinal_f) + sd, 0, 100)))
+
+    return {
+        "timestamps": timestamps,
+        "cns": cns_series,
+        "muscular": muscular_series,
+        "spinal": spinal_series,
+        "muscles": dict(zip(muscles, muscle_series)),
+    }
+
+
+# ── Battery forecast ─────────────────────────────────────
+
+# Floors of the "recovering" and "optimal" muscle statuses.
+FORECAST_THRESHOLDS = (40.0, 85.0)
+MAX_FORECAST_HOURS = 14 * 24
+
+
+def _first_hour_at_or_above(rows: np.ndarray, thresholds: list[float]) -> list[list[int | None]]:
+    """Per row and threshold, the first hour index with value ≥ threshold (None if never)."""
+    out = []
+    for row in rows:
+        hits = row[None, :] >= np.asarray(thresholds, dtype=float)[:, None]
+        out.append([int(h.argmax()) if h.any() else None for h in hits])
+    return out
+
+
+def calculate_battery_forecast(
+    muscle_names: list[str],
+    history: list[WorkoutLog],
+    exercise_list: list[ExerciseMuscleInfo],
+    sleep_logs: list[SleepLog],
+    settings: Settings,
+    post_session_feedback: list[PostSessionFeedback] | None = None,
+    daily_wellbeing: list[DailyWellbeingLog] | None = None,
+    nutrition_logs: list[NutritionLog] | None = None,
+    horizon_hours: int = 72,
+    thresholds: list[float] = FORECAST_THRESHOLDS,
+    context: AthleteContext | None = None,
+) -> dict:
+    """Hourly muscle and global batteries for the next horizon_hours, assuming no new sessions.
+
+    Today's nutrition, sleep and stress modulators are held fixed. Hour h is
+    what the live batteries would read at now + h: fatigue decays at each
+    muscle's (or system's) rate and sessions, discomforts and feedback age
+    out of their windows. Evaluated as (sessions × muscles × hours) arrays.
+    """
+    if not 1 <= horizon_hours <= MAX_FORECAST_HOURS:
+        raise ValueError(f"horizon_hours must be between 1 and {MAX_FORECAST_HOURS}")
+
+    ctx = ensure_context(context, history, sleep_logs, daily_wellbeing, nutrition_logs, post_session_feedback)
+    now = _now_ms()
+    idx = ExerciseIndex(exercise_list)
+    tanks = calculate_personalized_battery_tanks(settings)
+    muscles = list(dict.fromkeys(muscle_names))
+    n_muscles = len(muscles)
+    if n_muscles > MAX_BATTERY_MUSCLES:
+        raise ValueError(f"{n_muscles} muscles requested; the limit is {MAX_BATTERY_MUSCLES}")
+    targets = _target_resolver(muscles)
+    hours = np.arange(horizon_hours + 1, dtype=float)
+
+    wb = ctx.today_wellbeing()
+    recent_nut = ctx.nutrition_since(now - 48 * 3600000)
+
+    # Sessions still inside the widest (capacity) window; age[i, h] in hours at now + h.
+    logs, times = ctx.history_since(now - CAPACITY_WINDOW_MS)
+    n_logs = len(logs)
+    capacity = np.zeros((n_logs, n_muscles))
+    fatigue = np.zeros((n_logs, n_muscles))
+    discomfort = np.zeros((n_logs, n_muscles))
+    drains = np.zeros((n_logs, 3))
+    for row, log in enumerate(logs):
+        capacity[row], fatigue[row], _ = _log_muscle_loads(log, idx, targets, n_muscles)
+        drains[row] = _log_battery_drain(log, idx, tanks)
+        if log.discomforts:
+            discomfort[row] = _log_discomforts(log, muscles)
+    age = (now - np.asarray(times, dtype=float))[:, None] / 3600000 + hours[None, :]
+
+    # Muscles
+    mult = _lifestyle_recovery_mult(settings, recent_nut, wb, ctx.weighted_sleep(fill=7))
+    k = 2.9957 / np.maximum(1, np.asarray(_base_recovery_hours(muscles), dtype=float) * max(0.5, mult))
+    in_fatigue = age < FATIGUE_WINDOW_MS / 3600000
+    decay = np.exp(-k[None, :, None] * np.maximum(0, age)[:, None, :]) * in_fatigue[:, None, :]
+    acc_fatigue = np.einsum("im,imh->mh", fatigue, decay)
+
+    in_capacity = age < CAPACITY_WINDOW_MS / 3600000
+    base_floor = ATHLETE_CAPACITY_FLOORS.get(settings.athleteType.value, 500)
+    capacity_t = np.where(
+        in_capacity.any(axis=0),
+        np.clip(np.maximum(capacity.T @ in_capacity / 4 * 1.8, base_floor), 500, 3500),
+        float(base_floor),
+    )
+    battery = np.clip(100 - acc_fatigue / capacity_t * 100, 0, 100)
+
+    # Ceilings: background load and today's DOMS are constant, discomforts
+    # expire after 48h and post-session feedback caps relax, then expire, after 72h.
+    ceiling = np.full_like(battery, min(_background_cap(settings, wb), _cap_battery(100.0, wb, False, None, 0)))
+    sore = (discomfort.T @ (age < DISCOMFORT_WINDOW_MS / 3600000)) > 0
+    ceiling = np.where(sore, np.minimum(ceiling, 50), ceiling)
+
+    unassigned = np.ones(len(hours), dtype=bool)
+    feedback = sorted(
+        [(f, ms) for f, ms in zip(ctx.post_session_feedback, ctx.feedback_ms) if now - ms < FEEDBACK_WINDOW_MS],
+        key=lambda e: e[0].date, reverse=True,
+    )
+    for f, ms in feedback:
+        hours_fb = (now - ms) / 3600000 + hours
+        active = unassigned & (hours_fb < FEEDBACK_WINDOW_MS / 3600000)
+        unassigned &= ~active
+        for i, fb_doms in enumerate(_feedback_doms(f, muscles)):
+            if fb_doms == 5:
+                cap = 10 + hours_fb * 1.5
+            elif fb_doms == 4:
+                cap = 40 + hours_fb * 2.0
+            elif fb_doms == 3:
+                cap = 70 + hours_fb * 2.5
+            else:
+                continue
+            ceiling[i] = np.where(active, np.minimum(ceiling[i], cap), ceiling[i])
+
+    muscle_rows = np.rint(np.clip(np.minimum(battery, ceiling), 0, 100))
+
+    # Global
+    musc_hl, cns_penalty = _global_modulators(settings, recent_nut, wb, ctx.weighted_sleep())
+    k_global = math.log(2) / np.array([CNS_HALF_LIFE, musc_hl, SPINAL_HALF_LIFE])
+    in_global = age < GLOBAL_WINDOW_MS / 3600000
+    global_f = np.einsum("ib,ibh->bh", drains, np.exp(-k_global[None, :, None] * age[:, None, :]) * in_global[:, None, :])
+    deltas = np.array([_calibration_deltas(settings, now + h * 3600000) for h in hours]).T
+    global_rows = np.rint(np.clip(100 - global_f - np.array([[cns_penalty], [0.0], [0.0]]) + deltas, 0, 100))
+
+    names = muscles + ["cns", "muscular", "spinal"]
+    ready_at = _first_hour_at_or_above(np.vstack([muscle_rows, global_rows]), list(thresholds))
+    return {
+        "hours": hours.astype(int).tolist(),
+        "muscles": {m: row.astype(int).tolist() for m, row in zip(muscles, muscle_rows)},
+        "cns": global_rows[0].astype(int).tolist(),
+        "muscular": global_rows[1].astype(int).tolist(),
+        "spinal": global_rows[2].astype(int).tolist(),
+        "thresholds": list(thresholds),
+        "readyAt": dict(zip(names, ready_at)),
+    }
+
+
 # ── Utilities ────────────────────────────────────────────
 
 def learn_recovery_rate(current_mult: float, calculated_score: float, manual_feel: float) -> float:
@@ -0,0 +1,441 @@
+"""Cross-user recovery hyperpriors (empirical Bayes, batch job).
+
+New users are seeded with Gamma(α₀, β₀) per muscle. The static seed is
+POPULATION_RECOVERY_HOURS with α₀ = DEFAULT_ALPHA for everyone; this job
+replaces it with priors estimated from all users, stratified by athlete
+type, age band and muscle.
+
+Each (user, muscle) contributes its sufficient statistics (n, S = Στ).
+With τ̄ = S / n and the engine's shrinkage estimate
+
+    τ̂ = (β₀ + S) / (α₀ + n) = (α₀·μ₀ + n·τ̄) / (α₀ + n)
+
+the method-of-moments hyperpriors per stratum are
+
+    μ₀ = mean(τ̄)
+    σ²_w = mean(τ̄² · n / (n + 1))           within-user (exponential τ: Var = τ²)
+    σ²_b = var(τ̄) − mean(τ̄² / (n + 1))     between-user, floored
+    α₀ = σ²_w / σ²_b,   β₀ = α₀ · μ₀
+
+Stratum means are then shrunk toward their parent level
+(type × band → type → all) with HIERARCHY_PSEUDO_USERS pseudo-users.
+
+Input is streamed in chunks and reduced with Chan's parallel mean/M2
+merge, so memory is O(chunk + strata) however many users are pooled.
+Publish a table with:
+
+    python -m engines.recovery_population users.jsonl [output_dir]
+    python -m engines.recovery_population --log [output_dir]
+
+One JSON object per line and per user: athlete_type, age and either
+observations (list of RecoveryObservation) or priors (UserRecoveryPriors).
+--log reads the server-side observation log instead. The newest
+recovery_priors_v{N}.json in KPKN_RECOVERY_PRIOR_DIR (default
+backend/.state/models/recovery_priors) is loaded at startup.
+
+After a formula change, rebuild every stored posterior snapshot with:
+
+    python -m engines.recovery_population replay
+"""
+from __future__ import annotations
+
+import json
+import os
+import sys
+import tempfile
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Iterable, Iterator
+
+import numpy as np
+
+from engines.adaptive_engine import (
+    DEFAULT_ALPHA,
+    POPULATION_RECOVERY_HOURS,
+    RECOVERY_FORMULA_VERSION,
+    _derive_implied_recovery_times,
+    bayesian_update_recovery,
+    set_population_prior_table,
+)
+from models.adaptive import (
+    GammaPrior,
+    RecoveryObservation,
+    RecoveryPosteriorSnapshot,
+    UserRecoveryPriors,
+)
+from storage.model_store import resolve_model_dir
+from storage.observation_log import RECOVERY_SNAPSHOT_KEY, iter_user_logs
+from storage.state_store import load_state, save_states
+
+AGE_BANDS: tuple[tuple[float, str], ...] = (
+    (25, "<25"), (35, "25-34"), (45, "35-44"), (55, "45-54"), (float("inf"), "55+"),
+)
+ANY = "*"
+
+PRIOR_TABLE_SCHEMA = 1
+PRIOR_MIN_USERS = 30
+PRIOR_ALPHA_BOUNDS = (1.0, 50.0)
+HIERARCHY_PSEUDO_USERS = 20.0
+# σ²_b floor as a fraction of μ₀², so a homogeneous stratum cannot claim
+# unbounded confidence.
+BETWEEN_VARIANCE_FLOOR = 0.01
+STREAM_CHUNK = 65536
+
+# Stratum levels, most specific first. Each entry masks (type, band).
+_LEVELS = ((True, True), (True, False), (False, True), (False, False))
+
+
+def age_band(age: float | None) -> str:
+    if age is None:
+        return ANY
+    return next(label for upper, label in AGE_BANDS if age < upper)
+
+
+def _stratum_keys(athlete_type: str | None, band: str, muscle: str) -> list[tuple[str, str, str]]:
+    athlete_type = (athlete_type or ANY).lower()
+    keys = []
+    for use_type, use_band in _LEVELS:
+        key = (athlete_type if use_type else ANY, band if use_band else ANY, muscle)
+        if key not in keys:
+            keys.append(key)
+    return keys
+
+
+def _parent_key(key: tuple[str, str, str]) -> tuple[str, str, str] | None:
+    athlete_type, band, muscle = key
+    if athlete_type != ANY and band != ANY:
+        return athlete_type, ANY, muscle
+    if athlete_type != ANY or band != ANY:
+        return ANY, ANY, muscle
+    return None
+
+
+# ═══════════════════════════════════════════════════════════════════
+# SUFFICIENT STATISTICS
+# ═══════════════════════════════════════════════════════════════════
+
+def observation_sufficient_stats(
+    observations: list[RecoveryObservation],
+) -> Iterator[tuple[str, int, float]]:
+    """(muscle, n, Στ) per muscle from one user's raw observations."""
+    if not observations:
+        return
+    tau = _derive_implied_recovery_times(observations)
+    muscles: dict[str, int] = {}
+    codes = np.array([muscles.setdefault(o.muscle.lower(), len(muscles)) for o in observations])
+    valid = ~np.isnan(tau)
+    counts = np.bincount(codes[valid], minlength=len(muscles))
+    sums = np.bincount(codes[valid], weights=tau[valid], minlength=len(muscles))
+    for muscle, i in muscles.items():
+        if counts[i]:
+            yield muscle, int(counts[i]), float(sums[i])
+
+
+def prior_sufficient_stats(priors: UserRecoveryPriors) -> Iterator[tuple[str, int, float]]:
+    """(muscle, n, Στ) recovered from a posterior seeded with the static prior.
+
+    n = α − α_seed and Στ = β − β_seed. Posteriors that started from a
+    published table cannot be unwound this way; prefer observations.
+    """
+    for muscle, prior in priors.muscle_priors.items():
+        base_hours = POPULATION_RECOVERY_HOURS.get(muscle.lower(), 48.0)
+        n = int(round(prior.alpha - DEFAULT_ALPHA))
+        total = prior.beta - DEFAULT_ALPHA * base_hours
+        if n >= 1 and total > 0:
+            yield muscle.lower(), n, total
+
+
+def user_records(users: Iterable[dict]) -> Iterator[tuple[str | None, str, str, int, float]]:
+    """Flatten user documents to (athlete_type, age band, muscle, n, Στ)."""
+    for user in users:
+        band = age_band(user.get("age"))
+        if user.get("observations") is not None:
+            stats = observation_sufficient_stats(
+                [RecoveryObservation.model_validate(o) for o in user["observations"]]
+            )
+        elif user.get("priors") is not None:
+            stats = prior_sufficient_stats(UserRecoveryPriors.model_validate(user["priors"]))
+        else:
+            continue
+        for muscle, n, total in stats:
+            yield user.get("athlete_type"), band, muscle, n, total
+
+
+# ═══════════════════════════════════════════════════════════════════
+# STREAMING AGGREGATION
+# ═══════════════════════════════════════════════════════════════════
+
+class PopulationAccumulator:
+    """Per-stratum moments of τ̄, mergeable chunk by chunk.
+
+    Each stratum holds [users, mean τ̄, M2 τ̄, Σ τ̄²/(n+1), Σ τ̄²·n/(n+1), Σ n].
+    """
+
+    __slots__ = ("strata",)
+
+    def __init__(self):
+        self.strata: dict[tuple[str, str, str], np.ndarray] = {}
+
+    def add_chunk(self, records: list[tuple[str | None, str, str, int, float]]) -> None:
+        """Reduce the chunk per (type, band, muscle), then merge into every level."""
+        triples: dict[tuple[str | None, str, str], int] = {}
+        codes = np.empty(len(records), dtype=int)
+        rows = np.empty((len(records), 2))
+        for k, (athlete_type, band, muscle, n, total) in enumerate(records):
+            codes[k] = triples.setdefault((athlete_type, band, muscle), len(triples))
+            rows[k] = n, total
+        if not triples:
+            return
+
+        n, total = rows.T
+        mean_tau = total / n
+        size = len(triples)
+        count = np.bincount(codes, minlength=size).astype(float)
+        mean = np.bincount(codes, weights=mean_tau, minlength=size) / count
+        m2 = np.bincount(codes, weights=(mean_tau - mean[codes]) ** 2, minlength=size)
+        noise = np.bincount(codes, weights=mean_tau ** 2 / (n + 1), minlength=size)
+        within = np.bincount(codes, weights=mean_tau ** 2 * n / (n + 1), minlength=size)
+        obs = np.bincount(codes, weights=n, minlength=size)
+
+        for triple, i in triples.items():
+            moments = np.array([count[i], mean[i], m2[i], noise[i], within[i], obs[i]])
+            for key in _stratum_keys(*triple):
+                self._merge(key, moments.copy())
+
+    def _merge(self, key: tuple[str, str, str], chunk: np.ndarray) -> None:
+        current = self.strata.get(key)
+        if current is None:
+            self.strata[key] = chunk
+            return
+        n_a, n_b = current[0], chunk[0]
+        delta = chunk[1] - current[1]
+        total = n_a + n_b
+        current[1] += delta * n_b / total
+        current[2] += chunk[2] + delta ** 2 * n_a * n_b / total
+        current[0] = total
+        current[3:] += chunk[3:]
+
+
+def accumulate(
+    records: Iterable[tuple[str | None, str, str, int, float]],
+    chunk_size: int = STREAM_CHUNK,
+) -> PopulationAccumulator:
+    accumulator = PopulationAccumulator()
+    chunk = []
+    for record in records:
+        chunk.append(record)
+        if len(chunk) >= chunk_size:
+            accumulator.add_chunk(chunk)
+            chunk = []
+    accumulator.add_chunk(chunk)
+    return accumulator
+
+
+# ═══════════════════════════════════════════════════════════════════
+# HYPERPRIOR FIT
+# ═══════════════════════════════════════════════════════════════════
+
+def _moment_hyperprior(moments: np.ndarray) -> tuple[float, float]:
+    """(μ₀, α₀) for one stratum from its accumulated moments."""
+    users, mean, m2, noise, within, _ = moments
+    total_var = m2 / (users - 1) if users > 1 else 0.0
+    between = max(total_var - noise / users, BETWEEN_VARIANCE_FLOOR * mean ** 2)
+    alpha = float(np.clip((within / users) / between, *PRIOR_ALPHA_BOUNDS))
+    return float(mean), alpha
+
+
+def fit_population_priors(
+    accumulator: PopulationAccumulator,
+    min_users: int = PRIOR_MIN_USERS,
+) -> list[dict]:
+    """Hyperpriors for every stratum with at least min_users users.
+
+    Parents are resolved first so each stratum mean can be shrunk toward
+    its parent's (already shrunk) mean; the pooled level is left as is.
+    """
+    fitted: dict[tuple[str, str, str], tuple[float, float, int]] = {}
+    specificity = lambda key: (key[0] != ANY) + (key[1] != ANY)
+    for key in sorted(accumulator.strata, key=specificity):
+        moments = accumulator.strata[key]
+        users = int(moments[0])
+        if users < min_users:
+            continue
+        mean, alpha = _moment_hyperprior(moments)
+        parent = _parent_key(key)
+        while parent is not None and parent not in fitted:
+            parent = _parent_key(parent)
+        if parent is not None:
+            parent_mean = fitted[parent][0]
+            mean = (users * mean + HIERARCHY_PSEUDO_USERS * parent_mean) / (users + HIERARCHY_PSEUDO_USERS)
+        fitted[key] = (mean, alpha, users)
+
+    return [
+        {
+            "athlete_type": key[0],
+            "age_band": key[1],
+            "muscle": key[2],
+            "alpha": round(alpha, 4),
+            "beta": round(alpha * mean, 4),
+            "mean_hours": round(mean, 2),
+            "users": users,
+            "observations": int(accumulator.strata[key][5]),
+        }
+        for key, (mean, alpha, users) in sorted(fitted.items())
+    ]
+
+
+# ═══════════════════════════════════════════════════════════════════
+# PUBLISHED TABLE
+# ═══════════════════════════════════════════════════════════════════
+
+class PopulationPriorTable:
+    """Published hyperpriors, looked up from the most specific stratum."""
+
+    __slots__ = ("version", "priors")
+
+    def __init__(self, version: int, strata: list[dict]):
+        self.version = version
+        self.priors = {
+            (s["athlete_type"], s["age_band"], s["muscle"]): GammaPrior(alpha=s["alpha"], beta=s["beta"])
+            for s in strata
+        }
+
+    def prior(self, muscle: str, athlete_type: str | None = None, age: float | None = None) -> GammaPrior | None:
+        for key in _stratum_keys(athlete_type, age_band(age), muscle.lower()):
+            prior = self.priors.get(key)
+            if prior is not None:
+                return prior.model_copy()
+        return None
+
+
+def resolve_prior_table_dir() -> str:
+    return os.getenv("KPKN_RECOVERY_PRIOR_DIR") or os.path.join(resolve_model_dir(), "recovery_priors")
+
+
+def _table_versions(directory: str) -> list[int]:
+    try:
+        names = os.listdir(directory)
+    except OSError:
+        return []
+    versions = []
+    for name in names:
+        if name.startswith("recovery_priors_v") and name.endswith(".json"):
+            stem = name[len("recovery_priors_v"):-len(".json")]
+            if stem.isdigit():
+                versions.append(int(stem))
+    return sorted(versions)
+
+
+def publish_prior_table(strata: list[dict], directory: str | None = None, source_users: int = 0) -> str:
+    """Write the next version of the table; existing versions are kept."""
+    directory = directory or resolve_prior_table_dir()
+    os.makedirs(directory, exist_ok=True)
+    version = (_table_versions(directory) or [0])[-1] + 1
+    table = {
+        "schema": PRIOR_TABLE_SCHEMA,
+        "version": version,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "source_users": source_users,
+        "min_users": PRIOR_MIN_USERS,
+        "strata": strata,
+    }
+    path = os.path.join(directory, f"recovery_priors_v{version}.json")
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    with os.fdopen(fd, "w", encoding="utf-8") as fh:
+        json.dump(table, fh, ensure_ascii=False)
+    os.replace(tmp_path, path)
+    return path
+
+
+@lru_cache(maxsize=1)
+def load_prior_table(directory: str | None = None) -> PopulationPriorTable | None:
+    """Newest published table, or None if nothing has been published."""
+    directory = directory or resolve_prior_table_dir()
+    for version in reversed(_table_versions(directory)):
+        path = os.path.join(directory, f"recovery_priors_v{version}.json")
+        try:
+            with open(path, encoding="utf-8") as fh:
+                table = json.load(fh)
+        except (OSError, ValueError):
+            continue
+        if table.get("schema") == PRIOR_TABLE_SCHEMA:
+            return PopulationPriorTable(table["version"], table["strata"])
+    return None
+
+
+# ═══════════════════════════════════════════════════════════════════
+# OBSERVATION LOG
+# ═══════════════════════════════════════════════════════════════════
+
+REPLAY_SNAPSHOT_BATCH = 500
+
+
+def logged_users() -> Iterator[dict]:
+    """User documents streamed from the observation log, one user at a time."""
+    for user_id, entries in iter_user_logs():
+        stored = load_state(user_id, RECOVERY_SNAPSHOT_KEY) or {}
+        yield {
+            "user_id": user_id,
+            "athlete_type": stored.get("athlete_type"),
+            "age": stored.get("age"),
+            "observations": [obs for _, obs in entries],
+            "last_seq": entries[-1][0],
+        }
+
+
+def replay_recovery_log(batch_users: int = REPLAY_SNAPSHOT_BATCH) -> int:
+    """Rebuild every posterior snapshot from the full observation log.
+
+    One streaming pass under the current RECOVERY_FORMULA_VERSION and
+    prior table; snapshots are written batch_users at a time. Returns the
+    number of users replayed.
+    """
+    pending: list[tuple[str, str, dict]] = []
+    replayed = 0
+    for user in logged_users():
+        result = bayesian_update_recovery(
+            [RecoveryObservation.model_validate(obs) for obs in user["observations"]],
+            UserRecoveryPriors(),
+            user["athlete_type"],
+            user["age"],
+        )
+        snapshot = RecoveryPosteriorSnapshot(
+            priors=result.updated_priors,
+            last_seq=user["last_seq"],
+            formula_version=RECOVERY_FORMULA_VERSION,
+            athlete_type=user["athlete_type"],
+            age=user["age"],
+        )
+        pending.append((user["user_id"], RECOVERY_SNAPSHOT_KEY, snapshot.model_dump()))
+        if len(pending) >= batch_users:
+            replayed += save_states(pending)
+            pending = []
+    return replayed + (save_states(pending) if pending else 0)
+
+
+def _read_users(path: str) -> Iterator[dict]:
+    with open(path, encoding="utf-8") as fh:
+        for line in fh:
+            if line.strip():
+                yield json.loads(line)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        sys.exit("usage: python -m engines.recovery_population (users.jsonl | --log | replay) [output_dir]")
+    if sys.argv[1] == "replay":
+        set_population_prior_table(load_prior_table())
+        print(f"Replayed recovery posteriors for {replay_recovery_log()} users")
+        sys.exit(0)
+    users_seen = [0]
+
+    def _counted(users: Iterable[dict]) -> Iterator[dict]:
+        for user in users:
+            users_seen[0] += 1
+            yield user
+
+    source = logged_users() if sys.argv[1] == "--log" else _read_users(sys.argv[1])
+    accumulator = accumulate(user_records(_counted(source)))
+    strata = fit_population_priors(accumulator)
+    target = publish_prior_table(strata, sys.argv[2] if len(sys.argv) > 2 else None, users_seen[0])
+    print(f"{len(strata)} recovery prior strata from {users_seen[0]} users written to {target}")
@@ -0,0 +1,104 @@
+"""Downsampling and compact encodings for long numeric time series.
+
+Forecast curves (Banister timelines, AUGE systems) are sampled every few
+hours and can run to thousands of points. Mobile clients only need enough
+points to draw the curve, so the output can be thinned to a resolution,
+decimated with Largest-Triangle-Three-Buckets (which keeps the visual shape,
+peaks included) and shipped as packed float32 or integer deltas instead of
+JSON float lists.
+"""
+from __future__ import annotations
+
+import base64
+
+import numpy as np
+
+from models.adaptive import EncodedSeries, TimelineOutput
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """Indices chosen by Largest-Triangle-Three-Buckets.
+
+    The first and last points are always kept. Every inner bucket
+    contributes the point forming the largest triangle with the previously
+    selected point and the mean of the next bucket.
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    selected = np.empty(n_out, dtype=int)
+    selected[0], selected[-1] = 0, n - 1
+    anchor = 0
+
+    for b in range(n_out - 2):
+        lo, hi = edges[b], max(edges[b + 1], edges[b] + 1)
+        if b + 2 < len(edges):
+            nxt = slice(edges[b + 1], max(edges[b + 2], edges[b + 1] + 1))
+            avg_x, avg_y = x[nxt].mean(), y[nxt].mean()
+        else:
+            avg_x, avg_y = x[-1], y[-1]
+
+        area = np.abs(
+            (x[anchor] - avg_x) * (y[lo:hi] - y[anchor])
+            - (x[anchor] - x[lo:hi]) * (avg_y - y[anchor])
+        )
+        anchor = lo + int(np.argmax(area))
+        selected[b + 1] = anchor
+
+    return selected
+
+
+def select_output_indices(
+    x: np.ndarray,
+    y: np.ndarray,
+    output: TimelineOutput | None,
+    keep: list[int | None] | None = None,
+) -> np.ndarray | None:
+    """Indices of the points to return, or None to return everything.
+
+    resolution_hours thins the grid by a fixed stride first; max_points then
+    applies LTTB on y. Indices in keep (e.g. the peak) always survive.
+    """
+    if output is None or (output.resolution_hours is None and output.max_points is None) or len(x) < 3:
+        return None
+
+    candidates = np.arange(len(x))
+    if output.resolution_hours is not None:
+        step = float(x[1] - x[0]) or 1.0
+        stride = max(1, int(round(output.resolution_hours / step)))
+        candidates = np.union1d(candidates[::stride], [len(x) - 1])
+
+    if output.max_points is not None:
+        chosen = lttb_indices(x[candidates], y[candidates], output.max_points)
+        candidates = candidates[chosen]
+
+    extra = [i for i in (keep or []) if i is not None]
+    return np.union1d(candidates, extra).astype(int)
+
+
+def encode_series(values: np.ndarray, encoding: str, decimals: int) -> EncodedSeries:
+    """Pack a series rounded to `decimals`.
+
+    float32_b64: little-endian float32 bytes, base64.
+    delta:       integers q = round(v·10^decimals) sent as q[0], q[1]−q[0], …
+                 decode with a cumulative sum divided by scale.
+    """
+    values = np.asarray(values, dtype=float)
+    if encoding == "float32_b64":
+        packed = np.round(values, decimals).astype("<f4").tobytes()
+        return EncodedSeries(
+            encoding="float32_b64",
+            length=len(values),
+            data=base64.b64encode(packed).decode("ascii"),
+        )
+
+    scale = 10 ** decimals
+    quantized = np.round(values * scale).astype(np.int64)
+    return EncodedSeries(
+        encoding="delta",
+        length=len(values),
+        scale=float(scale),
+        data=np.diff(quantized, prepend=0).tolist(),
+    )
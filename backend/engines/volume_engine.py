@@ -5,6 +5,7 @@ from models.common import (
     MuscleRole, PostSessionFeedback, PostSessionMuscle,
 )
 from engines.exercise_index import ExerciseIndex
+from engines.muscle_taxonomy import normalize_muscle_group
 
 # ── Constants (Módulos 4 y 5) ────────────────────────────
 
@@ -148,58 +149,6 @@ def calculate_volume_adjustment(
     return {"factor": 1.0, "status": "optimal", "suggestion": f"Carga óptima para {muscle}. Mantén el plan."}
 
 
-# ── Muscle normalizer ────────────────────────────────────
-
-def normalize_muscle_group(specific_muscle: str) -> str:
-    low = specific_muscle.lower().strip()
-
-    # Hombros
-    if "posterior" in low and ("deltoides" in low or "hombro" in low):
-        return "Deltoides Posterior"
-    if ("lateral" in low or "medio" in low) and ("deltoides" in low or "hombro" in low):
-        return "Deltoides Lateral"
-    if ("anterior" in low or "frontal" in low) and ("deltoides" in low or "hombro" in low):
-        return "Deltoides Anterior"
-    if "deltoides" in low or "hombro" in low:
-        return "Deltoides Anterior"
-
-    # Espalda
-    if any(k in low for k in ("trapecio", "romboides", "espinal", "alta")):
-        return "Trapecio"
-    if any(k in low for k in ("dorsal", "lat", "redondo", "ancho")):
-        return "Dorsales"
-    if any(k in low for k in ("erector", "lumbar", "baja")):
-        return "Espalda Baja"
-    if "espalda" in low:
-        return "Dorsales"
-
-    # Brazos
-    if "tríceps" in low or "triceps" in low:
-        return "Tríceps"
-    if ("bíceps" in low or "biceps" in low or "braquial" in low) and "femoral" not in low:
-        return "Bíceps"
-    if "antebrazo" in low:
-        return "Antebrazo"
-
-    # Pierna
-    if any(k in low for k in ("femoral", "semitendinoso", "semimembranoso", "isquio")):
-        return "Isquiosurales"
-    if any(k in low for k in ("cuádriceps", "cuadriceps", "recto femoral", "vasto")):
-        return "Cuádriceps"
-    if "glúteo" in low or "gluteo" in low:
-        return "Glúteos"
-    if any(k in low for k in ("gemelo", "sóleo", "soleo", "pantorrilla")):
-        return "Gemelos"
-
-    # Core / Otros
-    if "pectoral" in low or "pecho" in low:
-        return "Pectoral"
-    if any(k in low for k in ("abdominal", "oblicuo", "core")):
-        return "Abdominales"
-
-    return specific_muscle[0].upper() + specific_muscle[1:] if specific_muscle else specific_muscle
-
-
 # ── Unified muscle volume ─────────────────────────────────
 
 # ── Adaptive recalibration (EMA, half-life, regression) ───────
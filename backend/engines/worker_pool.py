@@ -0,0 +1,31 @@
+"""Process pool shared by the CPU-bound engines.
+
+Roster solves and GP optimizer restarts fan out over one lazily created
+pool per server process instead of forking a fresh pool per request, so
+concurrent requests queue for KPKN_MAX_WORKERS processes (default: the CPU
+count, at most 4) rather than each spawning cpu_count of their own.
+"""
+from __future__ import annotations
+
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+MAX_WORKERS = max(1, int(os.getenv("KPKN_MAX_WORKERS") or min(4, os.cpu_count() or 1)))
+
+_pool: ProcessPoolExecutor | None = None
+_pool_lock = threading.Lock()
+
+
+def clamp_workers(workers: int, tasks: int) -> int:
+    """Workers a call may use: at least 1, at most the pool size and its task count."""
+    return max(1, min(workers, MAX_WORKERS, tasks))
+
+
+def shared_pool() -> ProcessPoolExecutor:
+    """The process-wide pool, recreated if a crashed worker broke it."""
+    global _pool
+    with _pool_lock:
+        if _pool is None or getattr(_pool, "_broken", False):
+            _pool = ProcessPoolExecutor(max_workers=MAX_WORKERS)
+        return _pool
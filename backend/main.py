@@ -1,9 +1,24 @@
 """KPKN Fit – Backend API (FastAPI)
 Motores de volumen, fatiga, recuperación, análisis y motor adaptativo AUGE.
 """
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from routers import volume, fatigue, recovery, analysis, ai, adaptive
+from engines.adaptive_engine import set_population_prior_table
+from engines.gp_prior import load_prior_surface
+from engines.recovery_population import load_prior_table
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Load (or build once) the prior-GP surface before serving cold-start users.
+    load_prior_surface()
+    # Seed new users' recovery priors from the latest cross-user table, if any.
+    set_population_prior_table(load_prior_table())
+    yield
+
 
 app = FastAPI(
     title="KPKN Engine API",
@@ -13,6 +28,7 @@ app = FastAPI(
         "Incluye motor adaptativo AUGE con inferencia bayesiana, "
         "procesos gaussianos y modelo ODE Banister."
     ),
+    lifespan=lifespan,
 )
 
 app.add_middleware(
@@ -5,8 +5,17 @@ Gaussian Process fatigue modeling, Banister ODE fitness-fatigue model,
 and the self-improvement feedback loop.
 """
 from __future__ import annotations
-from pydantic import BaseModel, Field
-from typing import Optional
+from pydantic import BaseModel, Field, model_validator
+from typing import Annotated, Literal, Optional
+
+# Upper bound on a request's `workers`; the shared pool caps them further.
+MAX_REQUEST_WORKERS = 16
+# Largest taper search grid (taper days × reductions × last heavy days).
+TAPER_MAX_CANDIDATES = 100_000
+TAPER_MAX_OPTIONS = 128
+# Largest what-if scenario grid (product of the four *_options axes).
+SCENARIO_MAX_CANDIDATES = 2_000
+SCENARIO_MAX_OPTIONS = 64
 
 
 # ═══════════════════════════════════════════════════════════════════
@@ -59,6 +68,9 @@ class BayesianUpdateRequest(BaseModel):
     user_id: str
     observations: list[RecoveryObservation]
     current_priors: UserRecoveryPriors = Field(default_factory=UserRecoveryPriors)
+    # Select the population stratum that seeds muscles without a prior yet.
+    athlete_type: Optional[str] = None
+    age: Optional[float] = None
 
 
 class BayesianUpdateResponse(BaseModel):
@@ -66,6 +78,29 @@ class BayesianUpdateResponse(BaseModel):
     personalized_recovery_hours: dict[str, float]
     confidence_intervals: dict[str, tuple[float, float]]
     improvement_delta: dict[str, float]
+    # Server-side log only: how the stored posterior snapshot was used.
+    snapshot_status: Optional[Literal["advanced", "compacted", "rebuilt"]] = None
+
+
+class RecoveryObservationLogRequest(BaseModel):
+    """Observations appended to the server-side log; priors are not sent."""
+    user_id: str
+    observations: list[RecoveryObservation] = Field(default_factory=list)
+    athlete_type: Optional[str] = None
+    age: Optional[float] = None
+
+
+class RecoveryPosteriorSnapshot(BaseModel):
+    """Posterior after folding in every logged observation up to last_seq.
+
+    formula_version records the implied-τ derivation used; a snapshot from
+    another version is discarded and the log is replayed.
+    """
+    priors: UserRecoveryPriors
+    last_seq: int = 0
+    formula_version: int
+    athlete_type: Optional[str] = None
+    age: Optional[float] = None
 
 
 # ═══════════════════════════════════════════════════════════════════
@@ -101,6 +136,9 @@ class GPFatigueRequest(BaseModel):
     )
     session_stress: float = 50.0
     context: Optional[dict] = None
+    incremental: bool = False
+    warm_start: bool = False
+    workers: int = Field(default=1, ge=1, le=MAX_REQUEST_WORKERS)
 
 
 class GPFatiguePrediction(BaseModel):
@@ -111,6 +149,52 @@ class GPFatiguePrediction(BaseModel):
     peak_fatigue_hour: float
     supercompensation_hour: Optional[float] = None
     full_recovery_hour: float
+    model_status: Optional[Literal["reused", "appended", "refit_schedule", "refit_drift", "rebuilt"]] = None
+
+
+class GPScenarioGridRequest(GPFatigueRequest):
+    """What-if grid: the Cartesian product of the *_options axes.
+
+    Axes left empty keep the value from session_stress / context.
+    """
+    session_stress_options: list[float] = Field(default_factory=list, max_length=SCENARIO_MAX_OPTIONS)
+    sleep_hours_options: list[float] = Field(default_factory=list, max_length=SCENARIO_MAX_OPTIONS)
+    stress_level_options: list[float] = Field(default_factory=list, max_length=SCENARIO_MAX_OPTIONS)
+    nutrition_status_options: list[float] = Field(default_factory=list, max_length=SCENARIO_MAX_OPTIONS)
+
+    @model_validator(mode="after")
+    def _bounded_grid(self) -> "GPScenarioGridRequest":
+        size = 1
+        for options in (
+            self.session_stress_options,
+            self.sleep_hours_options,
+            self.stress_level_options,
+            self.nutrition_status_options,
+        ):
+            size *= max(1, len(options))
+        if size > SCENARIO_MAX_CANDIDATES:
+            raise ValueError(f"Scenario grid of {size} candidates exceeds {SCENARIO_MAX_CANDIDATES}")
+        return self
+
+
+class FatigueScenario(BaseModel):
+    session_stress: float
+    sleep_hours: float
+    stress_level: float
+    nutrition_status: float
+
+
+class GPScenarioGridResponse(BaseModel):
+    """Scenario matrix: row i of each matrix belongs to scenarios[i]."""
+    hours: list[float]
+    scenarios: list[FatigueScenario]
+    mean_fatigue: list[list[float]]
+    upper_bound: list[list[float]]
+    lower_bound: list[list[float]]
+    peak_fatigue_hour: list[float]
+    supercompensation_hour: list[Optional[float]]
+    full_recovery_hour: list[float]
+    model_status: Optional[Literal["reused", "appended", "refit_schedule", "refit_drift", "rebuilt"]] = None
 
 
 # ═══════════════════════════════════════════════════════════════════
@@ -138,6 +222,25 @@ class TrainingImpulse(BaseModel):
     spinal_impulse: float = 0.0
 
 
+class TimelineOutput(BaseModel):
+    """How forecast series are returned.
+
+    resolution_hours thins the native grid to a coarser step, max_points
+    decimates with LTTB (peaks are always kept), and encoding packs each
+    series as base64 float32 or integer deltas instead of JSON floats.
+    """
+    resolution_hours: Optional[float] = Field(default=None, gt=0)
+    max_points: Optional[int] = Field(default=None, ge=3)
+    encoding: Literal["json", "float32_b64", "delta"] = "json"
+
+
+class EncodedSeries(BaseModel):
+    encoding: Literal["float32_b64", "delta"]
+    length: int
+    data: str | list[int]
+    scale: Optional[float] = None
+
+
 class BanisterRequest(BaseModel):
     user_id: str
     training_history: list[TrainingImpulse]
@@ -145,6 +248,20 @@ class BanisterRequest(BaseModel):
     forecast_hours: float = 168.0
     optimize_params: bool = False
     performance_observations: Optional[list[dict]] = None
+    solver: Literal["ode", "recursive"] = "ode"
+    incremental: bool = False
+    rebuild_state: bool = False
+    output: TimelineOutput = Field(default_factory=TimelineOutput)
+
+
+class BanisterFitDiagnostics(BaseModel):
+    """Optimizer report for a Banister parameter fit."""
+    method: str
+    iterations: int
+    function_evaluations: int
+    fit_time_ms: float
+    loss: float
+    converged: bool
 
 
 class BanisterResponse(BaseModel):
@@ -153,8 +270,117 @@ class BanisterResponse(BaseModel):
     fatigue: list[float]
     performance: list[float]
     optimal_params: Optional[BanisterParams] = None
+    fit_diagnostics: Optional[BanisterFitDiagnostics] = None
     next_optimal_session_hour: Optional[float] = None
     predicted_peak_performance_hour: Optional[float] = None
+    checkpoint_status: Optional[Literal["reused", "advanced", "rebuilt"]] = None
+    encoded: Optional[dict[str, EncodedSeries]] = None
+
+
+class RosterAthlete(BaseModel):
+    athlete_id: str
+    training_history: list[TrainingImpulse]
+    params: BanisterParams = Field(default_factory=BanisterParams)
+
+
+class BanisterRosterRequest(BaseModel):
+    user_id: str
+    athletes: list[RosterAthlete]
+    forecast_hours: float = 168.0
+    include_timelines: bool = False
+    workers: int = Field(default=1, ge=1, le=MAX_REQUEST_WORKERS)
+
+
+class BanisterAthleteSummary(BaseModel):
+    """Per-athlete projection for coach dashboards; the full curve is optional."""
+    athlete_id: str
+    current_performance: float
+    current_fitness: float
+    current_fatigue: float
+    peak_performance: float
+    predicted_peak_performance_hour: Optional[float] = None
+    next_optimal_session_hour: Optional[float] = None
+    timeline: Optional[BanisterResponse] = None
+
+
+class BanisterRosterResponse(BaseModel):
+    athletes: list[BanisterAthleteSummary]
+    solve_time_ms: float
+
+
+class TemplateSession(BaseModel):
+    """One session of the repeating weekly plan used by the taper planner."""
+    day_offset_hours: float
+    impulse: float
+    heavy: bool = False
+
+
+class TaperPlanRequest(BaseModel):
+    user_id: str
+    training_history: list[TrainingImpulse]
+    params: BanisterParams = Field(default_factory=BanisterParams)
+    competition_hour: float
+    weekly_template: list[TemplateSession]
+    plan_start_hour: Optional[float] = None
+    taper_days_options: list[int] = Field(
+        default_factory=lambda: list(range(0, 22)), min_length=1, max_length=TAPER_MAX_OPTIONS,
+    )
+    volume_reduction_options: list[Annotated[float, Field(ge=0, le=1)]] = Field(
+        default_factory=lambda: [round(0.05 * i, 2) for i in range(0, 17)],
+        min_length=1,
+        max_length=TAPER_MAX_OPTIONS,
+    )
+    last_heavy_days_options: list[int] = Field(
+        default_factory=lambda: list(range(0, 15)), min_length=1, max_length=TAPER_MAX_OPTIONS,
+    )
+    top_k: int = 5
+
+    @model_validator(mode="after")
+    def _bounded_grid(self) -> "TaperPlanRequest":
+        size = (
+            len(self.taper_days_options)
+            * len(self.volume_reduction_options)
+            * len(self.last_heavy_days_options)
+        )
+        if size > TAPER_MAX_CANDIDATES:
+            raise ValueError(f"Taper grid of {size} candidates exceeds {TAPER_MAX_CANDIDATES}")
+        return self
+
+
+class TaperCandidate(BaseModel):
+    taper_days: int
+    volume_reduction: float
+    last_heavy_days_out: int
+    predicted_performance: float
+
+
+class TaperPlanResponse(BaseModel):
+    best: TaperCandidate
+    baseline_performance: float
+    predicted_gain: float
+    top_candidates: list[TaperCandidate]
+    planned_sessions: list[TrainingImpulse]
+    candidates_evaluated: int
+    search_time_ms: float
+
+
+class BanisterStateCheckpoint(BaseModel):
+    """Fitness/fatigue state at the last impulse, persisted per user and system.
+
+    amplitudes[s] is Σ massᵢ·e^(−(ref − tᵢ)/τₛ) over every impulse, i.e. the
+    settled state at ref_hours. Impulses still inside their Gaussian pulse
+    window are kept raw in the tail so the next hours can be solved exactly.
+    The fingerprint covers the first impulse_count sorted impulses; a
+    mismatch means older history was edited and the state is rebuilt.
+    """
+    origin_hours: float
+    impulse_count: int
+    fingerprint: str
+    taus: list[float]
+    ref_hours: float
+    amplitudes: list[float]
+    tail_times: list[float] = Field(default_factory=list)
+    tail_magnitudes: list[list[float]] = Field(default_factory=list)
 
 
 # ═══════════════════════════════════════════════════════════════════
@@ -201,3 +427,79 @@ class SelfImprovementResponse(BaseModel):
     overall_prediction_score: float
     improvement_trend: list[float]
     recommendations: list[str]
+
+
+class SystemAccuracyStats(BaseModel):
+    """Running error sums for one system; every metric is an O(1) read.
+
+    error = predicted − actual. actual_mean / actual_m2 are Welford's
+    running mean and Σ(actual − mean)², so R² = 1 − Σerror² / actual_m2.
+    """
+    count: int = 0
+    error_sum: float = 0.0
+    abs_error_sum: float = 0.0
+    sq_error_sum: float = 0.0
+    actual_mean: float = 0.0
+    actual_m2: float = 0.0
+
+
+class AccuracyLedger(BaseModel):
+    """Server-side accuracy state for one user.
+
+    Matched prediction/outcome pairs are folded into their system's stats
+    and dropped. The trend keeps the MAE of every completed window of
+    TREND_WINDOW errors plus the raw errors of the window in progress.
+    Predictions still waiting for an outcome are stored separately
+    (PendingPredictions) so reading the ledger stays O(1).
+    """
+    systems: dict[str, SystemAccuracyStats] = Field(default_factory=dict)
+    trend: list[float] = Field(default_factory=list)
+    trend_partial: list[float] = Field(default_factory=list)
+
+
+class PendingPredictions(BaseModel):
+    predictions: dict[str, PredictionRecord] = Field(default_factory=dict)
+
+
+class AccuracyLedgerRequest(BaseModel):
+    user_id: str
+    predictions: list[PredictionRecord] = Field(default_factory=list)
+    outcomes: list[OutcomeRecord] = Field(default_factory=list)
+
+
+class AccuracyTrendQuery(BaseModel):
+    """Which MAE windows to read off the time-ordered error stream.
+
+    Sample windows cover `window` consecutive errors every `stride` errors
+    (stride defaults to window, i.e. non-overlapping). period switches to
+    calendar windows (UTC weeks starting Monday, or months) instead.
+    """
+    window: int = Field(5, ge=1)
+    stride: Optional[int] = Field(None, ge=1)
+    period: Optional[Literal["week", "month"]] = None
+    by_system: bool = True
+
+
+class AccuracyTrendRequest(AccuracyTrendQuery):
+    user_id: str
+    predictions: list[PredictionRecord]
+    outcomes: list[OutcomeRecord]
+
+
+class AccuracyLedgerTrendRequest(AccuracyTrendQuery):
+    user_id: str
+
+
+class TrendWindow(BaseModel):
+    start: str
+    end: str
+    sample_count: int
+    mae: float
+    bias: float
+
+
+class AccuracyTrendResponse(BaseModel):
+    overall: list[TrendWindow]
+    by_system: dict[str, list[TrendWindow]] = Field(default_factory=dict)
+    sample_count: int
+    index_status: Optional[Literal["cached", "built"]] = None
@@ -238,6 +238,32 @@ class BatteryCalibration(BaseModel):
     lastCalibrated: str = ""
 
 
+class BatterySessionDrain(BaseModel):
+    logId: str
+    time: float  # epoch ms
+    cns: float
+    muscular: float
+    spinal: float
+
+
+class GlobalBatteryState(BaseModel):
+    """Decayed training fatigue behind the global batteries, persisted per user.
+
+    cns/muscular/spinal are Σ drainᵢ·e^(−k·(referenceTime − tᵢ)/h) over the
+    sessions of the 7-day window; muscular keeps one sum per nutrition status,
+    since each decays with its own half-life. The window's per-session drains
+    are kept so they can be subtracted when they age out or are edited.
+    tanks are the capacities they were costed with; a mismatch means the
+    state is rebuilt from history.
+    """
+    referenceTime: float = 0  # epoch ms
+    cns: float = 0
+    muscular: dict[str, float] = Field(default_factory=dict)
+    spinal: float = 0
+    sessions: list[BatterySessionDrain] = Field(default_factory=list)
+    tanks: dict[str, float] = Field(default_factory=dict)
+
+
 class AthleteProfileScore(BaseModel):
     totalScore: float = 10
     profileLevel: str = "Advanced"
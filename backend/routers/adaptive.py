@@ -4,36 +4,106 @@ Endpoints for Bayesian recovery learning, GP fatigue prediction,
 Banister fitness-fatigue modeling, and self-improvement analytics.
 """
 from __future__ import annotations
-from fastapi import APIRouter
+import sqlite3
+from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel, Field
 from typing import Optional
 
 from models.adaptive import (
     BayesianUpdateRequest,
     BayesianUpdateResponse,
+    RecoveryObservation,
+    RecoveryObservationLogRequest,
+    RecoveryPosteriorSnapshot,
     GPFatigueRequest,
     GPFatiguePrediction,
+    GPScenarioGridRequest,
+    GPScenarioGridResponse,
     BanisterRequest,
     BanisterResponse,
     BanisterParams,
+    BanisterStateCheckpoint,
+    BanisterRosterRequest,
+    BanisterRosterResponse,
+    TaperPlanRequest,
+    TaperPlanResponse,
     SelfImprovementRequest,
     SelfImprovementResponse,
+    AccuracyLedger,
+    AccuracyLedgerRequest,
+    PendingPredictions,
+    AccuracyTrendRequest,
+    AccuracyLedgerTrendRequest,
+    AccuracyTrendQuery,
+    AccuracyTrendResponse,
     TrainingImpulse,
+    TimelineOutput,
     UserRecoveryPriors,
 )
 from engines.adaptive_engine import (
     bayesian_update_recovery,
     get_personalized_recovery_time,
+    RECOVERY_FORMULA_VERSION,
     train_gp_fatigue_model,
+    gp_training_fingerprint,
+    update_gp_fatigue_model,
+    expand_fatigue_scenarios,
+    predict_fatigue_scenarios,
+    gp_kernel_theta,
+    IncrementalGP,
+    SparseGP,
     predict_fatigue_curve,
+    GP_MIN_OBSERVATIONS,
     evaluate_prediction_accuracy,
     compute_adaptive_corrections,
+    update_accuracy_ledger,
+    accuracy_from_ledger,
+    paired_prediction_errors,
+    build_error_index,
+    error_stream_fingerprint,
+    ErrorTrendIndex,
 )
+from engines.gp_prior import predict_prior_fatigue_curve, predict_prior_fatigue_scenarios
 from engines.banister_model import (
     solve_banister,
-    optimize_banister_params,
+    fit_banister_params,
     solve_auge_banister,
+    compare_banister_solvers,
+    solve_banister_incremental,
+    solve_auge_banister_incremental,
+    solve_banister_roster,
+    plan_taper,
+    AUGE_SYSTEMS,
 )
+from storage.state_store import load_state, save_state, delete_state, state_transaction
+from storage.observation_log import (
+    RECOVERY_SNAPSHOT_KEY,
+    append_observations,
+    read_observations,
+    delete_observations,
+)
+from storage.model_store import ModelStore
+from storage.accuracy_log import (
+    append_errors,
+    read_errors,
+    last_error_seq,
+    delete_errors,
+    connect as connect_accuracy_log,
+)
+
+BANISTER_STATE_PREFIX = "banister:"
+BANISTER_STATE_KEY = "banister:solve"
+AUGE_STATE_KEY_PREFIX = "banister:auge:"
+# Logged observations folded in before the posterior snapshot is rewritten.
+RECOVERY_SNAPSHOT_INTERVAL = 25
+ACCURACY_STATE_PREFIX = "accuracy:"
+ACCURACY_LEDGER_KEY = "accuracy:ledger"
+ACCURACY_PENDING_KEY = "accuracy:pending"
+
+# Fitted (GaussianProcessRegressor, StandardScaler) pairs per user.
+GP_MODEL_CACHE = ModelStore("gp_fatigue")
+# Prefix-sum error trend indexes per user.
+ACCURACY_TREND_CACHE = ModelStore("accuracy_trend")
 
 router = APIRouter(prefix="/adaptive", tags=["Adaptive Engine"])
 
@@ -48,7 +118,60 @@ def update_recovery_priors(req: BayesianUpdateRequest):
     updated Bayesian priors with personalized recovery times per muscle.
     The model converges to the individual's true recovery dynamics over time.
     """
-    return bayesian_update_recovery(req.observations, req.current_priors)
+    return bayesian_update_recovery(req.observations, req.current_priors, req.athlete_type, req.age)
+
+
+@router.post("/recovery/log", response_model=BayesianUpdateResponse)
+def log_recovery_observations(req: RecoveryObservationLogRequest):
+    """Append observations to the server-side log and return the posterior.
+
+    Clients no longer send their priors back: the server folds the log tail
+    after the stored posterior snapshot into it, so each call costs
+    O(new observations). The snapshot is rewritten every
+    RECOVERY_SNAPSHOT_INTERVAL observations, and rebuilt from the full log
+    when the implied-τ formula version changes. Send no observations to
+    read the current posterior.
+    """
+    if req.observations:
+        append_observations(req.user_id, [obs.model_dump() for obs in req.observations])
+
+    stored = load_state(req.user_id, RECOVERY_SNAPSHOT_KEY)
+    snapshot = RecoveryPosteriorSnapshot(**stored) if stored else None
+    status = "advanced"
+    if snapshot is not None and snapshot.formula_version != RECOVERY_FORMULA_VERSION:
+        snapshot, status = None, "rebuilt"
+
+    athlete_type = req.athlete_type or (snapshot.athlete_type if snapshot else None)
+    age = req.age if req.age is not None else (snapshot.age if snapshot else None)
+    tail = read_observations(req.user_id, snapshot.last_seq if snapshot else 0)
+    result = bayesian_update_recovery(
+        [RecoveryObservation(**obs) for _, obs in tail],
+        snapshot.priors if snapshot else UserRecoveryPriors(),
+        athlete_type,
+        age,
+    )
+
+    if tail and (status == "rebuilt" or len(tail) >= RECOVERY_SNAPSHOT_INTERVAL):
+        save_state(req.user_id, RECOVERY_SNAPSHOT_KEY, RecoveryPosteriorSnapshot(
+            priors=result.updated_priors,
+            last_seq=tail[-1][0],
+            formula_version=RECOVERY_FORMULA_VERSION,
+            athlete_type=athlete_type,
+            age=age,
+        ).model_dump())
+        status = "rebuilt" if status == "rebuilt" else "compacted"
+
+    result.snapshot_status = status
+    return result
+
+
+@router.delete("/recovery/log/{user_id}")
+def delete_recovery_log(user_id: str):
+    """Erase the user's observation log and posterior snapshot."""
+    return {
+        "deleted_observations": delete_observations(user_id),
+        "deleted_snapshots": delete_state(user_id, RECOVERY_SNAPSHOT_KEY),
+    }
 
 
 class PersonalizedRecoveryRequest(BaseModel):
@@ -103,14 +226,93 @@ def predict_fatigue(req: GPFatigueRequest):
     - Delayed onset (fatigue peaks 24-48h after training)
     - Supercompensation (temporary performance boost)
     - Context-dependent recovery (sleep, nutrition effects)
+
+    The fitted GP and scaler are cached per user_id and reused for as long
+    as the training data fingerprint is unchanged. Cold-start users are
+    answered from the precomputed prior surface.
+
+    incremental=True keeps the user's Cholesky factor and appends new
+    observations in O(n²) with fixed hyperparameters; they are re-optimized
+    on a doubling schedule or when a drift test fires (see model_status).
+    warm_start seeds the hyperparameter search from the user's previous
+    model; workers spreads the optimizer restarts over a process pool.
     """
-    gp, scaler = train_gp_fatigue_model(req.training_data)
-    return predict_fatigue_curve(
+    if len(req.training_data) < GP_MIN_OBSERVATIONS:
+        return predict_prior_fatigue_curve(
+            req.prediction_hours,
+            session_stress=req.session_stress,
+            context=req.context,
+        )
+
+    gp, scaler, status = _fatigue_model(req)
+    result = predict_fatigue_curve(
         gp, scaler,
         prediction_hours=req.prediction_hours,
         session_stress=req.session_stress,
         context=req.context,
     )
+    result.model_status = status
+    return result
+
+
+@router.post("/fatigue/scenarios", response_model=GPScenarioGridResponse)
+def predict_fatigue_scenarios_endpoint(req: GPScenarioGridRequest):
+    """What-if grid: fatigue curves for every combination of the options.
+
+    The model is fetched or fitted once (same cache and modes as
+    /fatigue/predict). Every scenario × prediction hour is then evaluated
+    in a single vectorized predict call, and each scenario's row gets its
+    own peak, supercompensation and full-recovery hours.
+    """
+    scenarios = expand_fatigue_scenarios(req.session_stress, req.context, {
+        "session_stress": req.session_stress_options,
+        "sleep_hours": req.sleep_hours_options,
+        "stress_level": req.stress_level_options,
+        "nutrition_status": req.nutrition_status_options,
+    })
+    if len(req.training_data) < GP_MIN_OBSERVATIONS:
+        return predict_prior_fatigue_scenarios(req.prediction_hours, scenarios)
+
+    gp, scaler, status = _fatigue_model(req)
+    result = predict_fatigue_scenarios(gp, scaler, req.prediction_hours, scenarios)
+    result.model_status = status
+    return result
+
+
+def _fatigue_model(req: GPFatigueRequest) -> tuple:
+    """(gp, scaler, model_status) from the per-user cache, fitting on a miss."""
+    fingerprint = gp_training_fingerprint(req.training_data)
+    model = GP_MODEL_CACHE.get(req.user_id, fingerprint)
+    status = "reused" if model is not None and req.incremental else None
+    if model is None:
+        stored = GP_MODEL_CACHE.peek(req.user_id) if req.incremental or req.warm_start else None
+        if req.incremental:
+            state = stored[0] if stored is not None and isinstance(stored[0], (IncrementalGP, SparseGP)) else None
+            state, status = update_gp_fatigue_model(
+                state, req.training_data, warm_start=req.warm_start, workers=req.workers,
+            )
+            model = (state, state.scaler)
+        else:
+            model = train_gp_fatigue_model(
+                req.training_data,
+                warm_start=gp_kernel_theta(stored[0]) if stored is not None else None,
+                workers=req.workers,
+            )
+        GP_MODEL_CACHE.put(req.user_id, fingerprint, model)
+    gp, scaler = model
+    return gp, scaler, status
+
+
+@router.get("/fatigue/cache/stats")
+def gp_cache_stats():
+    """Hit/miss/eviction counters and memory footprint of the GP model cache."""
+    return GP_MODEL_CACHE.stats()
+
+
+@router.delete("/fatigue/cache/{user_id}")
+def reset_gp_cache(user_id: str):
+    """Drop a user's cached GP (memory and disk); the next call refits."""
+    return {"deleted": GP_MODEL_CACHE.invalidate(user_id)}
 
 
 # ─── Banister Fitness-Fatigue Model ──────────────────────────────
@@ -122,27 +324,104 @@ def solve_banister_endpoint(req: BanisterRequest):
     Given training impulse history and model parameters, integrates
     the differential equations forward in time to predict performance.
     Optionally optimizes parameters from observed performance data.
+    solver="recursive" uses the exact closed-form O(N + T) solution.
+    incremental=True resumes from the user's stored state checkpoint and only
+    advances it by newly appended sessions; rebuild_state forces a replay.
     """
     params = req.params
+    diagnostics = None
 
     if req.optimize_params and req.performance_observations:
-        params = optimize_banister_params(
+        params, diagnostics = fit_banister_params(
             req.training_history,
             req.performance_observations,
             params,
         )
 
-    result = solve_banister(req.training_history, params, req.forecast_hours)
+    if req.incremental:
+        stored = load_state(req.user_id, BANISTER_STATE_KEY)
+        result, checkpoint = solve_banister_incremental(
+            req.training_history,
+            params,
+            req.forecast_hours,
+            BanisterStateCheckpoint(**stored) if stored else None,
+            rebuild=req.rebuild_state,
+            output=req.output,
+        )
+        if checkpoint is not None and result.checkpoint_status != "reused":
+            save_state(req.user_id, BANISTER_STATE_KEY, checkpoint.model_dump())
+    else:
+        result = solve_banister(req.training_history, params, req.forecast_hours, solver=req.solver, output=req.output)
 
     if req.optimize_params:
         result.optimal_params = params
+        result.fit_diagnostics = diagnostics
 
     return result
 
 
+@router.post("/banister/roster", response_model=BanisterRosterResponse)
+def solve_banister_roster_endpoint(req: BanisterRosterRequest):
+    """Batch Banister projection for a coach's roster.
+
+    Solves every athlete's history with their own parameters in one
+    vectorized pass (optionally fanned out over worker processes) and
+    returns per-athlete summaries: current performance, predicted peak hour
+    and next optimal session. Full curves only with include_timelines.
+    """
+    return solve_banister_roster(
+        req.athletes,
+        req.forecast_hours,
+        include_timelines=req.include_timelines,
+        workers=req.workers,
+    )
+
+
+@router.post("/banister/taper", response_model=TaperPlanResponse)
+def plan_taper_endpoint(req: TaperPlanRequest):
+    """Taper and peaking planner on top of the Banister model.
+
+    Repeats the weekly session template up to the competition and searches
+    taper length, volume reduction and last heavy session to maximize the
+    predicted performance on competition day with the given (fitted)
+    parameters. Returns the best schedule, the runners-up and the gain over
+    training straight through.
+    """
+    return plan_taper(
+        req.training_history,
+        req.params,
+        req.competition_hour,
+        req.weekly_template,
+        plan_start_hour=req.plan_start_hour,
+        taper_days_options=req.taper_days_options,
+        volume_reduction_options=req.volume_reduction_options,
+        last_heavy_days_options=req.last_heavy_days_options,
+        top_k=req.top_k,
+    )
+
+
+class BanisterParityRequest(BaseModel):
+    training_history: list[TrainingImpulse]
+    params: BanisterParams = Field(default_factory=BanisterParams)
+    forecast_hours: float = 168.0
+
+
+@router.post("/banister/parity")
+def banister_parity_endpoint(req: BanisterParityRequest):
+    """Compare the RK45 ODE solver against the closed-form recursive solver.
+
+    Reports the maximum absolute deviation of fitness, fatigue and
+    performance so the fast path can be validated on real histories.
+    """
+    return compare_banister_solvers(req.training_history, req.params, req.forecast_hours)
+
+
 class AugeBanisterRequest(BaseModel):
     training_history: list[TrainingImpulse]
     forecast_hours: float = 168.0
+    user_id: Optional[str] = None
+    rebuild_state: bool = False
+    output: TimelineOutput = Field(default_factory=TimelineOutput)
 
 
 @router.post("/banister/auge")
@@ -156,8 +435,37 @@ def solve_auge_banister_endpoint(req: AugeBanisterRequest):
 
     Returns combined performance prediction, per-system breakdown,
     optimal next session timing, and a human-readable verdict.
+    With a user_id, per-system state checkpoints are resumed and persisted.
+    """
+    if not req.user_id:
+        return solve_auge_banister(req.training_history, req.forecast_hours, req.output)
+
+    stored = {
+        system: load_state(req.user_id, f"{AUGE_STATE_KEY_PREFIX}{system}")
+        for system in AUGE_SYSTEMS
+    }
+    result, checkpoints = solve_auge_banister_incremental(
+        req.training_history,
+        req.forecast_hours,
+        {system: BanisterStateCheckpoint(**doc) if doc else None for system, doc in stored.items()},
+        rebuild=req.rebuild_state,
+        output=req.output,
+    )
+    for system, checkpoint in checkpoints.items():
+        if result["checkpoint_status"][system] != "reused":
+            save_state(req.user_id, f"{AUGE_STATE_KEY_PREFIX}{system}", checkpoint.model_dump())
+    return result
+
+
+@router.delete("/banister/state/{user_id}")
+def reset_banister_state(user_id: str):
+    """Drop every stored Banister checkpoint for a user.
+
+    Use after editing or deleting older sessions; the next solve replays
+    the full history. Edits are also detected automatically through the
+    history fingerprint.
     """
-    return solve_auge_banister(req.training_history, req.forecast_hours)
+    return {"deleted": delete_state(user_id, BANISTER_STATE_PREFIX)}
 
 
 # ─── Self-Improvement Loop ───────────────────────────────────────
@@ -202,6 +510,113 @@ def get_corrections(req: CorrectionRequest):
     }
 
 
+@router.post("/self-improve/ledger", response_model=SelfImprovementResponse)
+def update_accuracy_ledger_endpoint(req: AccuracyLedgerRequest):
+    """Record new predictions and outcomes in the user's accuracy ledger.
+
+    Only the new records are sent; the server pairs outcomes with their
+    pending predictions and keeps running error sums per system, so the
+    report costs O(new records) instead of a full re-evaluation. Ledger,
+    pending predictions and the error stream are read and written in one
+    transaction, so overlapping requests for a user cannot lose counts.
+    """
+    with state_transaction(connect_accuracy_log) as conn:
+        stored = load_state(req.user_id, ACCURACY_PENDING_KEY, conn)
+        ledger, pending, matched = update_accuracy_ledger(
+            _load_accuracy_ledger(req.user_id, conn),
+            PendingPredictions(**stored) if stored else PendingPredictions(),
+            req.predictions,
+            req.outcomes,
+        )
+        save_state(req.user_id, ACCURACY_LEDGER_KEY, ledger.model_dump(), conn)
+        save_state(req.user_id, ACCURACY_PENDING_KEY, pending.model_dump(), conn)
+        append_errors(req.user_id, matched, conn)
+    return accuracy_from_ledger(ledger)
+
+
+@router.get("/self-improve/ledger/{user_id}", response_model=SelfImprovementResponse)
+def read_accuracy_ledger(user_id: str):
+    """Current accuracy report from the ledger (O(1) in history length)."""
+    return accuracy_from_ledger(_load_accuracy_ledger(user_id))
+
+
+class LedgerCorrectionRequest(BaseModel):
+    user_id: str
+    current_calibration: Optional[dict] = None
+
+
+@router.post("/self-improve/ledger/corrections")
+def get_ledger_corrections(req: LedgerCorrectionRequest):
+    """batteryCalibration corrections from the ledger; see /self-improve/corrections."""
+    accuracy = accuracy_from_ledger(_load_accuracy_ledger(req.user_id))
+    return {
+        "corrections": compute_adaptive_corrections(accuracy, req.current_calibration),
+        "accuracy_score": accuracy.overall_prediction_score,
+        "details": accuracy.model_dump(),
+    }
+
+
+@router.delete("/self-improve/ledger/{user_id}")
+def reset_accuracy_ledger(user_id: str):
+    """Drop the user's ledger, pending predictions and error stream."""
+    ACCURACY_TREND_CACHE.invalidate(_ledger_trend_key(user_id))
+    delete_errors(user_id)
+    return {"deleted": delete_state(user_id, ACCURACY_STATE_PREFIX)}
+
+
+@router.post("/self-improve/trend", response_model=AccuracyTrendResponse)
+def accuracy_trend(req: AccuracyTrendRequest):
+    """MAE/bias trend over any window layout, overall and per system.
+
+    The paired errors are sorted by prediction time once and indexed with
+    prefix sums; the index is cached per user and data fingerprint, so
+    further queries (other window, stride or period) cost O(1) per window.
+    """
+    stream = paired_prediction_errors(req.predictions, req.outcomes)
+    index, status = _cached_trend_index(req.user_id, error_stream_fingerprint(*stream), lambda: stream)
+    return _query_trend_index(index, req, status)
+
+
+@router.post("/self-improve/ledger/trend", response_model=AccuracyTrendResponse)
+def accuracy_ledger_trend(req: AccuracyLedgerTrendRequest):
+    """Trend query over the error stream recorded by the accuracy ledger."""
+    fingerprint = f"seq:{last_error_seq(req.user_id)}"
+    index, status = _cached_trend_index(
+        _ledger_trend_key(req.user_id), fingerprint, lambda: read_errors(req.user_id),
+    )
+    return _query_trend_index(index, req, status)
+
+
+def _ledger_trend_key(user_id: str) -> str:
+    return f"{user_id}#ledger"
+
+
+def _cached_trend_index(key: str, fingerprint: str, load_stream) -> tuple[ErrorTrendIndex, str]:
+    index = ACCURACY_TREND_CACHE.get(key, fingerprint)
+    if index is not None:
+        return index, "cached"
+    index = build_error_index(*load_stream())
+    ACCURACY_TREND_CACHE.put(key, fingerprint, index)
+    return index, "built"
+
+
+def _query_trend_index(
+    index: ErrorTrendIndex, query: AccuracyTrendQuery, status: str,
+) -> AccuracyTrendResponse:
+    # Calendar periods over non-ISO timestamps are a client error, not a 500.
+    try:
+        result = index.query(query)
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc)) from exc
+    result.index_status = status
+    return result
+
+
+def _load_accuracy_ledger(user_id: str, conn: sqlite3.Connection | None = None) -> AccuracyLedger:
+    stored = load_state(user_id, ACCURACY_LEDGER_KEY, conn)
+    return AccuracyLedger(**stored) if stored else AccuracyLedger()
+
+
 # ─── Health & Status ─────────────────────────────────────────────
 
 @router.get("/status")
@@ -1,20 +1,49 @@
 """Recovery service endpoints."""
-from fastapi import APIRouter
-from pydantic import BaseModel
+from fastapi import APIRouter, HTTPException
+from typing import Annotated
+from pydantic import AfterValidator, BaseModel, Field
 from models.common import (
     Settings, WorkoutLog, ExerciseMuscleInfo, MuscleHierarchy,
     SleepLog, PostSessionFeedback, DailyWellbeingLog, WaterLog, NutritionLog,
+    GlobalBatteryState,
 )
+from engines.athlete_context import AthleteContext
 from engines.recovery_engine import (
+    MUSCLE_PROFILE_MAP,
+    MAX_BATTERY_MUSCLES,
     calculate_muscle_battery,
+    calculate_muscle_batteries,
     calculate_systemic_fatigue,
     calculate_daily_readiness,
     calculate_global_batteries,
+    calculate_battery_series,
+    calculate_battery_forecast,
+    FORECAST_THRESHOLDS,
+    MAX_FORECAST_HOURS,
+    battery_state_is_current,
+    build_battery_state,
+    update_battery_state,
+    global_batteries_from_state,
     learn_recovery_rate,
 )
+from storage.state_store import load_state, update_state, delete_state
 
 router = APIRouter(prefix="/recovery", tags=["recovery"])
 
+GLOBAL_BATTERY_STATE_KEY = "battery:global"
+
+
+def _unique_names(names: list[str] | None) -> list[str] | None:
+    return None if names is None else list(dict.fromkeys(names))
+
+
+# Distinct, non-empty names; None means every recovery profile group.
+MuscleNames = Annotated[
+    list[Annotated[str, Field(min_length=1, max_length=64)]] | None,
+    Field(max_length=MAX_BATTERY_MUSCLES),
+    AfterValidator(_unique_names),
+]
+
 
 class MuscleBatteryRequest(BaseModel):
     muscleName: str
@@ -29,6 +58,19 @@ class MuscleBatteryRequest(BaseModel):
     nutritionLogs: list[NutritionLog] = []
 
 
+class MuscleBatteriesRequest(BaseModel):
+    muscleNames: MuscleNames = None
+    history: list[WorkoutLog]
+    exerciseList: list[ExerciseMuscleInfo]
+    sleepLogs: list[SleepLog]
+    settings: Settings
+    muscleHierarchy: MuscleHierarchy
+    postSessionFeedback: list[PostSessionFeedback] = []
+    waterLogs: list[WaterLog] = []
+    dailyWellbeingLogs: list[DailyWellbeingLog] = []
+    nutritionLogs: list[NutritionLog] = []
+
+
 class SystemicFatigueRequest(BaseModel):
     history: list[WorkoutLog]
     sleepLogs: list[SleepLog]
@@ -53,6 +95,65 @@ class GlobalBatteriesRequest(BaseModel):
     exerciseList: list[ExerciseMuscleInfo]
 
 
+class RecoverySnapshotRequest(BaseModel):
+    muscleNames: MuscleNames = None
+    history: list[WorkoutLog]
+    exerciseList: list[ExerciseMuscleInfo]
+    sleepLogs: list[SleepLog]
+    settings: Settings
+    muscleHierarchy: MuscleHierarchy
+    postSessionFeedback: list[PostSessionFeedback] = []
+    waterLogs: list[WaterLog] = []
+    dailyWellbeingLogs: list[DailyWellbeingLog] = []
+    nutritionLogs: list[NutritionLog] = []
+
+
+class BatterySeriesRequest(BaseModel):
+    start: str
+    end: str
+    stepHours: float = Field(24, gt=0)
+    muscleNames: MuscleNames = None
+    history: list[WorkoutLog]
+    exerciseList: list[ExerciseMuscleInfo]
+    sleepLogs: list[SleepLog]
+    settings: Settings
+    postSessionFeedback: list[PostSessionFeedback] = []
+    dailyWellbeingLogs: list[DailyWellbeingLog] = []
+    nutritionLogs: list[NutritionLog] = []
+
+
+class BatteryForecastRequest(BaseModel):
+    muscleNames: MuscleNames = None
+    horizonHours: int = Field(72, ge=1, le=MAX_FORECAST_HOURS)
+    thresholds: list[float] = list(FORECAST_THRESHOLDS)
+    history: list[WorkoutLog]
+    exerciseList: list[ExerciseMuscleInfo]
+    sleepLogs: list[SleepLog]
+    settings: Settings
+    postSessionFeedback: list[PostSessionFeedback] = []
+    dailyWellbeingLogs: list[DailyWellbeingLog] = []
+    nutritionLogs: list[NutritionLog] = []
+
+
+class BatteryStateLogRequest(BaseModel):
+    userId: str
+    logs: list[WorkoutLog] = []  # new or edited sessions
+    removedLogIds: list[str] = []
+    exerciseList: list[ExerciseMuscleInfo]
+    settings: Settings
+    # Full history, only needed when the state is missing, stale or rebuild is set.
+    history: list[WorkoutLog] | None = None
+    rebuild: bool = False
+
+
+class BatteryStateReadRequest(BaseModel):
+    userId: str
+    sleepLogs: list[SleepLog] = []
+    dailyWellbeingLogs: list[DailyWellbeingLog] = []
+    nutritionLogs: list[NutritionLog] = []
+    settings: Settings
+
+
 class LearnRecoveryRequest(BaseModel):
     currentMultiplier: float
     calculatedScore: float
@@ -68,6 +169,16 @@ def muscle_battery(req: MuscleBatteryRequest):
     )
 
 
+@router.post("/muscle-batteries")
+def muscle_batteries(req: MuscleBatteriesRequest):
+    """Every muscle battery for the body map from a single pass over history."""
+    return calculate_muscle_batteries(
+        req.muscleNames or list(MUSCLE_PROFILE_MAP), req.history, req.exerciseList, req.sleepLogs,
+        req.settings, req.muscleHierarchy, req.postSessionFeedback,
+        req.waterLogs, req.dailyWellbeingLogs, req.nutritionLogs,
+    )
+
+
 @router.post("/systemic-fatigue")
 def systemic_fatigue(req: SystemicFatigueRequest):
     return calculate_systemic_fatigue(
@@ -90,6 +201,106 @@ def global_batteries(req: GlobalBatteriesRequest):
     )
 
 
+@router.post("/snapshot")
+def recovery_snapshot(req: RecoverySnapshotRequest):
+    """Muscle batteries, systemic fatigue, readiness and global batteries.
+
+    The logs are parsed and indexed once into an AthleteContext that all
+    four engines share.
+    """
+    ctx = AthleteContext(
+        req.history, req.sleepLogs, req.dailyWellbeingLogs, req.nutritionLogs, req.postSessionFeedback,
+    )
+    systemic = calculate_systemic_fatigue(None, None, None, req.exerciseList, req.settings, context=ctx)
+    return {
+        "muscles": calculate_muscle_batteries(
+            req.muscleNames or list(MUSCLE_PROFILE_MAP), None, req.exerciseList, None,
+            req.settings, req.muscleHierarchy, water_logs=req.waterLogs, context=ctx,
+        ),
+        "systemicFatigue": systemic,
+        "readiness": calculate_daily_readiness(None, None, req.settings, systemic["total"], context=ctx),
+        "globalBatteries": calculate_global_batteries(
+            None, None, None, None, req.settings, req.exerciseList, context=ctx,
+        ),
+    }
+
+
+@router.post("/battery-series")
+def battery_series(req: BatterySeriesRequest):
+    """Historical muscle/CNS/muscular/spinal batteries for the dashboard chart.
+
+    Unparseable dates, end before start or more than MAX_SERIES_POINTS
+    points are rejected with 422.
+    """
+    try:
+        return calculate_battery_series(
+            req.start, req.end, req.stepHours, req.muscleNames or list(MUSCLE_PROFILE_MAP),
+            req.history, req.exerciseList, req.sleepLogs, req.settings,
+            req.postSessionFeedback, req.dailyWellbeingLogs, req.nutritionLogs,
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc)) from exc
+
+
+@router.post("/battery-forecast")
+def battery_forecast(req: BatteryForecastRequest):
+    """Hourly battery projection and the first hour each system is ready."""
+    return calculate_battery_forecast(
+        req.muscleNames or list(MUSCLE_PROFILE_MAP), req.history, req.exerciseList, req.sleepLogs,
+        req.settings, req.postSessionFeedback, req.dailyWellbeingLogs, req.nutritionLogs,
+        req.horizonHours, req.thresholds,
+    )
+
+
+def _load_battery_state(user_id: str) -> GlobalBatteryState | None:
+    stored = load_state(user_id, GLOBAL_BATTERY_STATE_KEY)
+    return GlobalBatteryState(**stored) if stored else None
+
+
+@router.post("/battery-state/log")
+def log_battery_state(req: BatteryStateLogRequest):
+    """Fold logged, edited or deleted sessions into the user's global battery state.
+
+    Costs only the sets of req.logs. When there is no state yet, the settings
+    changed the tanks, or rebuild is set (e.g. after a bulk history import or
+    an exercise catalog edit), the state is recomputed from req.history;
+    without it the stored state is left untouched and status is
+    "rebuild_required". Load, update and save run in one write transaction,
+    so concurrent logs for a user cannot drop each other's sessions.
+    """
+    def _update(stored: dict | None) -> tuple[dict | None, dict]:
+        state = GlobalBatteryState(**stored) if stored else None
+        if req.rebuild or state is None or not battery_state_is_current(state, req.settings):
+            if req.history is None:
+                return None, {"status": "rebuild_required"}
+            state, status = build_battery_state(req.history, req.exerciseList, req.settings), "rebuilt"
+        else:
+            state = update_battery_state(state, req.logs, req.exerciseList, req.settings, req.removedLogIds)
+            status = "advanced"
+        return state.model_dump(), {"status": status, "sessions": len(state.sessions)}
+
+    return update_state(req.userId, GLOBAL_BATTERY_STATE_KEY, _update)
+
+
+@router.post("/battery-state/read")
+def read_battery_state(req: BatteryStateReadRequest):
+    """Global batteries from the stored state, without the workout history."""
+    state = _load_battery_state(req.userId)
+    if state is None or not battery_state_is_current(state, req.settings):
+        return {"status": "rebuild_required", "batteries": None}
+    return {
+        "status": "ok",
+        "batteries": global_batteries_from_state(
+            state, req.sleepLogs, req.dailyWellbeingLogs, req.nutritionLogs, req.settings,
+        ),
+    }
+
+
+@router.delete("/battery-state/{user_id}")
+def reset_battery_state(user_id: str):
+    return {"deleted": delete_state(user_id, GLOBAL_BATTERY_STATE_KEY)}
+
+
 @router.post("/learn-rate")
 def learn_rate(req: LearnRecoveryRequest):
     return {"newMultiplier": learn_recovery_rate(req.currentMultiplier, req.calculatedScore, req.manualFeel)}
@@ -0,0 +1,80 @@
+"""Append-only per-user prediction error stream (SQLite).
+
+The accuracy ledger keeps running sums only; trend queries need the
+individual errors in time order. Each matched prediction/outcome pair is
+appended here as (timestamp, system, predicted − actual).
+
+Shares the state store's database (KPKN_STATE_DB).
+"""
+from __future__ import annotations
+
+import sqlite3
+from contextlib import closing
+from typing import Iterable
+
+from storage.state_store import connect as _connect_state
+
+_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS accuracy_errors (
+        seq       INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id   TEXT NOT NULL,
+        timestamp TEXT NOT NULL,
+        system    TEXT NOT NULL,
+        error     REAL NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS accuracy_errors_user ON accuracy_errors (user_id, seq)",
+)
+
+
+def connect() -> sqlite3.Connection:
+    conn = _connect_state()
+    for statement in _SCHEMA:
+        conn.execute(statement)
+    return conn
+
+
+def append_errors(
+    user_id: str,
+    rows: Iterable[tuple[str, str, float]],
+    conn: sqlite3.Connection | None = None,
+) -> None:
+    """Append (timestamp, system, error) rows, inside conn's transaction if given."""
+    rows = list(rows)
+    if not rows:
+        return
+    if conn is None:
+        with closing(connect()) as conn, conn:
+            append_errors(user_id, rows, conn)
+        return
+    conn.executemany(
+        "INSERT INTO accuracy_errors (user_id, timestamp, system, error) VALUES (?, ?, ?, ?)",
+        [(user_id, timestamp, system, error) for timestamp, system, error in rows],
+    )
+
+
+def last_error_seq(user_id: str) -> int:
+    with closing(connect()) as conn:
+        return conn.execute(
+            "SELECT COALESCE(MAX(seq), 0) FROM accuracy_errors WHERE user_id = ?", (user_id,)
+        ).fetchone()[0]
+
+
+def read_errors(user_id: str) -> tuple[list[str], list[str], list[float]]:
+    """(timestamps, systems, errors) in insertion order."""
+    with closing(connect()) as conn:
+        rows = conn.execute(
+            "SELECT timestamp, system, error FROM accuracy_errors WHERE user_id = ? ORDER BY seq",
+            (user_id,),
+        ).fetchall()
+    if not rows:
+        return [], [], []
+    timestamps, systems, errors = zip(*rows)
+    return list(timestamps), list(systems), list(errors)
+
+
+def delete_errors(user_id: str) -> int:
+    with closing(connect()) as conn, conn:
+        cur = conn.execute("DELETE FROM accuracy_errors WHERE user_id = ?", (user_id,))
+    return cur.rowcount
@@ -0,0 +1,158 @@
+"""Per-user fitted model cache (memory LRU + disk).
+
+Fitting a GP costs O(n³) per optimizer restart, while the fitted
+regressor and its scaler are reusable for as long as the user's training
+data is unchanged. Entries are keyed by (user_id, fingerprint); a new
+fingerprint for the same user replaces the old entry.
+
+The in-memory tier is an LRU bounded by the pickled size of its entries
+(KPKN_MODEL_CACHE_MB, default 256). Every entry is also written to
+KPKN_MODEL_DIR (default backend/.state/models), one file per user, so a
+restarted worker starts warm.
+"""
+from __future__ import annotations
+
+import hashlib
+import os
+import pickle
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Any
+
+_DEFAULT_MODEL_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), ".state", "models")
+_DEFAULT_MAX_MB = 256.0
+
+
+def resolve_model_dir() -> str:
+    return os.getenv("KPKN_MODEL_DIR") or _DEFAULT_MODEL_DIR
+
+
+class ModelStore:
+    """Thread-safe LRU of fitted models with write-through disk persistence."""
+
+    def __init__(self, namespace: str, max_bytes: int | None = None, directory: str | None = None):
+        self.namespace = namespace
+        self.max_bytes = max_bytes if max_bytes is not None else int(
+            float(os.getenv("KPKN_MODEL_CACHE_MB", _DEFAULT_MAX_MB)) * 1024 * 1024
+        )
+        self._directory = directory
+        self._entries: OrderedDict[str, tuple[str, Any, int]] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    # ─── Public API ──────────────────────────────────────────────
+
+    def get(self, user_id: str, fingerprint: str) -> Any | None:
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None and entry[0] == fingerprint:
+                self._entries.move_to_end(user_id)
+                self.hits += 1
+                return entry[1]
+
+        stored = self._read_disk(user_id, fingerprint)
+        with self._lock:
+            if stored is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+            self._insert(user_id, fingerprint, *stored)
+        return stored[0]
+
+    def peek(self, user_id: str) -> Any | None:
+        """Whatever model is stored for the user, regardless of fingerprint.
+
+        Used to resume incremental models; does not touch the counters.
+        """
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None:
+                return entry[1]
+        stored = self._read_disk(user_id)
+        return stored[0] if stored is not None else None
+
+    def put(self, user_id: str, fingerprint: str, model: Any) -> None:
+        blob = pickle.dumps((fingerprint, model), protocol=pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            self._insert(user_id, fingerprint, model, len(blob))
+        self._write_disk(user_id, blob)
+
+    def invalidate(self, user_id: str) -> bool:
+        with self._lock:
+            entry = self._entries.pop(user_id, None)
+            if entry is not None:
+                self._bytes -= entry[2]
+        path = self._path(user_id)
+        existed = os.path.exists(path)
+        if existed:
+            os.remove(path)
+        return entry is not None or existed
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {
+                "namespace": self.namespace,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round((self.hits + self.disk_hits) / lookups, 4) if lookups else 0.0,
+            }
+
+    # ─── Internals ───────────────────────────────────────────────
+
+    def _insert(self, user_id: str, fingerprint: str, model: Any, size: int) -> None:
+        """Insert under the lock, then evict least-recently-used entries."""
+        previous = self._entries.pop(user_id, None)
+        if previous is not None:
+            self._bytes -= previous[2]
+        self._entries[user_id] = (fingerprint, model, size)
+        self._bytes += size
+
+        while self._bytes > self.max_bytes and len(self._entries) > 1:
+            _, (_, _, evicted_size) = self._entries.popitem(last=False)
+            self._bytes -= evicted_size
+            self.evictions += 1
+
+    def _path(self, user_id: str) -> str:
+        directory = self._directory or resolve_model_dir()
+        digest = hashlib.sha1(user_id.encode("utf-8")).hexdigest()
+        return os.path.join(directory, self.namespace, f"{digest}.pkl")
+
+    def _read_disk(self, user_id: str, fingerprint: str | None = None) -> tuple[Any, int] | None:
+        path = self._path(user_id)
+        try:
+            with open(path, "rb") as fh:
+                blob = fh.read()
+        except OSError:
+            return None
+        try:
+            stored_fingerprint, model = pickle.loads(blob)
+        except Exception:
+            # Corrupt, or pickled against an older class layout / library
+            # version: a cache miss, and the file is dropped.
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            return None
+        if fingerprint is not None and stored_fingerprint != fingerprint:
+            return None
+        return model, len(blob)
+
+    def _write_disk(self, user_id: str, blob: bytes) -> None:
+        path = self._path(user_id)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        with os.fdopen(fd, "wb") as fh:
+            fh.write(blob)
+        os.replace(tmp_path, path)
@@ -0,0 +1,99 @@
+"""Append-only per-user recovery observation log (SQLite).
+
+Every RecoveryObservation the server receives is kept verbatim with a
+monotonically increasing sequence number. Posteriors are derived state:
+routers keep a snapshot (priors + last applied seq) in the state store and
+only fold in the log tail after it, so a change to the implied-τ formula
+is handled by replaying the log instead of asking clients for history.
+
+Shares the state store's database (KPKN_STATE_DB).
+"""
+from __future__ import annotations
+
+import json
+import sqlite3
+from contextlib import closing
+from datetime import datetime, timezone
+from typing import Iterable, Iterator
+
+from storage.state_store import connect as _connect_state
+
+_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS recovery_observations (
+        seq         INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id     TEXT NOT NULL,
+        data        TEXT NOT NULL,
+        received_at TEXT NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS recovery_observations_user ON recovery_observations (user_id, seq)",
+)
+
+REPLAY_FETCH_ROWS = 5000
+# State-store key of the user's RecoveryPosteriorSnapshot.
+RECOVERY_SNAPSHOT_KEY = "recovery:posterior"
+
+
+def connect() -> sqlite3.Connection:
+    conn = _connect_state()
+    for statement in _SCHEMA:
+        conn.execute(statement)
+    return conn
+
+
+def append_observations(user_id: str, observations: Iterable[dict]) -> int:
+    """Append in order; returns the seq of the last row written (0 if none)."""
+    received_at = datetime.now(timezone.utc).isoformat()
+    rows = [(user_id, json.dumps(obs), received_at) for obs in observations]
+    if not rows:
+        return 0
+    with closing(connect()) as conn, conn:
+        conn.executemany(
+            "INSERT INTO recovery_observations (user_id, data, received_at) VALUES (?, ?, ?)",
+            rows,
+        )
+        return conn.execute(
+            "SELECT MAX(seq) FROM recovery_observations WHERE user_id = ?", (user_id,)
+        ).fetchone()[0]
+
+
+def read_observations(user_id: str, after_seq: int = 0) -> list[tuple[int, dict]]:
+    """(seq, observation) for the user's rows with seq > after_seq, in order."""
+    with closing(connect()) as conn:
+        rows = conn.execute(
+            "SELECT seq, data FROM recovery_observations WHERE user_id = ? AND seq > ? ORDER BY seq",
+            (user_id, after_seq),
+        ).fetchall()
+    return [(seq, json.loads(data)) for seq, data in rows]
+
+
+def iter_user_logs(fetch_rows: int = REPLAY_FETCH_ROWS) -> Iterator[tuple[str, list[tuple[int, dict]]]]:
+    """Stream the whole log one user at a time, ordered by (user_id, seq).
+
+    A single cursor is read in fetch_rows batches, so memory holds at most
+    one user's log plus one batch.
+    """
+    with closing(connect()) as conn:
+        cursor = conn.execute(
+            "SELECT user_id, seq, data FROM recovery_observations ORDER BY user_id, seq"
+        )
+        current_user, entries = None, []
+        while True:
+            batch = cursor.fetchmany(fetch_rows)
+            if not batch:
+                break
+            for user_id, seq, data in batch:
+                if user_id != current_user:
+                    if entries:
+                        yield current_user, entries
+                    current_user, entries = user_id, []
+                entries.append((seq, json.loads(data)))
+        if entries:
+            yield current_user, entries
+
+
+def delete_observations(user_id: str) -> int:
+    with closing(connect()) as conn, conn:
+        cur = conn.execute("DELETE FROM recovery_observations WHERE user_id = ?", (user_id,))
+    return cur.rowcount
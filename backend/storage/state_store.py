@@ -0,0 +1,132 @@
+"""Local per-user state store (SQLite).
+
+Mirrors the Supabase `user_data` table: one JSON document per
+(user_id, data_key). Engines stay stateless; routers load a document,
+hand it to an engine and save what comes back.
+
+The database path is taken from KPKN_STATE_DB and defaults to
+backend/.state/kpkn_state.sqlite3.
+"""
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+from contextlib import closing, contextmanager
+from datetime import datetime, timezone
+from typing import Callable, Iterable, Iterator, TypeVar
+
+T = TypeVar("T")
+
+_DEFAULT_DB_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), ".state", "kpkn_state.sqlite3")
+
+_UPSERT = (
+    "INSERT INTO user_state (user_id, data_key, data, updated_at) VALUES (?, ?, ?, ?) "
+    "ON CONFLICT(user_id, data_key) DO UPDATE SET data = excluded.data, updated_at = excluded.updated_at"
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS user_state (
+    user_id    TEXT NOT NULL,
+    data_key   TEXT NOT NULL,
+    data       TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    PRIMARY KEY (user_id, data_key)
+)
+"""
+
+
+def resolve_db_path() -> str:
+    return os.getenv("KPKN_STATE_DB") or _DEFAULT_DB_PATH
+
+
+def connect() -> sqlite3.Connection:
+    """Open a connection with the base schema in place.
+
+    Connections are cheap and opened per call, so request handlers running
+    on FastAPI's thread pool never share one.
+    """
+    path = resolve_db_path()
+    if path != ":memory:":
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    conn = sqlite3.connect(path, timeout=10.0)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute(_SCHEMA)
+    return conn
+
+
+@contextmanager
+def state_transaction(
+    connector: Callable[[], sqlite3.Connection] = connect,
+) -> Iterator[sqlite3.Connection]:
+    """One BEGIN IMMEDIATE write transaction, committed on exit.
+
+    Pass the connection to load_state/save_state (or any store sharing this
+    database) to read and write several documents atomically: concurrent
+    transactions are serialized, and an exception rolls everything back.
+    connector lets stores with extra tables open it with their schema.
+    """
+    with closing(connector()) as conn:
+        conn.isolation_level = None
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+
+def load_state(user_id: str, data_key: str, conn: sqlite3.Connection | None = None) -> dict | None:
+    if conn is None:
+        with closing(connect()) as conn:
+            return load_state(user_id, data_key, conn)
+    row = conn.execute(
+        "SELECT data FROM user_state WHERE user_id = ? AND data_key = ?",
+        (user_id, data_key),
+    ).fetchone()
+    return json.loads(row[0]) if row else None
+
+
+def save_state(user_id: str, data_key: str, data: dict, conn: sqlite3.Connection | None = None) -> None:
+    if conn is None:
+        with closing(connect()) as conn, conn:
+            save_state(user_id, data_key, data, conn)
+        return
+    conn.execute(_UPSERT, (user_id, data_key, json.dumps(data), datetime.now(timezone.utc).isoformat()))
+
+
+def update_state(
+    user_id: str,
+    data_key: str,
+    update: Callable[[dict | None], tuple[dict | None, T]],
+) -> T:
+    """Read-modify-write one document in a state_transaction.
+
+    update receives the stored document (or None) and returns (document to
+    save or None to leave it as is, result).
+    """
+    with state_transaction() as conn:
+        data, result = update(load_state(user_id, data_key, conn))
+        if data is not None:
+            save_state(user_id, data_key, data, conn)
+    return result
+
+
+def save_states(rows: Iterable[tuple[str, str, dict]]) -> int:
+    """Upsert many (user_id, data_key, data) documents in one transaction."""
+    updated_at = datetime.now(timezone.utc).isoformat()
+    params = [(user_id, data_key, json.dumps(data), updated_at) for user_id, data_key, data in rows]
+    with closing(connect()) as conn, conn:
+        conn.executemany(_UPSERT, params)
+    return len(params)
+
+
+def delete_state(user_id: str, key_prefix: str = "") -> int:
+    """Delete every document for the user whose key starts with key_prefix."""
+    with closing(connect()) as conn, conn:
+        cur = conn.execute(
+            "DELETE FROM user_state WHERE user_id = ? AND substr(data_key, 1, ?) = ?",
+            (user_id, len(key_prefix), key_prefix),
+        )
+    return cur.rowcount